@@ -0,0 +1,96 @@
+"""Benchmark for the tProc v2 assembler parser.
+
+Generates a synthetic program with a mix of the instructions, labels, aliases
+and constants the assembler supports, and times ``Assembler.str_asm2list()``
+on it. This is the benchmark used to measure the precompiled-regex parser.
+
+Usage::
+
+    python benchmarks/parse_asm.py [n_blocks] [repeats]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+
+from myqick import tprocv2_assembler as asm  # noqa: E402
+
+# the .ALIAS and .CONST at the end are used before they are defined
+BLOCK = """
+LOOP_{i}:
+     REG_WR r1 imm #{i}
+     REG_WR counter imm #0
+     REG_WR s14 op -op(s11 + #-100) -uf
+     TIME inc_ref s14
+     TIME inc_ref #{i}
+     WPORT_WR p3 wmem [&{w}] @{t}
+     REG_WR r_wave wmem [&{w}]
+     WMEM_WR [&{w}]
+     TRIG set p2
+     TRIG clr p2
+     DPORT_WR p1 imm 7
+     DPORT_RD p1
+     REG_WR counter op -op(counter + #1)
+     REG_WR r2 dmem [&7]
+     DMEM_WR [r3] op -op(r2)
+     DMEM_WR [&9] imm big
+     TEST -op(counter - r1) -uf
+     JUMP LOOP_{i} -if(NS)
+     JUMP FWD_{i} -if(Z)
+     CALL FN
+     WAIT time @1000
+     ARITH TP r1 r2 r3
+     DIV r1 #7
+     FLAG set
+     CLEAR all
+     REG_WR r1 op -op(r1 SL #3)
+     REG_WR r1 op -op(ABS r2)
+     REG_WR s15 label FN
+     NET set_net
+     COM set_byte_1 #12
+     JUMP NEXT
+FWD_{i}:
+     NOP
+"""
+
+TAIL = """
+FN:
+     DMEM_WR [&2] op -op(counter)
+     RET
+.ALIAS counter r5
+.CONST big #1000
+.END
+"""
+
+
+def make_asm(n_blocks):
+    """Build a synthetic program with n_blocks copies of the test block."""
+    blocks = [BLOCK.format(i=i, w=i % 1000, t=100 + i) for i in range(n_blocks)]
+    return "".join(blocks) + TAIL
+
+
+def main():
+    n_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    source = make_asm(n_blocks)
+    n_lines = source.count("\n")
+    aliases = dict(asm.Alias_List)
+    best = None
+    for _ in range(repeats):
+        # .ALIAS directives modify the global alias table, start clean each time
+        asm.Alias_List.clear()
+        asm.Alias_List.update(aliases)
+        t_start = time.perf_counter()
+        program_list, label_dict = asm.Assembler.str_asm2list(source)
+        t_run = time.perf_counter() - t_start
+        best = t_run if best is None else min(best, t_run)
+    print(
+        "%d lines, %d instructions, %d labels: best of %d %.3f s (%.0f lines/s)"
+        % (n_lines, len(program_list), len(label_dict), repeats, best, n_lines / best)
+    )
+
+
+if __name__ == "__main__":
+    main()
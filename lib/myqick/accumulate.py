@@ -0,0 +1,212 @@
+"""
+Accumulators for folding streamed readout data into results as it arrives.
+These let acquire() reduce each chunk from poll_data() immediately, so memory scales with the size of the result rather than the number of shots.
+"""
+
+import functools
+import operator
+
+import numpy as np
+
+
+class ShotIndexer:
+    """Maps flat shot numbers (in the order the tProc counts them) to cells of the averaged result.
+
+    Shots are counted with the outermost loop varying slowest.
+    The result of averaging over one loop level has the shape of loop_dims with that level removed.
+
+    Parameters
+    ----------
+    loop_dims : list of int
+        List of loop dimensions, outermost loop first.
+    avg_level : int
+        Which loop level is averaged over (0 is outermost).
+    nreads : int
+        Number of readout triggers per shot.
+    """
+
+    def __init__(self, loop_dims, avg_level, nreads):
+        self.loop_dims = list(loop_dims)
+        self.avg_level = avg_level
+        self.nreads = nreads
+        # number of shots in one step of the averaged loop
+        self.inner = functools.reduce(operator.mul, self.loop_dims[avg_level + 1 :], 1)
+        # number of shots in one step of the loop outside the averaged loop
+        self.outer = self.inner * self.loop_dims[avg_level]
+        self.out_dims = self.loop_dims[:avg_level] + self.loop_dims[avg_level + 1 :]
+        self.ncells = functools.reduce(operator.mul, self.out_dims, 1) * nreads
+        # read index within a shot, reused for every block
+        self._reads = np.arange(nreads)
+
+    def cells(self, start, nshots):
+        """Compute the result cell for each read in a block of consecutive shots.
+
+        Parameters
+        ----------
+        start : int
+            Shot number of the first shot in the block.
+        nshots : int
+            Number of shots in the block.
+
+        Returns
+        -------
+        numpy.ndarray of int
+            Flat cell index for each read, in the order the reads are streamed.
+        """
+        shot = np.arange(start, start + nshots)
+        cell = (shot // self.outer) * self.inner + shot % self.inner
+        return (cell[:, np.newaxis] * self.nreads + self._reads).ravel()
+
+    def groups(self, start, nshots):
+        """Group the reads in a block of consecutive shots by result cell.
+        This gives the same grouping as numpy.unique() on the output of cells(), in linear time (the cells are not sorted).
+
+        Parameters
+        ----------
+        start : int
+            Shot number of the first shot in the block.
+        nshots : int
+            Number of shots in the block.
+
+        Returns
+        -------
+        numpy.ndarray of int, numpy.ndarray of int, numpy.ndarray of int
+            the distinct cells in the block;
+            for each read, the index of its cell in that list;
+            the number of reads in each cell
+        """
+        if nshots <= self.inner:
+            # two shots only share a cell if they're a multiple of inner apart, so every read has its own cell
+            n = nshots * self.nreads
+            return self.cells(start, nshots), np.arange(n), np.ones(n, dtype=np.int64)
+        shot = np.arange(start, start + nshots)
+        # number the cells that the block can touch, counting from the first shot's outer step;
+        # this range is less than 3*nshots, since nshots > inner
+        first = start // self.outer
+        key = (shot // self.outer - first) * self.inner + shot % self.inner
+        counts = np.bincount(key)
+        present = np.flatnonzero(counts)
+        compact = np.empty(len(counts), dtype=np.int64)
+        compact[present] = np.arange(len(present))
+        cells = (first * self.inner + present)[
+            :, np.newaxis
+        ] * self.nreads + self._reads
+        inv = compact[key][:, np.newaxis] * self.nreads + self._reads
+        return cells.ravel(), inv.ravel(), np.repeat(counts[present], self.nreads)
+
+
+class WelfordAccumulator:
+    """Running mean and variance of streamed I/Q values, reduced over one loop level.
+
+    Each chunk is merged into the running statistics with the parallel form of Welford's algorithm,
+    so the result is the same as averaging a buffer holding every shot, without the buffer.
+
+    Parameters
+    ----------
+    loop_dims : list of int
+        List of loop dimensions, outermost loop first.
+    avg_level : int
+        Which loop level to average over (0 is outermost).
+    nreads : int
+        Number of readout triggers per shot.
+    """
+
+    def __init__(self, loop_dims, avg_level, nreads):
+        self.indexer = ShotIndexer(loop_dims, avg_level, nreads)
+        ncells = self.indexer.ncells
+        self.n = np.zeros(ncells, dtype=np.int64)
+        self.mean = np.zeros((ncells, 2), dtype=np.float64)
+        self.m2 = np.zeros((ncells, 2), dtype=np.float64)
+
+    def add(self, start, data):
+        """Fold a block of consecutive shots into the running statistics.
+
+        Parameters
+        ----------
+        start : int
+            Shot number of the first shot in the block.
+        data : numpy.ndarray
+            I/Q values for the block, shape (nshots*nreads, 2).
+        """
+        if len(data) == 0:
+            return
+        nshots = len(data) // self.indexer.nreads
+        cells, inv, nb = self.indexer.groups(start, nshots)
+        x = np.asarray(data, dtype=np.float64)
+        # mean and sum of squared deviations of this block, per cell
+        mean_b = (
+            np.stack([np.bincount(inv, weights=x[:, i]) for i in range(2)], axis=-1)
+            / nb[:, np.newaxis]
+        )
+        dev = x - mean_b[inv]
+        m2_b = np.stack(
+            [np.bincount(inv, weights=dev[:, i] ** 2) for i in range(2)], axis=-1
+        )
+        # merge with the running statistics
+        na = self.n[cells]
+        n = na + nb
+        delta = mean_b - self.mean[cells]
+        self.mean[cells] += delta * (nb / n)[:, np.newaxis]
+        self.m2[cells] += m2_b + delta**2 * (na * nb / n)[:, np.newaxis]
+        self.n[cells] = n
+
+    def result(self):
+        """Get the mean and (population) standard deviation of the data so far.
+
+        Returns
+        -------
+        numpy.ndarray, numpy.ndarray
+            mean and standard deviation, with shape (*out_dims, nreads, 2)
+        """
+        shape = (*self.indexer.out_dims, self.indexer.nreads, 2)
+        n = np.maximum(self.n, 1)[:, np.newaxis]
+        return self.mean.reshape(shape).copy(), np.sqrt(self.m2 / n).reshape(shape)
+
+
+class HistogramAccumulator:
+    """Running 2D histograms of streamed I/Q values, one per read.
+
+    This bins like numpy.histogram2d() with uniform bins, but one chunk at a time, so memory doesn't grow with the number of shots.
+    Points outside the range are not binned, but are counted in `outside`.
+
+    Parameters
+    ----------
+    nreads : int
+        Number of readout triggers per shot.
+    bins : int or (int, int)
+        Number of bins along I and Q.
+    hist_range : ((float, float), (float, float))
+        Lower and upper edges of the I and Q ranges.
+    """
+
+    def __init__(self, nreads, bins, hist_range):
+        self.nreads = nreads
+        self.bins = tuple(int(b) for b in np.broadcast_to(bins, 2))
+        self.edges = [
+            np.linspace(lo, hi, n + 1) for (lo, hi), n in zip(hist_range, self.bins)
+        ]
+        self.counts = np.zeros((nreads, *self.bins), dtype=np.int64)
+        self.outside = np.zeros(nreads, dtype=np.int64)
+
+    def add(self, data):
+        """Bin a block of consecutive shots.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            I/Q values for the block, shape (nshots*nreads, 2).
+        """
+        x = np.asarray(data, dtype=np.float64)
+        read = np.arange(len(x)) % self.nreads
+        inside = np.ones(len(x), dtype=bool)
+        flat = read
+        for i, (edges, n) in enumerate(zip(self.edges, self.bins)):
+            lo, hi = edges[0], edges[-1]
+            inside &= (x[:, i] >= lo) & (x[:, i] <= hi)
+            # the last bin includes its upper edge, like numpy.histogram2d()
+            idx = np.clip((x[:, i] - lo) * (n / (hi - lo)), 0, n - 1).astype(np.int64)
+            flat = flat * n + idx
+        self.counts += np.bincount(flat[inside], minlength=self.counts.size).reshape(
+            self.counts.shape
+        )
+        self.outside += np.bincount(read[~inside], minlength=self.nreads)
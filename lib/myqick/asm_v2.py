@@ -13,7 +13,7 @@ from typing import Callable, Dict, NamedTuple, Union
 
 import numpy as np
 
-from .helpers import check_bytes, check_keys, to_int
+from .helpers import check_bytes, check_keys, pmem_digest, to_int
 from .qick_asm import AbsQickProgram, AcquireMixin
 from .tprocv2_assembler import Assembler
 
@@ -750,6 +750,10 @@ class ReadWmem(Macro):
 
 class WriteWmem(Macro):
     # name
+    def preprocess(self, prog):
+        # the waveform is going to change, so it can't share its wave memory entry
+        prog._unshare_wave(self.name)
+
     def expand(self, prog):
         addr = prog.wave2idx[self.name]
         return [AsmInst(inst={"CMD": "WMEM_WR", "DST": f"&{addr}"}, addr_inc=1)]
@@ -2337,6 +2341,9 @@ class QickProgramV2(AsmV2, AbsQickProgram):
     ABSOLUTE_FREQS = True
     # downconversion frequencies are negative
     FLIP_DOWNCONVERSION = True
+    # identical waveforms that aren't swept share one wave memory entry (see _register_wave());
+    # turn this off if you write to the wave memory with raw ASM (WMEM_WR via asm_inst()) instead of write_wmem()
+    SHARE_WAVES = True
 
     # supported revisions of the tProc v2 core
     ASM_REVISIONS = [21, 22, 23]
@@ -2384,7 +2391,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         # Attributes to dump when saving the program to JSON.
         # The dump just keeps enough information to execute the program - ASM and initial waveform values.
         # Most of the high-level information (macros, sweeps) is lost.
-        self.dump_keys += ["waves", "prog_list", "labels"]
+        self.dump_keys += ["waves", "prog_list", "labels", "params"]
 
     def _init_declarations(self):
         # initialize the high-level objects that get filled in manually, or by a make_program()
@@ -2411,10 +2418,15 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         # waveforms consist of initial parameters (to be written to the wave memory) and sweeps (to be applied when looping)
         self.waves = []
         self.wave2idx = {}
+        # waveforms that other identical waveforms can share, keyed by their wave memory contents
+        self.shareable_waves = {}
 
         # allocated registers
         self.reg_dict = {}
 
+        # runtime parameters in data memory
+        self.params = OrderedDict()
+
     def _init_instructions(self):
         # initialize the low-level objects that get filled by macro expansion
 
@@ -2441,16 +2453,18 @@ class QickProgramV2(AsmV2, AbsQickProgram):
     def load_prog(self, progdict):
         # note that we only dump+load the raw waveforms and ASM (the low-level stuff that gets converted to binary)
         # we don't load the macros, pulses, or sweeps (the high-level stuff that gets translated to the low-level stuff)
-        super().load_prog(progdict)
+        # dumps from before runtime parameters were added don't have them
+        super().load_prog({"params": {}, **progdict})
         # re-create the Waveform objects
         self.waves = [Waveform(**w) for w in self.waves]
         # make the binary (this will prevent compile() from running and wiping out the low-level stuff)
-        self._make_binprog()
+        # unless the dump already has it
+        if "binprog" not in progdict:
+            self._make_binprog()
 
     def _compile_prog(self):
-        # the assembler modifies some of the command dicts, so do a copy first
-        plist_copy = copy.deepcopy(self.prog_list)
-        _, p_mem = Assembler.list2bin(plist_copy, self.labels)
+        # the assembler doesn't modify the program list, so no copy is needed
+        _, p_mem = Assembler.list2bin(self.prog_list, self.labels)
         return p_mem
 
     def _compile_waves(self):
@@ -2461,15 +2475,19 @@ class QickProgramV2(AsmV2, AbsQickProgram):
 
     def compile_datamem(self):
         """Generate the data that should be written to data memory before running the program.
-        For basic QICK programs no data needs to be written, and this method returns no values.
-        If you need to write data, you should override this method.
+        By default this holds the current values of the runtime parameters (see declare_param()), if there are any.
+        If you need to write other data, you should override this method and add your data to the output of this method.
 
         Returns
         -------
-        numpy.ndarray of int or None
-            data to write
+        list of int or None
+            data to write, starting at address 0
         """
-        d_mem = None
+        if not self.params:
+            return None
+        d_mem = [0] * (max(p["addr"] for p in self.params.values()) + 1)
+        for p in self.params.values():
+            d_mem[p["addr"]] = p["value"]
         return d_mem
 
     def compile(self):
@@ -2516,6 +2534,13 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         # this means stepping through the timeline (evaluating "auto" times etc.)
         for i, macro in enumerate(self.macro_list):
             macro.preprocess(self)
+        if len(set(self.wave2idx.values())) < len(self.wave2idx) and any(
+            isinstance(macro, AsmInst) and macro.inst.get("CMD") == "WMEM_WR"
+            for macro in self.macro_list
+        ):
+            logger.warning(
+                "this program has raw WMEM_WR instructions, and some waveforms share wave memory entries, so a write may change several waveforms; set SHARE_WAVES = False in your program class, or use write_wmem()"
+            )
         # initialize sweep registers
         for k, v in self.reg_dict.items():
             if v.init is not None:
@@ -2572,11 +2597,46 @@ class QickProgramV2(AsmV2, AbsQickProgram):
     # waves+pulses
 
     def _register_wave(self, wave, wavename):
+        """Add a waveform to the wave memory.
+        If SHARE_WAVES is set, a waveform that isn't swept and is identical to one already registered reuses that waveform's entry,
+        so several names in wave2idx can point to the same address.
+        Writing to a waveform with write_wmem() gives it its own entry first (see _unshare_wave()),
+        but a raw WMEM_WR instruction to an address from wave2idx changes every waveform that shares the entry.
+        """
         if wavename in self.wave2idx:
             raise RuntimeError("waveform name %s is already used" % (wavename))
+        wave.name = wavename
+        # a waveform that isn't swept stays constant (unless the program writes to it, see _unshare_wave()),
+        # so identical waveforms can use the same wave memory entry
+        key = None
+        if self.SHARE_WAVES and not wave.sweeps():
+            key = tuple(wave.compile().tolist())
+        if key in self.shareable_waves:
+            self.wave2idx[wavename] = self.shareable_waves[key]
+            return
         self.waves.append(wave)
         self.wave2idx[wavename] = len(self.waves) - 1
-        wave.name = wavename
+        if key is not None:
+            self.shareable_waves[key] = len(self.waves) - 1
+
+    def _unshare_wave(self, wavename):
+        # give a waveform its own wave memory entry, so the program can write to it without affecting other waveforms
+        idx = self.wave2idx[wavename]
+        others = [k for k, v in self.wave2idx.items() if v == idx and k != wavename]
+        if others:
+            if self.waves[idx].name == wavename:
+                # the entry stays with the other waveforms, so it should have one of their names
+                self.waves[idx] = copy.copy(self.waves[idx])
+                self.waves[idx].name = others[0]
+            wave = copy.copy(self.waves[idx])
+            wave.name = wavename
+            self.waves.append(wave)
+            idx = len(self.waves) - 1
+            self.wave2idx[wavename] = idx
+        # waveforms registered later shouldn't share it either
+        self.shareable_waves = {
+            k: v for k, v in self.shareable_waves.items() if v != idx
+        }
 
     def _register_pulse(self, pulse, pulsename):
         if pulsename in self.pulses:
@@ -2644,6 +2704,9 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         """Add a pulse to the program's pulse library.
         See the relevant generator manager for the list of supported pulse styles and parameters.
 
+        Waveforms that aren't swept are shared with identical waveforms of other pulses (see SHARE_WAVES).
+        If you modify a pulse's waveforms in the wave memory, use write_wmem(); a raw WMEM_WR instruction would also change the other pulses.
+
         Parameters
         ----------
         ch : int or list of int
@@ -2728,6 +2791,13 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         pulse.ro_chs = [ch]
         self._register_pulse(pulse, name)
 
+    def _restore_declarations(self):
+        """Make sure the high-level pulse and sweep definitions are available.
+        They are lost when a program is loaded from a dump (see load_prog());
+        programs that can be loaded from the compile cache override this to rebuild them.
+        """
+        pass
+
     def list_pulse_waveforms(self, pulsename, exclude_special=True):
         """Get the names of the waveforms in a given pulse.
         This is normally useful if you need to loop over them in your program, for example to change some parameter.
@@ -2744,6 +2814,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         list of str
             Waveform names
         """
+        self._restore_declarations()
         return self.pulses[pulsename].get_wavenames(exclude_special=exclude_special)
 
     def list_pulse_params(self, pulsename):
@@ -2759,6 +2830,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         list of str
             Parameter names
         """
+        self._restore_declarations()
         pulse = self.pulses[pulsename]
         return pulse.numeric_params
 
@@ -2791,6 +2863,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
                 "get_pulse_param() can only be called on a program after it's been compiled"
             )
 
+        self._restore_declarations()
         pulse = self.pulses[pulsename]
         if parname not in pulse.numeric_params:
             raise RuntimeError(
@@ -2820,6 +2893,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         list of str
             Parameter names
         """
+        self._restore_declarations()
         inst = self.time_dict[tag]
         return inst.list_time_params()
 
@@ -2848,6 +2922,7 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         float, QickParam or numpy.ndarray
             Parameter value
         """
+        self._restore_declarations()
         inst = self.time_dict[tag]
         param = inst.get_time_param(parname)
         # if the parameter's not really swept, we just return the scalar
@@ -2967,6 +3042,119 @@ class QickProgramV2(AsmV2, AbsQickProgram):
         except ValueError:
             return False
 
+    # runtime parameters
+
+    def declare_param(self, name: str, value: int = 0, addr: int = None):
+        """Declare a runtime parameter: a named value in data memory, which the program reads with read_param().
+        The value can be changed with update_params() without recompiling the program or reloading the program memory,
+        so a scan in Python (e.g. a calibration driven by an optimizer) can reuse one compiled program.
+
+        Values are raw ints (ASM units); convert physical values yourself, e.g. with freq2reg().
+        The data memory is rewritten from the current values every time the program is loaded (see compile_datamem()),
+        so avoid writing to the parameters' addresses with write_dmem().
+
+        Parameters
+        ----------
+        name : str
+            Parameter name, must be unused.
+        value : int
+            Initial value (signed 32-bit).
+        addr : int
+            Requested data memory address, must be unused.
+            If None, the lowest unused address will be chosen for you.
+        """
+        if name in self.params:
+            raise NameError(f"parameter name '{name}' already exists")
+        assigned_addrs = set([p["addr"] for p in self.params.values()])
+        if addr is None:
+            addr = 0
+            while addr in assigned_addrs:
+                addr += 1
+        if addr < 0 or addr >= self.soccfg["tprocs"][0]["dmem_size"]:
+            raise ValueError(
+                f"parameter address must be smaller than {self.soccfg['tprocs'][0]['dmem_size']}"
+            )
+        if addr in assigned_addrs:
+            raise ValueError(f"data memory address {addr} is already occupied.")
+        self.params[name] = {"addr": addr, "value": self._check_param(name, value)}
+
+    def _check_param(self, name, value):
+        if not isinstance(value, Integral) or not check_bytes(value, 4):
+            raise ValueError(
+                f"value {value} for parameter '{name}' is not a signed 32-bit int"
+            )
+        return int(value)
+
+    def read_param(self, dst: str, name: str):
+        """Copy the value of a runtime parameter into a register.
+
+        Parameters
+        ----------
+        dst : str
+            Name of destination register
+        name : str
+            Parameter name
+        """
+        self.read_dmem(dst=dst, addr=self.params[name]["addr"])
+
+    def update_params(self, soc=None, **values):
+        """Change the values of runtime parameters.
+        The compiled program is patched in place, so no recompile is needed.
+
+        If a QickSoc is given, the new values are also written to its data memory immediately,
+        and to the copy of the data memory that it reloads before each run, so a loaded program can be rerun without reloading it.
+        Otherwise they take effect the next time the program is loaded (e.g. by acquire()).
+        If a different program has been loaded into the QickSoc since, this raises an error (the new values are still kept in this program).
+
+        Note that acquire() always loads the whole program with config_all().
+        Only with the config shadow enabled (see QickSoc.enable_config_shadow()) does that skip rewriting the unchanged program memory and envelopes;
+        otherwise each acquire() reloads everything, and only the recompile is saved.
+
+        If you override compile_datamem(), the parameter values must stay at their addresses in its output
+        (add your data to the output of the default method); otherwise this raises an error.
+
+        Parameters
+        ----------
+        soc : QickSoc
+            Qick object (None = don't write to the hardware now)
+        **values : int
+            new values, keyed by parameter name
+        """
+        for name, value in values.items():
+            if name not in self.params:
+                raise RuntimeError("no runtime parameter named %s" % (name))
+            self._check_param(name, value)
+        if self.binprog is not None:
+            # the compiled data memory must hold the current values, or we'd be overwriting something else
+            d_mem = self.binprog["dmem"]
+            for name in values:
+                p = self.params[name]
+                if (
+                    d_mem is None
+                    or p["addr"] >= len(d_mem)
+                    or d_mem[p["addr"]] != p["value"]
+                ):
+                    raise RuntimeError(
+                        "parameter %s is not at address %d of the compiled data memory; if you override compile_datamem(), it must include the output of the default method"
+                        % (name, p["addr"])
+                    )
+        for name, value in values.items():
+            self.params[name]["value"] = int(value)
+        if self.binprog is None:
+            # the values will be used when the program is compiled
+            return
+        addrs = [self.params[name]["addr"] for name in values]
+        for name, addr in zip(values, addrs):
+            d_mem[addr] = self.params[name]["value"]
+        if soc is not None and addrs:
+            # one write covering all the changed addresses
+            start, end = min(addrs), max(addrs) + 1
+            soc.update_dmem(
+                d_mem[start:end],
+                addr=start,
+                prog_digest=pmem_digest(self.binprog["pmem"]),
+            )
+
 
 class AcquireProgramV2(AcquireMixin, QickProgramV2):
     """Base class for tProc v2 programs with shot counting and readout acquisition.
@@ -3022,6 +3210,19 @@ class AveragerProgramV2(AcquireProgramV2):
     """
 
     COUNTER_ADDR = 1
+    # the compile cache only sees these attributes (see compile_cache.py):
+    # if your _initialize() or _body() reads anything else (e.g. attributes set in your own constructor), add it,
+    # e.g. CACHE_KEYS = AveragerProgramV2.CACHE_KEYS + ["my_attr"]
+    CACHE_KEYS = [
+        "cfg",
+        "reps",
+        "final_delay",
+        "final_wait",
+        "initial_delay",
+        "reps_innermost",
+        "before_reps",
+        "after_reps",
+    ]
 
     def __init__(
         self,
@@ -3043,6 +3244,8 @@ class AveragerProgramV2(AcquireProgramV2):
         self.reps_innermost = reps_innermost
         self.before_reps = before_reps
         self.after_reps = after_reps
+        # true if the program was loaded from the compile cache, and the high-level definitions haven't been rebuilt
+        self._from_cache = False
         super().__init__(soccfg)
 
         # fill the program
@@ -3053,6 +3256,24 @@ class AveragerProgramV2(AcquireProgramV2):
         if self.binprog is not None:
             return
 
+        loaded, cache_key = self._cache_lookup()
+        if loaded is not None:
+            # the loop bodies aren't cached, but nothing uses them after compilation
+            self.loops = [(name, count, None, None) for name, count in loaded["loops"]]
+            self.loop_dict = OrderedDict(loaded["loop_dict"])
+            self._from_cache = True
+            return
+
+        self._build()
+        self._cache_store(
+            cache_key,
+            loops=[x[:2] for x in self.loops],
+            loop_dict=list(self.loop_dict.items()),
+        )
+
+    def _build(self):
+        # fill and compile the program
+
         # wipe out macros
         self._init_declarations()
 
@@ -3075,6 +3296,22 @@ class AveragerProgramV2(AcquireProgramV2):
             avg_level=0,
         )
 
+    def _restore_declarations(self):
+        if not self._from_cache:
+            return
+        # rebuild the program to get the pulse and sweep definitions,
+        # but keep the loaded program and anything that's been changed since (e.g. with update_params())
+        logger.info(
+            "rebuilding the pulse and sweep definitions of a program loaded from the compile cache"
+        )
+        loaded = {k: getattr(self, k) for k in self.dump_keys}
+        binprog, staged = self.binprog, self._staged_pulses
+        self._from_cache = False
+        self._build()
+        for k, v in loaded.items():
+            setattr(self, k, v)
+        self.binprog, self._staged_pulses = binprog, staged
+
     def add_loop(self, name, count, exec_before=None, exec_after=None):
         """Add a loop level to the program.
         The first level added will be the outermost loop (after the reps loop).
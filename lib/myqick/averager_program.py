@@ -23,6 +23,7 @@ class AveragerProgram(AcquireProgram):
     """
 
     COUNTER_ADDR = 1
+    CACHE_KEYS = ["cfg"]
 
     def __init__(self, soccfg, cfg):
         """
@@ -32,7 +33,9 @@ class AveragerProgram(AcquireProgram):
         """
         super().__init__(soccfg)
         self.cfg = cfg
-        self.make_program()
+        loaded, cache_key = self._cache_lookup()
+        if loaded is None:
+            self.make_program()
         self.soft_avgs = 1
         if "soft_avgs" in cfg:
             self.soft_avgs = cfg["soft_avgs"]
@@ -44,6 +47,7 @@ class AveragerProgram(AcquireProgram):
         self.setup_acquire(
             counter_addr=self.COUNTER_ADDR, loop_dims=loop_dims, avg_level=0
         )
+        self._cache_store(cache_key)
 
     def initialize(self):
         """
@@ -116,9 +120,11 @@ class AveragerProgram(AcquireProgram):
 
         # reformat the data into separate I and Q arrays
         # save results to class in case you want to look at it later or for analysis
-        raw = [d.reshape((-1, 2)) for d in self.get_raw()]
-        self.di_buf = [d[:, 0] for d in raw]
-        self.dq_buf = [d[:, 1] for d in raw]
+        # the raw shots are not kept by an online acquisition, unless save_raw was set
+        if self.get_raw() is not None:
+            raw = [d.reshape((-1, 2)) for d in self.get_raw()]
+            self.di_buf = [d[:, 0] for d in raw]
+            self.dq_buf = [d[:, 1] for d in raw]
 
         n_ro = len(self.ro_chs)
         std_di, std_dq = None, None
@@ -191,6 +197,7 @@ class RAveragerProgram(AcquireProgram):
     """
 
     COUNTER_ADDR = 1
+    CACHE_KEYS = ["cfg"]
 
     def __init__(self, soccfg, cfg):
         """
@@ -198,7 +205,9 @@ class RAveragerProgram(AcquireProgram):
         """
         super().__init__(soccfg)
         self.cfg = cfg
-        self.make_program()
+        loaded, cache_key = self._cache_lookup()
+        if loaded is None:
+            self.make_program()
         self.soft_avgs = 1
         if "rounds" in cfg:
             self.soft_avgs = cfg["rounds"]
@@ -208,6 +217,7 @@ class RAveragerProgram(AcquireProgram):
         self.setup_acquire(
             counter_addr=self.COUNTER_ADDR, loop_dims=loop_dims, avg_level=1
         )
+        self._cache_store(cache_key)
 
     def initialize(self):
         """
@@ -306,9 +316,11 @@ class RAveragerProgram(AcquireProgram):
 
         # reformat the data into separate I and Q arrays
         # save results to class in case you want to look at it later or for analysis
-        raw = [d.reshape((-1, 2)) for d in self.get_raw()]
-        self.di_buf = [d[:, 0] for d in raw]
-        self.dq_buf = [d[:, 1] for d in raw]
+        # the raw shots are not kept by an online acquisition, unless save_raw was set
+        if self.get_raw() is not None:
+            raw = [d.reshape((-1, 2)) for d in self.get_raw()]
+            self.di_buf = [d[:, 0] for d in raw]
+            self.dq_buf = [d[:, 1] for d in raw]
 
         expt_pts = self.get_expt_pts()
 
@@ -604,9 +616,11 @@ class NDAveragerProgram(QickRegisterManagerMixin, AcquireProgram):
 
         # reformat the data into separate I and Q arrays
         # save results to class in case you want to look at it later or for analysis
-        raw = [d.reshape((-1, 2)) for d in self.get_raw()]
-        self.di_buf = [d[:, 0] for d in raw]
-        self.dq_buf = [d[:, 1] for d in raw]
+        # the raw shots are not kept by an online acquisition, unless save_raw was set
+        if self.get_raw() is not None:
+            raw = [d.reshape((-1, 2)) for d in self.get_raw()]
+            self.di_buf = [d[:, 0] for d in raw]
+            self.dq_buf = [d[:, 1] for d in raw]
 
         expt_pts = self.get_expt_pts()
 
@@ -0,0 +1,144 @@
+"""
+Running batches of programs, with the host-side preparation of each program overlapped with running the previous one,
+and compiling batches of programs in parallel.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .helpers import json2progs, progs2json
+from .qick_asm import AbsQickProgram, QickConfig
+
+# the firmware configuration, in each compile_many() worker process
+_worker_soccfg = None
+
+
+def _init_worker(cfg):
+    global _worker_soccfg
+    _worker_soccfg = QickConfig(cfg)
+
+
+def _compile(factory):
+    prog = factory(_worker_soccfg)
+    if prog.binprog is None:
+        prog.compile()
+    # JSON is the format load_prog() expects, and is cheap to send between processes
+    return progs2json({**prog.dump_prog(), "binprog": prog.binprog})
+
+
+def compile_many(soccfg, program_factories, workers=None):
+    """Compile many programs in parallel, using a pool of worker processes.
+    This is useful for scans made of many separate programs, where compiling them one after another on one core would be slow.
+
+    Each factory is called in a worker process, with a copy of the firmware configuration, and should return the program
+    (programs are usually built and compiled when they're created; any program that isn't compiled yet gets compiled).
+    The factories are sent to the workers by pickling, so they must be module-level functions or classes,
+    or functools.partial objects wrapping them (lambdas and functions defined in other functions won't work).
+    Depending on how Python starts the workers, objects defined in a notebook or interactive session may not work either.
+
+    The results are program dictionaries, like the output of dump_prog() but including the binary program,
+    which can be loaded into a fresh program object with load_prog() (e.g. AcquireProgramV2 for an AveragerProgramV2, to use acquire()).
+    As with any dumped program, the high-level pulse and sweep definitions are not included.
+
+    Parameters
+    ----------
+    soccfg : QickConfig
+        firmware configuration
+    program_factories : list of callable
+        functions that take a QickConfig and return a program
+    workers : int
+        number of worker processes (None = one per CPU)
+
+    Returns
+    -------
+    list of dict
+        the compiled programs, in the same order as the factories
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    # send tasks in chunks, to cut down on interprocess communication
+    chunksize = max(1, len(program_factories) // (4 * workers))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(soccfg.get_cfg(),)
+    ) as executor:
+        return [
+            json2progs(s)
+            for s in executor.map(_compile, program_factories, chunksize=chunksize)
+        ]
+
+
+def _prepare(job):
+    t_start = time.time()
+    prog = job if isinstance(job, AbsQickProgram) else job()
+    prog.prepare()
+    return prog, time.time() - t_start
+
+
+def run_batch(soc, jobs, method="acquire", overlap=None, **kwargs):
+    """Run a list of programs one after another, e.g. the points of a parameter scan made of many short programs.
+
+    While each program runs, the next one is prepared in a worker thread, so the time between programs is only the time it takes to load them into the hardware.
+    The steps that overlap with the running program are the host-side ones:
+    building and compiling the next program (if it's given as a function, see below) and converting its envelopes for loading (see prepare()).
+    Everything that writes to the hardware - configuring the generators and readouts, loading the envelopes and the program, and configuring the readout buffers -
+    happens when the program is run, since the hardware is in use by the previous program until then.
+
+    Programs are usually compiled when they're created, so to hide the compile time, give a function that creates the program
+    (e.g. functools.partial(MyProgram, soccfg, reps=100, final_delay=1.0, cfg=cfg)) instead of the program itself:
+    it's called in the worker thread.
+    For a program that's already created, only the envelope conversion is overlapped.
+
+    The preparation is Python code, which holds the interpreter lock while it runs.
+    When acquire() reads out a local QickSoc, the streamer thread reading the data needs the same lock,
+    and competing for it could make the streamer fall behind and overflow the readout buffers.
+    So by default the preparation is only overlapped if the data isn't streamed in this process
+    (the board is remote, accessed through Pyro, or the method is not "acquire");
+    otherwise each program is prepared after the previous one is done.
+
+    Parameters
+    ----------
+    soc : QickSoc
+        Qick object
+    jobs : list
+        the programs to run; each item is either a program or a function with no arguments that returns a program,
+        or a (program or function, dict) pair where the dict has extra parameters for that program
+    method : str
+        name of the program method to run: "acquire", "acquire_decimated" or "run_rounds"
+    overlap : bool
+        prepare the next program while the current one runs (None = decide as described above)
+    **kwargs
+        parameters for the method, used for all programs
+
+    Returns
+    -------
+    list, list of dict
+        the return value of the method for each program;
+        and the timing for each program (in seconds):
+        "prepare" (creation and preparation), "wait" (how long the program had to wait for its preparation to finish, including the preparation itself if it wasn't overlapped)
+        and "run" (the method call, including loading the program)
+    """
+    if overlap is None:
+        overlap = not (method == "acquire" and isinstance(soc, QickConfig))
+    jobs = [job if isinstance(job, tuple) else (job, {}) for job in jobs]
+    results = []
+    timings = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_prep = executor.submit(_prepare, jobs[0][0]) if jobs and overlap else None
+        for k, (job, job_kwargs) in enumerate(jobs):
+            t_start = time.time()
+            if next_prep is None:
+                prog, t_prep = _prepare(job)
+            else:
+                prog, t_prep = next_prep.result()
+            t_wait = time.time() - t_start
+            # start preparing the next program while this one runs
+            if overlap and k + 1 < len(jobs):
+                next_prep = executor.submit(_prepare, jobs[k + 1][0])
+
+            t_start = time.time()
+            results.append(getattr(prog, method)(soc, **{**kwargs, **job_kwargs}))
+            timings.append(
+                {"prepare": t_prep, "wait": t_wait, "run": time.time() - t_start}
+            )
+    return results, timings
@@ -0,0 +1,234 @@
+"""
+Cache of compiled programs, so rebuilding a program with the same configuration is a lookup instead of a compile.
+
+Programs are looked up by a hash of the firmware configuration, the program class (including the source code of the classes it's built from),
+and the attributes (typically constructor arguments) listed in the class's CACHE_KEYS.
+Anything else the program reads while it's being built must be added to CACHE_KEYS, or different programs will share a cache entry.
+A cached program is stored as the output of dump_prog() plus the binary program, the same as what's sent to a Pyro server.
+A program loaded from the cache can be run, but (as with load_prog()) doesn't have the high-level pulse and sweep definitions;
+AveragerProgramV2 keeps its loop list with the cached program, and rebuilds the rest (without the cache) when it's needed, e.g. by get_pulse_param().
+
+The cache is off by default; turn it on with set_compile_cache().
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+import weakref
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from myqick import get_version
+
+from .helpers import NpEncoder, json2progs, progs2json
+
+logger = logging.getLogger(__name__)
+
+# the cache used by programs
+_compile_cache = None
+
+
+def set_compile_cache(cache):
+    """Set the cache used when programs are compiled.
+
+    Parameters
+    ----------
+    cache : CompileCache
+        the cache (None = don't cache programs)
+    """
+    global _compile_cache
+    _compile_cache = cache
+
+
+def get_compile_cache():
+    """Get the cache used when programs are compiled.
+
+    Returns
+    -------
+    CompileCache
+        the cache (None if caching is off)
+    """
+    return _compile_cache
+
+
+class _KeyEncoder(NpEncoder):
+    # JSON encoding of program arguments, for hashing.
+    # Sweeps, macros and blocks of macros are encoded by their contents; anything else that isn't JSON-serializable (e.g. a function) raises TypeError.
+    def default(self, obj):
+        from .asm_v2 import AsmV2, QickParam
+
+        if isinstance(obj, QickParam):
+            # the other attributes get filled in when the param is used in a program
+            return {"QickParam": [obj.start, obj.spans]}
+        if isinstance(obj, AsmV2):
+            return {"AsmV2": obj.macro_list}
+        if isinstance(obj, SimpleNamespace):
+            return {type(obj).__qualname__: vars(obj)}
+        return super().default(obj)
+
+
+class CompileCache:
+    """In-memory LRU cache of compiled programs, optionally backed by a directory on disk.
+
+    The disk directory can be shared between processes and sessions, and is never cleaned up automatically.
+    Entries are keyed by the source code of the program class, but not of anything else that make_program() calls:
+    if you change such code, or the program depends on things other than its constructor arguments, clear the cache.
+
+    Parameters
+    ----------
+    maxsize : int
+        maximum number of programs kept in memory
+    path : str
+        directory for storing programs on disk (None = memory only)
+    """
+
+    def __init__(self, maxsize=128, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        # {key: JSON string}
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "uncacheable": 0}
+        # digests of firmware configurations and program classes, which don't change
+        self._cfg_digests = weakref.WeakKeyDictionary()
+        self._class_digests = weakref.WeakKeyDictionary()
+
+    def _cfg_digest(self, soccfg):
+        digest = self._cfg_digests.get(soccfg)
+        if digest is None:
+            cfg = json.dumps(soccfg.get_cfg(), sort_keys=True, cls=NpEncoder)
+            digest = hashlib.sha256(cfg.encode()).hexdigest()
+            self._cfg_digests[soccfg] = digest
+        return digest
+
+    def _class_digest(self, cls):
+        digest = self._class_digests.get(cls)
+        if digest is None:
+            # classes from this library are covered by the version number
+            h = hashlib.sha256(get_version().encode())
+            for c in cls.__mro__:
+                h.update(("%s.%s" % (c.__module__, c.__qualname__)).encode())
+                if c.__module__.split(".")[0] in ["builtins", "abc", "myqick"]:
+                    continue
+                try:
+                    h.update(inspect.getsource(c).encode())
+                except (OSError, TypeError):
+                    # no source (e.g. defined interactively): only cache within this process
+                    logger.debug("no source for %s, not caching it on disk" % (c))
+                    h.update(str(id(c)).encode())
+            digest = h.hexdigest()
+            self._class_digests[cls] = digest
+        return digest
+
+    def key(self, prog):
+        """Compute the cache key for a program, from its firmware configuration, class and arguments.
+        This must be called before the program is built.
+
+        Parameters
+        ----------
+        prog : AbsQickProgram
+            the program
+
+        Returns
+        -------
+        str
+            hex digest (None if the arguments can't be hashed)
+        """
+        try:
+            args = json.dumps(
+                {k: getattr(prog, k) for k in prog.CACHE_KEYS},
+                sort_keys=True,
+                cls=_KeyEncoder,
+            )
+        except (TypeError, ValueError) as e:
+            logger.debug("can't cache %s: %s" % (type(prog).__name__, e))
+            self.stats["uncacheable"] += 1
+            return None
+        h = hashlib.sha256(self._cfg_digest(prog.soccfg).encode())
+        h.update(self._class_digest(type(prog)).encode())
+        h.update(args.encode())
+        return h.hexdigest()
+
+    def _remember(self, key, data):
+        self.entries[key] = data
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, key):
+        """Look up a compiled program.
+
+        Parameters
+        ----------
+        key : str
+            cache key, from key()
+
+        Returns
+        -------
+        dict
+            the program dictionary (see AbsQickProgram.load_prog()), or None if the program isn't in the cache
+        """
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        elif self.path is not None and os.path.exists(self._filename(key)):
+            with open(self._filename(key)) as f:
+                data = f.read()
+            self._remember(key, data)
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            return None
+        # each caller gets its own copy, so programs don't share data
+        return json2progs(data)
+
+    def put(self, key, progdict):
+        """Store a compiled program.
+
+        Parameters
+        ----------
+        key : str
+            cache key, from key()
+        progdict : dict
+            the program dictionary (see AbsQickProgram.load_prog())
+        """
+        data = progs2json(progdict)
+        self._remember(key, data)
+        if self.path is not None:
+            # write to a temporary file first, so other processes never see a partial file
+            fd, tmpname = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmpname, self._filename(key))
+
+    def clear(self, disk=True):
+        """Remove all programs from the cache.
+
+        Parameters
+        ----------
+        disk : bool
+            also delete the programs stored on disk
+        """
+        self.entries.clear()
+        if disk and self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.path, name))
+
+    def get_stats(self):
+        """Get the numbers of lookups that were hits (in memory or on disk) and misses, and of programs that couldn't be cached.
+
+        Returns
+        -------
+        dict
+            counts
+        """
+        return dict(self.stats)
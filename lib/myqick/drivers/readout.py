@@ -739,7 +739,7 @@ class AxisAvgBuffer(SocIp):
         self.avg_addr_reg = address
         self.avg_len_reg = length
 
-    def transfer_avg(self, address=0, length=100):
+    def transfer_avg(self, address=0, length=100, copy=True):
         """
         Transfer average buffer data from average and buffering readout block.
 
@@ -747,6 +747,8 @@ class AxisAvgBuffer(SocIp):
         :type addr: int
         :param length: number of samples
         :type length: int
+        :param copy: if False, return a view into the DMA buffer, which is only valid until the next transfer
+        :type copy: bool
         :return: I,Q pairs
         :rtype: list
         """
@@ -789,8 +791,9 @@ class AxisAvgBuffer(SocIp):
         # -> higher 32 bits: Q value.
         data = np.frombuffer(buff[:length], dtype=np.int32).reshape((-1, 2))
 
-        # data is a view into the data buffer, so copy it before returning
-
+        # data is a view into the data buffer, so copy it before returning (unless the caller will copy it)
+        if not copy:
+            return data
         return data.copy()
 
     def enable_avg(self):
@@ -827,7 +830,7 @@ class AxisAvgBuffer(SocIp):
         self.buf_addr_reg = address
         self.buf_len_reg = length
 
-    def transfer_buf(self, address=0, length=100):
+    def transfer_buf(self, address=0, length=100, copy=True):
         """
         Transfer raw buffer data from average and buffering readout block
 
@@ -835,6 +838,8 @@ class AxisAvgBuffer(SocIp):
         :type addr: int
         :param length: number of samples
         :type length: int
+        :param copy: if False, return a view into the DMA buffer, which is only valid until the next transfer
+        :type copy: bool
         :return: I,Q pairs
         :rtype: list
         """
@@ -881,7 +886,9 @@ class AxisAvgBuffer(SocIp):
         data = np.frombuffer(buff[:length], dtype=np.int16).reshape((-1, 2))
 
         # data is a view into the data buffer, so copy it before returning
-        return data.copy()
+        if copy:
+            return data.copy()
+        return data
 
     def enable_buf(self):
         """
@@ -351,6 +351,9 @@ class Axis_QICK_Proc(SocIp):
 
     bindto = ["Fermi:user:qick_processor:2.0"]
 
+    # when writing only the changed parts of a memory, unchanged gaps shorter than this are written anyway, to save DMA transfers
+    DIFF_MERGE_GAP = 16
+
     def __init__(self, description):
         """
         Constructor method
@@ -427,6 +430,13 @@ class Axis_QICK_Proc(SocIp):
 
         # the currently loaded program - cached here to make it easy to reload the memories
         self.binprog = None
+        # copies of what was last written to each memory, starting at address 0 (None = unknown)
+        # running the program may change the waveform and data memory, so those copies are dropped when the tProc starts
+        self.mem_mirror = {"pmem": None, "dmem": None, "wmem": None}
+        # DMA traffic of program loads: bytes written, and bytes not written because they were unchanged
+        self.load_stats = {
+            mem: {"bytes_written": 0, "bytes_saved": 0} for mem in self.mem_mirror
+        }
 
     # Configure this driver with links to its memory and DMA.
     def configure(self, axi_dma):
@@ -510,6 +520,7 @@ class Axis_QICK_Proc(SocIp):
 
     def start(self):
         self.logger.info("PROCESSOR_START")
+        self._forget_mem(["wmem", "dmem"])
         self.tproc_ctrl = 4
 
     def stop(self):
@@ -518,6 +529,7 @@ class Axis_QICK_Proc(SocIp):
 
     def core_start(self):
         self.logger.info("CORE_START")
+        self._forget_mem(["wmem", "dmem"])
         self.tproc_ctrl = 16
 
     def core_stop(self):
@@ -526,10 +538,12 @@ class Axis_QICK_Proc(SocIp):
 
     def reset(self):
         self.logger.info("PROCESSOR_RESET")
+        self._forget_mem(["pmem", "wmem", "dmem"])
         self.tproc_ctrl = 64
 
     def run(self):
         self.logger.info("PROCESSOR_RUN")
+        self._forget_mem(["wmem", "dmem"])
         self.tproc_ctrl = 128
 
     def proc_pause(self):
@@ -542,10 +556,12 @@ class Axis_QICK_Proc(SocIp):
 
     def proc_step(self):
         self.logger.info("PROCESSOR_STEP")
+        self._forget_mem(["wmem", "dmem"])
         self.tproc_ctrl = 1024
 
     def core_step(self):
         self.logger.info("CORE_STEP")
+        self._forget_mem(["wmem", "dmem"])
         self.tproc_ctrl = 2048
 
     def time_step(self):
@@ -698,6 +714,112 @@ class Axis_QICK_Proc(SocIp):
         # End Operation
         self.tproc_cfg &= ~63
 
+        self._update_mirror(mem_sel, np.asarray(buff_in, dtype=np.int32), addr)
+
+    def _update_mirror(self, mem_sel, buff, addr):
+        # the mirror is a block starting at address 0; a write that would leave a gap after the block isn't recorded
+        mirror = self.mem_mirror[mem_sel]
+        if mirror is None:
+            mirror = np.zeros((0,) + buff.shape[1:], dtype=np.int32)
+        if addr > len(mirror):
+            return
+        end = addr + len(buff)
+        if end > len(mirror):
+            mirror = np.concatenate([mirror[:addr], buff])
+        else:
+            mirror[addr:end] = buff
+        self.mem_mirror[mem_sel] = mirror
+
+    def _forget_mem(self, mems):
+        for mem_sel in mems:
+            self.mem_mirror[mem_sel] = None
+
+    def changed_ranges(self, mem_sel, buff):
+        """
+        Find the parts of a memory that would be changed by writing a block starting at address 0.
+        Nearby ranges are merged (see DIFF_MERGE_GAP).
+
+        Parameters
+        ----------
+        mem_sel : str
+            "pmem", "dmem", "wmem"
+        buff : numpy.ndarray
+            32-bit array of shape (n, 8) for pmem and wmem, (n) for dmem
+
+        Returns
+        -------
+        list of tuple
+            (start, end) address ranges to write, end exclusive
+        """
+        mirror = self.mem_mirror[mem_sel]
+        changed = np.ones(len(buff), dtype=bool)
+        if mirror is not None:
+            # addresses past the end of the mirror are unknown, so they count as changed
+            m = min(len(buff), len(mirror))
+            changed[:m] = np.any(
+                buff[:m] != mirror[:m], axis=tuple(range(1, buff.ndim))
+            )
+        addrs = np.flatnonzero(changed)
+        if len(addrs) == 0:
+            return []
+        # split wherever the unchanged gap is too long to be worth writing
+        splits = np.flatnonzero(np.diff(addrs) > self.DIFF_MERGE_GAP)
+        starts = np.concatenate([addrs[:1], addrs[splits + 1]])
+        ends = np.concatenate([addrs[splits], addrs[-1:]]) + 1
+        return list(zip(starts.tolist(), ends.tolist()))
+
+    def load_mem_changes(self, mem_sel, buff_in, check=False):
+        """
+        Write a block starting at address 0 to the selected tProc memory, skipping the parts that are known to be unchanged.
+
+        Parameters
+        ----------
+        mem_sel : str
+            "pmem", "dmem", "wmem"
+        buff_in : numpy.ndarray
+            Data to be loaded
+            32-bit array of shape (n, 8) for pmem and wmem, (n) for dmem
+        check : bool
+            read back the written ranges and compare them to the data
+
+        Returns
+        -------
+        bool
+            False if the readback check failed
+        """
+        buff = np.asarray(buff_in, dtype=np.int32)
+        written = 0
+        ok = True
+        for start, end in self.changed_ranges(mem_sel, buff):
+            self.load_mem(mem_sel, buff[start:end], start)
+            written += end - start
+            if check:
+                readback = self.read_mem(mem_sel, length=end - start, addr=start)
+                if not np.array_equal(readback, buff[start:end]):
+                    self.logger.error(
+                        "readback of %s addresses %d-%d doesn't match"
+                        % (mem_sel, start, end - 1)
+                    )
+                    ok = False
+        if not ok:
+            # the memory contents are unknown, so the next load must write everything
+            self._forget_mem([mem_sel])
+        # every DMA word is 256 bits, regardless of memory
+        self.load_stats[mem_sel]["bytes_written"] += written * 32
+        self.load_stats[mem_sel]["bytes_saved"] += (len(buff) - written) * 32
+        return ok
+
+    def get_load_stats(self):
+        """
+        Get the DMA traffic of program loads.
+
+        Returns
+        -------
+        dict
+            {"bytes_written": n, "bytes_saved": n} for each memory
+        """
+        return {k: dict(v) for k, v in self.load_stats.items()}
+
     def read_mem(self, mem_sel, length, addr=0):
         """
         Read tProc Selected memory using DMA
@@ -764,14 +886,43 @@ class Axis_QICK_Proc(SocIp):
         if self.binprog["dmem"] is not None:
             self.load_mem("dmem", self.binprog["dmem"])
 
-    def load_bin_program(self, binprog, load_mem):
+    def load_bin_program(self, binprog, load_mem, incremental=False):
         """
         Write the program to the tProc program memory.
+
+        Parameters
+        ----------
+        binprog : dict
+            compiled program
+        load_mem : bool
+            also write the waveform and data memory
+        incremental : bool
+            only write the parts of the memories that differ from what was last written.
+            The waveform and data memory are only compared if the tProc hasn't been started since they were written.
+            Only use this if nothing else has written to the memories since.
         """
         self.binprog = binprog
-        self.Load_PMEM(self.binprog["pmem"])
-        if load_mem:
-            self.reload_mem()
+        if incremental:
+            # verify the written parts of the program memory, as Load_PMEM() does for the whole program
+            if self.load_mem_changes("pmem", self.binprog["pmem"], check=True):
+                self.logger.info("Program Loaded OK")
+            else:
+                self.logger.error("Error Loading Program")
+            if load_mem:
+                for mem_sel in ["wmem", "dmem"]:
+                    if self.binprog[mem_sel] is not None:
+                        self.load_mem_changes(mem_sel, self.binprog[mem_sel])
+        else:
+            self.Load_PMEM(self.binprog["pmem"])
+            loaded = ["pmem"]
+            if load_mem:
+                self.reload_mem()
+                loaded += ["wmem", "dmem"]
+            for mem_sel in loaded:
+                if self.binprog[mem_sel] is not None:
+                    self.load_stats[mem_sel]["bytes_written"] += (
+                        len(self.binprog[mem_sel]) * 32
+                    )
 
     def print_axi_regs(self):
         print("---------------------------------------------")
@@ -3,6 +3,7 @@ Support functions.
 """
 
 import base64
+import hashlib
 import json
 from collections import OrderedDict
 from typing import List, Union
@@ -224,6 +225,19 @@ def json2progs(s):
     return proglist
 
 
+def pmem_digest(pmem):
+    """
+    Compute a digest that identifies a compiled tProc v2 program by its program memory.
+    Programs with the same program memory read their runtime parameters from the same data memory addresses.
+
+    :param pmem: program memory
+    :type pmem: list
+    :return: hex digest
+    :rtype: str
+    """
+    return hashlib.sha256(np.asarray(pmem, dtype=np.int64).tobytes()).hexdigest()
+
+
 def ch2list(ch: Union[List[int], int]) -> List[int]:
     """
     convert a channel number or a list of ch numbers to list of integers
@@ -0,0 +1,135 @@
+"""
+Coordinated acquisition on several boards at once.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, BrokenBarrierError, Event, Lock
+
+
+def acquire_multi(
+    boards,
+    trigger=None,
+    start_src="external",
+    poll_interval=0.01,
+    arm_timeout=10,
+    **kwargs,
+):
+    """Run acquire() on several boards concurrently, so the total time is that of the slowest board rather than the sum.
+
+    Each board is driven by its own thread, which configures the board, runs the rounds and reads the streamed data.
+    The boards are armed for external start by default.
+    If a trigger function is given, every round is synchronized: once all the boards have started their readouts and their tProcs are waiting for a trigger, trigger() is called once to start them all.
+    Otherwise, the triggers must come from elsewhere (or use start_src="internal" to run the boards independently).
+    With synchronized rounds, once any board stops (because it finished, met a stopping criterion such as target_sem, or was stopped with set_early_stop()),
+    there are no more triggers, so the other boards stop after their current round and return the averages of the rounds they completed.
+
+    A board that stops in the middle of a round has its tProc and streamer stopped (see QickSoc.stop_readout()), so it can't be started by a later trigger.
+    If an acquisition fails, the others are stopped, and the first error is raised.
+
+    External start is only implemented for tProc v1, so synchronized rounds need tProc v1 boards.
+    For tProc v2 boards you must use start_src="internal"; the boards then run independently.
+
+    Parameters
+    ----------
+    boards : list of (QickSoc, AcquireMixin)
+        the boards (QickSoc objects or Pyro proxies) and the program to run on each
+    trigger : callable
+        function with no arguments that sends the start trigger to all the boards
+    start_src : str
+        "internal" or "external" (see acquire()); "external" raises an error if any board has a tProc v2
+    poll_interval : float
+        how long each thread sleeps when its board has no new data (in seconds)
+    arm_timeout : float
+        how long to wait for a board's tProc to be armed in each round, and then for the other boards to be armed (in seconds)
+    **kwargs
+        other parameters for acquire(); progress bars are off by default
+
+    Returns
+    -------
+    list
+        the output of acquire() (averages and standard deviations) for each board, in the same order as boards
+    """
+    kwargs.setdefault("progress", False)
+    if start_src == "external":
+        for soc, prog in boards:
+            if prog.tproccfg["type"] == "qick_processor":
+                raise RuntimeError(
+                    "external start is not implemented for tProc v2, so the boards can't be synchronized; use start_src='internal'"
+                )
+    # set when any board stops, so the boards waiting for it know to stop instead of reporting a timeout
+    stopping = Event()
+    # errors in the order they happened
+    errors = []
+    errors_lock = Lock()
+
+    def fail(e):
+        with errors_lock:
+            errors.append(e)
+        stopping.set()
+
+    def send_trigger():
+        # if the trigger fails, the barrier breaks: record the error before the other boards see that
+        try:
+            trigger()
+        except BaseException as e:
+            fail(e)
+            raise
+
+    barrier = None
+    if trigger is not None:
+        barrier = Barrier(len(boards), action=send_trigger)
+
+    def on_round_start(soc, ir):
+        if barrier is None:
+            return True
+        if not soc.wait_readout_started(timeout=arm_timeout):
+            raise RuntimeError(
+                "timed out waiting for the tProc to start in round %d" % ir
+            )
+        try:
+            barrier.wait(timeout=arm_timeout)
+        except BrokenBarrierError:
+            # the barrier breaks when a wait times out, or when a board stops or fails
+            if not stopping.is_set():
+                raise RuntimeError(
+                    "timed out waiting for the other boards to be armed in round %d"
+                    % ir
+                )
+            # there will be no trigger for this round
+            return False
+        return True
+
+    def run(soc, prog):
+        try:
+            for chunk in prog.acquire_iter(
+                soc,
+                start_src=start_src,
+                block=False,
+                on_round_start=lambda ir: on_round_start(soc, ir),
+                **kwargs,
+            ):
+                if chunk is None:
+                    time.sleep(poll_interval)
+        except BaseException as e:
+            if e not in errors:
+                fail(e)
+            # stop the other boards in the middle of their rounds (this also aborts their readouts)
+            for other_soc, other_prog in boards:
+                other_prog.early_stop = True
+            raise
+        finally:
+            # don't leave the other boards waiting for this one
+            stopping.set()
+            if barrier is not None:
+                barrier.abort()
+        return prog.avg_d, prog.std_d
+
+    with ThreadPoolExecutor(max_workers=len(boards)) as executor:
+        futures = [executor.submit(run, soc, prog) for soc, prog in boards]
+        for f in futures:
+            f.exception()
+
+    if errors:
+        raise errors[0]
+    return [f.result() for f in futures]
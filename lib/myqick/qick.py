@@ -18,9 +18,11 @@ from .asm_v2 import QickProgramV2
 from .drivers.generator import *
 from .drivers.readout import *
 from .drivers.tproc import *
+from .helpers import pmem_digest
 from .ip import QickMetadata, SocIp
 from .parser import parse_to_bin
 from .qick_asm import QickConfig
+from .shadow import ConfigShadow
 from .streamer import DataStreamer
 
 
@@ -468,6 +470,11 @@ class QickSoc(Overlay, QickConfig):
         self._cfg = {}
         QickConfig.__init__(self)
 
+        # shadow of the configuration written to the firmware, for skipping redundant writes (off by default)
+        self.shadow = ConfigShadow()
+        # digest of the program memory of the loaded tProc v2 program (see update_dmem())
+        self._loaded_pmem = None
+
         self["board"] = os.environ["BOARD"]
         self["sw_version"] = get_version()
 
@@ -850,7 +857,7 @@ class QickSoc(Overlay, QickConfig):
                 xrfclk.xrfclk._Config["lmk04828"][lmk_freq][80] = 0x01470A
             xrfclk.set_ref_clks(lmk_freq=lmk_freq, lmx_freq=lmx_freq)
 
-    def get_decimated(self, ch, address=0, length=None):
+    def get_decimated(self, ch, address=0, length=None, out=None, chunk=None):
         """
         Acquires data from the readout decimated buffer
 
@@ -860,6 +867,10 @@ class QickSoc(Overlay, QickConfig):
         :type address: int
         :param length: Buffer transfer length
         :type length: int
+        :param out: If given, the data is copied from the DMA buffer straight into this array (shape (length, 2)) and no other copy is made
+        :type out: numpy.ndarray
+        :param chunk: Maximum number of samples per DMA transfer (None = transfer everything at once)
+        :type chunk: int
         :return: List of I and Q decimated arrays
         :rtype: list of numpy.ndarray
         """
@@ -867,20 +878,29 @@ class QickSoc(Overlay, QickConfig):
             # this default will always cause a RuntimeError
             # TODO: remove the default, or pick a better fallback value
             length = self.avg_bufs[ch]["buf_maxlen"]
+        if out is None:
+            out = np.empty((length, 2), dtype=np.int16)
+        if chunk is None:
+            chunk = max(length, 1)
+
+        for start in range(0, length, chunk):
+            n = min(chunk, length - start)
+            # we must transfer an even number of samples, so we pad the transfer size
+            transfer_len = n + n % 2
+
+            # there is a bug which causes the first sample of a transfer to always be the sample at address 0
+            # we work around this by requesting an extra 2 samples at the beginning
+            data = self.avg_bufs[ch].transfer_buf(
+                (address + start - 2) % self.avg_bufs[ch]["buf_maxlen"],
+                transfer_len + 2,
+                copy=False,
+            )
 
-        # we must transfer an even number of samples, so we pad the transfer size
-        transfer_len = length + length % 2
-
-        # there is a bug which causes the first sample of a transfer to always be the sample at address 0
-        # we work around this by requesting an extra 2 samples at the beginning
-        data = self.avg_bufs[ch].transfer_buf(
-            (address - 2) % self.avg_bufs[ch]["buf_maxlen"], transfer_len + 2
-        )
-
-        # we remove the padding here
-        return data[2 : length + 2]
+            # we remove the padding here
+            out[start : start + n] = data[2 : n + 2]
+        return out
 
-    def get_accumulated(self, ch, address=0, length=None):
+    def get_accumulated(self, ch, address=0, length=None, out=None):
         """
         Acquires data from the readout accumulated buffer
 
@@ -890,6 +910,8 @@ class QickSoc(Overlay, QickConfig):
         :type address: int
         :param length: Buffer transfer length
         :type length: int
+        :param out: If given, the data is copied from the DMA buffer straight into this array (shape (length, 2)) and no other copy is made
+        :type out: numpy.ndarray
         :returns:
             - di[:length] (:py:class:`list`) - list of accumulated I data
             - dq[:length] (:py:class:`list`) - list of accumulated Q data
@@ -905,10 +927,15 @@ class QickSoc(Overlay, QickConfig):
         # there is a bug which causes the first sample of a transfer to always be the sample at address 0
         # we work around this by requesting an extra 2 samples at the beginning
         data = self.avg_bufs[ch].transfer_avg(
-            (address - 2) % self.avg_bufs[ch]["avg_maxlen"], transfer_len + 2
+            (address - 2) % self.avg_bufs[ch]["avg_maxlen"],
+            transfer_len + 2,
+            copy=out is None,
         )
 
         # we remove the padding here
+        if out is not None:
+            np.copyto(out, data[2 : length + 2])
+            return out
         return data[2 : length + 2]
 
     def configure_readout(self, ch, ro_regs):
@@ -922,6 +949,8 @@ class QickSoc(Overlay, QickConfig):
         ro_regs : dict
             readout registers, from QickConfig.calc_ro_regs()
         """
+        if not self.shadow.check(("readout", ch), ro_regs):
+            return
         buf = self.avg_bufs[ch]
         buf.readout.set_all_int(ro_regs)
 
@@ -995,6 +1024,8 @@ class QickSoc(Overlay, QickConfig):
         """
         # we may have converted to list for pyro compatiblity, so convert back to ndarray
         data = np.array(data, dtype=np.int16)
+        if not self.shadow.check_block(("envelope", ch), addr, len(data), data):
+            return
         return self.gens[ch].load(xin=data, addr=addr)
 
     def set_nyquist(self, ch, nqz, force=False):
@@ -1045,6 +1076,8 @@ class QickSoc(Overlay, QickConfig):
             Tones to configure.
             This is generated by QickConfig.calc_muxgen_regs().
         """
+        if not self.shadow.check(("mux_gen", ch), tones):
+            return
         self.gens[ch].set_tones_int(tones)
 
     def config_mux_readout(self, pfbpath, cfgs, sel=None):
@@ -1060,6 +1093,8 @@ class QickSoc(Overlay, QickConfig):
         sel : str
             Output selection (if supported), default to 'product'
         """
+        if not self.shadow.check(("mux_readout", pfbpath), [cfgs, sel]):
+            return
         pfb = getattr(self, pfbpath)
         if pfb.HAS_OUTSEL:
             if sel is None:
@@ -1107,7 +1142,22 @@ class QickSoc(Overlay, QickConfig):
         load_mem : bool
             write waveform and data memory now (can do this later with reload_mem())
         """
-        self.tproc.load_bin_program(obtain(binprog), load_mem=load_mem)
+        binprog = obtain(binprog)
+        if self.TPROC_VERSION == 1:
+            # the program memory isn't modified by running the program, so we can skip rewriting it
+            pmem = np.asarray(binprog)
+            if self.shadow.check_block(("pmem",), 0, len(pmem), pmem):
+                self.tproc.load_bin_program(binprog, load_mem=load_mem)
+        elif self.TPROC_VERSION == 2:
+            # if the shadow knows what's in the program memory, the tProc driver writes only the changes
+            # (it knows whether the program has run and changed the waveform and data memory, in which case they're rewritten in full)
+            pmem = np.asarray(binprog["pmem"])
+            self._loaded_pmem = pmem_digest(pmem)
+            incremental = self.shadow.has_blocks(("pmem",))
+            self.shadow.check_block(("pmem",), 0, len(pmem), pmem)
+            self.tproc.load_bin_program(
+                binprog, load_mem=load_mem, incremental=incremental
+            )
 
     def reload_mem(self):
         """Reload the waveform and data memory, overwriting any changes made by running the program."""
@@ -1138,6 +1188,36 @@ class QickSoc(Overlay, QickConfig):
         elif self.TPROC_VERSION == 2:
             self.tproc.load_mem(mem_sel, buff, addr)
 
+    def update_dmem(self, buff, addr=0, prog_digest=None):
+        """
+        Write a block of the tProc v2 data memory, and keep the change when the data memory is reloaded.
+        The block is also patched into the data memory image of the loaded program, which reload_mem() writes before each run.
+        This is used by QickProgramV2.update_params() to change runtime parameters without reloading the program.
+        The block must fit inside the data memory of the loaded program.
+
+        :param buff: values to write (signed 32-bit)
+        :type buff: list of int
+        :param addr: starting address
+        :type addr: int
+        :param prog_digest: if given, only write if this matches the loaded program (see helpers.pmem_digest())
+        :type prog_digest: str
+        """
+        buff = obtain(buff)
+        if prog_digest is not None and prog_digest != self._loaded_pmem:
+            raise RuntimeError(
+                "can't update the data memory: the loaded program is not the one the update is for"
+            )
+        # the change must land inside the loaded data memory image, or it would be lost on the next reload
+        binprog = getattr(self.tproc, "binprog", None)
+        dmem = None if binprog is None else binprog["dmem"]
+        if dmem is None or addr < 0 or addr + len(buff) > len(dmem):
+            raise RuntimeError(
+                "can't update data memory addresses %d-%d: the loaded program's data memory has %d words"
+                % (addr, addr + len(buff) - 1, 0 if dmem is None else len(dmem))
+            )
+        self.tproc.load_mem("dmem", np.array(buff, dtype=np.int32), addr)
+        dmem[addr : addr + len(buff)] = buff
+
     def read_mem(self, length, mem_sel="dmem", addr=0):
         """
         Read a block of the selected tProc memory.
@@ -1247,6 +1327,70 @@ class QickSoc(Overlay, QickConfig):
             reg = {1: "axi_r_dt1", 2: "axi_r_dt2"}[addr]
             return getattr(self.tproc, reg)
 
+    def wait_tproc_counter(
+        self,
+        addr,
+        count,
+        timeout=None,
+        expected_time=None,
+        min_interval=1e-4,
+        max_interval=0.01,
+    ):
+        """
+        Wait until the tProc shot counter reaches a value.
+        Instead of reading the counter as fast as possible, this sleeps between reads:
+        for the expected time (if given), then for half the time the counter is expected to need to reach the target at its measured rate,
+        or with exponential backoff if the counter isn't moving.
+        Over Pyro, the whole wait is a single remote call.
+
+        Parameters
+        ----------
+        addr : int
+            Counter address
+        count : int
+            Counter value to wait for
+        timeout : float
+            Return after this many seconds, even if the counter hasn't reached the value (None = wait forever)
+        expected_time : float
+            How long the counter is expected to take to reach the value (in seconds), if known: e.g. the duration of the previous run
+        min_interval : float
+            Shortest time between counter reads (in seconds)
+        max_interval : float
+            Longest time between counter reads (in seconds)
+
+        Returns
+        -------
+        int
+            Counter value; less than count if the timeout expired first
+        """
+        t_start = time.time()
+        t_end = None if timeout is None else t_start + timeout
+        if expected_time:
+            # the counter might run a bit faster than expected, so don't sleep all the way
+            wait = 0.9 * expected_time
+            if t_end is not None:
+                wait = min(wait, t_end - t_start)
+            time.sleep(max(0, wait))
+        first = last = self.get_tproc_counter(addr)
+        t_first = time.time()
+        interval = min_interval
+        while last < count:
+            now = time.time()
+            if t_end is not None and now >= t_end:
+                break
+            if last > first:
+                rate = (last - first) / (now - t_first)
+                wait = 0.5 * (count - last) / rate
+            else:
+                wait = interval
+                interval = min(2 * interval, max_interval)
+            wait = min(max(wait, min_interval), max_interval)
+            if t_end is not None:
+                wait = min(wait, t_end - now)
+            time.sleep(wait)
+            last = self.get_tproc_counter(addr)
+        return last
+
     def reset_gens(self):
         """
         Reset the tProc and run a minimal tProc program that drives all signal generators with 0's.
@@ -1279,11 +1423,19 @@ class QickSoc(Overlay, QickConfig):
                 prog.pulse(ch=gen, name="dummypulse", t=0)
             prog.end()
         self.tproc.reset()
+        # the reset may have erased the program memory
+        self.shadow.invalidate("pmem")
         # this should always run with internal trigger
         prog.run(self, start_src="internal")
 
     def start_readout(
-        self, total_shots, counter_addr=1, ch_list=None, reads_per_shot=1, stride=None
+        self,
+        total_shots,
+        counter_addr=1,
+        ch_list=None,
+        reads_per_shot=1,
+        stride=None,
+        zero_copy=False,
     ):
         """
         Start a streaming readout of the accumulated buffers.
@@ -1297,7 +1449,11 @@ class QickSoc(Overlay, QickConfig):
         :param reads_per_shot: Number of data points to expect per counter increment
         :type reads_per_shot: list of int
         :param stride: Default number of measurements to transfer at a time.
-        :type stride: int
+            "auto" adapts the transfer size and polling interval to the measured shot rate and DMA latency (see AdaptiveStride).
+        :type stride: int or str
+        :param zero_copy: Stream the data through the streamer's preallocated ring buffer, and return views of the ring from poll_data().
+            The caller must call release_data() once it's done with each packet, or the readout will stall.
+        :type zero_copy: bool
         """
         ch_list = obtain(ch_list)
         reads_per_shot = obtain(reads_per_shot)
@@ -1333,14 +1489,118 @@ class QickSoc(Overlay, QickConfig):
             self.poll_data(totaltime=-1, timeout=0.1)
             print("buffer cleared")
 
+        if zero_copy:
+            streamer.setup_ring(ch_list)
+
         streamer.total_count = total_shots
         streamer.count = 0
 
         streamer.done_flag.clear()
+        streamer.started_flag.clear()
         streamer.job_queue.put(
-            (total_shots, counter_addr, ch_list, reads_per_shot, stride)
+            (total_shots, counter_addr, ch_list, reads_per_shot, stride, zero_copy)
         )
 
+    def wait_readout_started(self, timeout=None):
+        """
+        Wait until the streamer has started the tProc for the readout started by start_readout().
+        With external start, the tProc is then armed and waiting for a trigger.
+
+        :param timeout: How long to wait, in seconds (None = wait forever)
+        :type timeout: float
+        :return: True if the tProc was started, False if the timeout expired
+        :rtype: bool
+        """
+        return self.streamer.started_flag.wait(timeout)
+
+    def stop_readout(self):
+        """
+        Abort the readout started by start_readout().
+        The tProc is stopped first, so a program that is armed for an external start can't be started by a later trigger;
+        then the streamer loop is stopped, and any data it has queued is discarded.
+        After a zero-copy readout, the arrays returned by poll_data() are invalid once this returns.
+        """
+        streamer = self.streamer
+        self.stop_tproc()
+        streamer.stop_readout()
+        streamer.done_flag.wait()
+        while True:
+            try:
+                streamer.data_queue.get(block=False)
+            except queue.Empty:
+                break
+        if streamer.ring is not None:
+            streamer.ring.reset()
+
+    def release_data(self, npackets=1):
+        """
+        Release packets returned by poll_data() during a zero-copy readout, so the streamer can reuse their space.
+        Packets must be released in the order they were received.
+        Once a packet is released, its arrays will be overwritten by later data.
+
+        :param npackets: Number of packets to release, oldest first (None = all of them)
+        :type npackets: int
+        """
+        if self.streamer.ring is not None:
+            self.streamer.ring.release(npackets)
+
+    def enable_config_shadow(self, enable=True):
+        """
+        Turn on (or off) skipping of redundant configuration writes.
+        When enabled, the QickSoc keeps content hashes of the readout and mux settings, generator envelopes and tProc program memory it has written,
+        and skips writes that wouldn't change anything, so reloading the same or a similar program is faster.
+        For tProc v2, only the changed parts of the tProc memories are written (see get_tproc_load_stats()).
+        (Nyquist zones and mixer frequencies are always shadowed by the RF data converter driver.)
+
+        The shadow only knows about writes made through the QickSoc methods.
+        If you change the firmware state some other way, call invalidate_config_shadow().
+
+        :param enable: True to enable
+        :type enable: bool
+        """
+        self.shadow.enabled = enable
+        self.shadow.invalidate()
+
+    def invalidate_config_shadow(self, category=None):
+        """
+        Forget the shadowed configuration, so everything is written on the next load.
+
+        :param category: only forget this category ("readout", "mux_gen", "mux_readout", "envelope", "pmem"), or None for all
+        :type category: str
+        """
+        self.shadow.invalidate(category)
+
+    def get_config_shadow_stats(self):
+        """
+        Get the number of configuration writes that were applied and skipped, by category.
+
+        :return: {"applied": n, "skipped": n} for each category
+        :rtype: dict
+        """
+        return self.shadow.get_stats()
+
+    def get_tproc_load_stats(self):
+        """
+        Get the number of bytes written to each tProc v2 memory by program loads,
+        and the number not written because they were unchanged (see enable_config_shadow()).
+
+        :return: {"bytes_written": n, "bytes_saved": n} for each memory
+        :rtype: dict
+        """
+        if self.TPROC_VERSION == 2:
+            return self.tproc.get_load_stats()
+        return {}
+
+    def get_streamer_telemetry(self):
+        """
+        Get the streamer's metrics for the current (or most recent) streaming readout: DMA transfer times and accumulated buffer fill fractions per channel, shot counter polling intervals, data queue depth, and time to first data.
+        See StreamerTelemetry for details.
+
+        :return: metrics
+        :rtype: dict
+        """
+        return self.streamer.telemetry.snapshot()
+
     def poll_data(self, totaltime=0.1, timeout=None):
         """
         Get as much data as possible from the streamer data queue.
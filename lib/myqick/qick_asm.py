@@ -4,12 +4,17 @@ This contains tools for managing the board configuration and the base class for
 The assembly language for QICK programs is defined separately for the v1 and v2 tProcessors.
 """
 
+import asyncio
 import functools
 import json
 import logging
+import math
 import operator
+import os
+import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 
 import numpy as np
@@ -17,6 +22,8 @@ from tqdm.auto import tqdm
 
 from myqick import get_version, obtain
 
+from .accumulate import HistogramAccumulator, WelfordAccumulator
+from .compile_cache import get_compile_cache
 from .helpers import (
     DRAG,
     cosine,
@@ -27,9 +34,13 @@ from .helpers import (
     to_int,
     triang,
 )
+from .sinks import prog_attrs
 
 logger = logging.getLogger(__name__)
 
+# one chunk of streamed data, as yielded by AcquireMixin.acquire_iter()
+AcquireChunk = namedtuple("AcquireChunk", ["round", "shots", "data", "stats"])
+
 
 class QickConfig:
     """Uses the QICK configuration to convert frequencies and clock delays.
@@ -1083,6 +1094,9 @@ class AbsQickProgram(ABC):
     GAUSS_BUG = False
     # if true, downconversion frequencies are sign-flipped, so they are subtracted from the signal instead of added
     FLIP_DOWNCONVERSION = False
+    # names of the attributes (typically constructor arguments) that, together with the firmware config and the program class, determine the compiled program
+    # programs with an empty list don't use the compile cache (see compile_cache.py)
+    CACHE_KEYS = []
 
     def __init__(self, soccfg):
         """
@@ -1126,6 +1140,8 @@ class AbsQickProgram(ABC):
 
         # binary program, ready to execute
         self.binprog = None
+        # envelopes converted for loading, see prepare()
+        self._staged_pulses = None
 
     def __getattr__(self, a):
         """
@@ -1147,6 +1163,22 @@ class AbsQickProgram(ABC):
         """Fills self.binprog with a binary representation of the program."""
         ...
 
+    def prepare(self):
+        """Do the host-side work of config_all() ahead of time, so loading the program only needs to talk to the hardware.
+        This compiles the program (if it hasn't been compiled) and converts the envelopes to the format used for loading.
+        It doesn't touch the QickSoc, so it can run in another thread while a different program is running (see batch.run_batch()).
+        """
+        if self.binprog is None:
+            self.compile()
+        # for pyro compatibility, convert numpy arrays to Python lists
+        staged = []
+        for iCh, pulses in enumerate(self.envelopes):
+            for name, pulse in pulses["envs"].items():
+                data = pulse["data"]
+                assert data.dtype == np.int16
+                staged.append((iCh, data.tolist(), pulse["addr"]))
+        self._staged_pulses = staged
+
     def dump_prog(self):
         """
         Dump the program to a dictionary.
@@ -1166,6 +1198,10 @@ class AbsQickProgram(ABC):
         """
         for key in self.dump_keys:
             setattr(self, key, progdict[key])
+        self._staged_pulses = None
+        # the dump may include the binary program (see _cache_store())
+        if "binprog" in progdict:
+            self.binprog = progdict["binprog"]
 
         # tweak data structures that got screwed up by JSON:
         # in JSON, dict keys are always strings, so we must cast back to int
@@ -1176,6 +1212,42 @@ class AbsQickProgram(ABC):
             for name, env in envdict["envs"].items():
                 env["data"] = decode_array(env["data"])
 
+    def _cache_lookup(self):
+        """Look up this program in the compile cache (see compile_cache.set_compile_cache()), and load it if it's there.
+        This should be called before the program is built.
+
+        Returns
+        -------
+        dict, str
+            the cache entry, if the program was loaded from the cache (None otherwise);
+            the key to pass to _cache_store() once the program is compiled (None if it was loaded or can't be cached)
+        """
+        cache = get_compile_cache()
+        if cache is None or not self.CACHE_KEYS:
+            return None, None
+        key = cache.key(self)
+        if key is None:
+            return None, None
+        progdict = cache.get(key)
+        if progdict is None:
+            return None, key
+        self.load_prog(progdict)
+        return progdict, None
+
+    def _cache_store(self, key, **extra):
+        """Store this program in the compile cache, after compiling it.
+
+        Parameters
+        ----------
+        key : str
+            the key from _cache_lookup()
+        **extra
+            additional JSON-serializable data to store with the program, returned in the cache entry by _cache_lookup()
+        """
+        cache = get_compile_cache()
+        if key is not None and cache is not None:
+            cache.put(key, {**self.dump_prog(), "binprog": self.binprog, **extra})
+
     def config_all(self, soc, load_pulses=True, reset=False, load_mem=True):
         """
         Load the waveform memory, gens, ROs, and program memory as specified for this program.
@@ -1565,6 +1637,8 @@ class AbsQickProgram(ABC):
                 # copy data
                 data[:, i] = np.round(d)
 
+        # any staged envelopes are out of date
+        self._staged_pulses = None
         self.envelopes[ch]["envs"][name] = {
             "data": data,
             "addr": self.envelopes[ch]["next_addr"],
@@ -1767,12 +1841,10 @@ class AbsQickProgram(ABC):
             Qick object
 
         """
-        # for pyro compatibility, convert numpy arrays to Python lists
-        for iCh, pulses in enumerate(self.envelopes):
-            for name, pulse in pulses["envs"].items():
-                data = pulse["data"]
-                assert data.dtype == np.int16
-                soc.load_pulse_data(iCh, data=data.tolist(), addr=pulse["addr"])
+        if self._staged_pulses is None:
+            self.prepare()
+        for iCh, data, addr in self._staged_pulses:
+            soc.load_pulse_data(iCh, data=data, addr=addr)
 
     def reset_timestamps(self, gen_t0=None):
         # used by init and sync_all()
@@ -1842,6 +1914,11 @@ class AcquireMixin:
     Program classes that use this mixin must call setup_acquire() after _init_prog() and before acquire()/acquire_decimated().
     """
 
+    # number of reads thresholded at a time by _apply_threshold()
+    THRESHOLD_BLOCK = 2**16
+    # longest single wait for the shot counter (in seconds), between checks for early stop and progress bar updates
+    WAIT_SLICE = 0.1
+
     def __init__(self, *args, **kwargs):
         # pass through any init arguments
         super().__init__(*args, **kwargs)
@@ -1854,6 +1931,9 @@ class AcquireMixin:
         self.acc_buf = None
         # shot-by-shot threshold classification
         self.shots = None
+        # averaged IQ values and their standard deviations
+        self.avg_d = None
+        self.std_d = None
 
         self.early_stop = False
 
@@ -1932,14 +2012,22 @@ class AcquireMixin:
         """
         return self.acc_buf
 
-    def get_shots(self):
+    def get_shots(self, packed=False):
         """Get the shot-by-shot threshold decisions.
 
+        Parameters
+        ----------
+        packed : bool
+            If True, pack the shots 8 to a byte with numpy.packbits().
+            Each channel's array is flattened first; use numpy.unpackbits(a, count=n).reshape(shape) to unpack it.
+
         Returns
         -------
         list of numpy.ndarray
-            Array of shots for each readout channel.
+            Array of shots (uint8, 0 or 1) for each readout channel.
         """
+        if packed and self.shots is not None:
+            return [np.packbits(s, axis=None) for s in self.shots]
         return self.shots
 
     def set_early_stop(self) -> None:
@@ -1958,6 +2046,16 @@ class AcquireMixin:
         progress=True,
         remove_offset=True,
         callback=None,
+        online=False,
+        save_raw=False,
+        stride=None,
+        pipelined=False,
+        spill_dir=None,
+        sink=None,
+        target_sem=None,
+        rtol=None,
+        time_budget=None,
+        min_rounds=2,
     ):
         """Acquire data using the accumulated readout.
 
@@ -1986,6 +2084,40 @@ class AcquireMixin:
         remove_offset: bool
             Some readouts (muxed and tProc-configured) introduce a small fixed offset to the I and Q values of every decimated sample.
             This subtracts that offset, if any, before returning the averaged IQ values or rotating to apply software thresholding.
+        online: bool
+            Fold each chunk of streamed data into a running mean and variance as it arrives, instead of buffering every shot and averaging at the end of the round.
+            Memory then scales with the size of the averaged result rather than the number of shots.
+            The round results are computed directly, so a custom _average_buf() is not used.
+        save_raw: bool
+            In online mode, also keep the raw shots (and threshold decisions, if thresholding) so they are available from get_raw() and get_shots().
+            Ignored if online is False, since the raw shots are always kept in that case.
+        stride: int or str
+            Number of shots the streamer transfers at a time (see QickSoc.start_readout()).
+            None uses a fixed default; "auto" adapts the transfer size and polling interval to the shot rate, which helps to avoid overflows for fast programs and reduces CPU load for slow ones.
+        pipelined: bool
+            Start each round as soon as the previous round's data has been read, and average the previous round in a worker thread while the next one runs.
+            This keeps the tProc busy when there are many rounds and the averaging is slow.
+            The callback for each round is called from the worker thread, while the next round is running;
+            a round doesn't start until the round before the previous one has been averaged and its callback has returned, so a callback that takes longer than a round still holds up the tProc.
+            The raw buffer is double-buffered (so uses twice the memory) unless online is True.
+        spill_dir: str
+            Directory for storing the raw shots (and threshold decisions, if thresholding) in memory-mapped .npy files instead of RAM, for datasets too large to fit in memory.
+            The files are filled in as the data arrives; get_raw() and get_shots() return the memory-mapped arrays, and the files can be reopened later with numpy.load().
+            This implies online=True and save_raw=True, so the averages are computed without reading back the files.
+        sink: AbsDataSink
+            Write the data to disk as it arrives (see myqick.sinks).
+            The raw I/Q values of each readout channel are written as they're read out, to datasets named "raw_<i>" with shape (soft_avgs, total_shots*n_reads, 2), where i is the channel's index in the program's readout list.
+            The averaged results are written as "avg_<i>" and "std_<i>" at the end, along with the number of rounds completed.
+            The program and its loop structure are saved as metadata.
+        target_sem: float
+            Stop before soft_avgs rounds if the standard error of every averaged I and Q value is at most this (in the same units as the output).
+            The standard error is estimated from the spread of the single shots, assuming they are independent.
+        rtol: float
+            Stop before soft_avgs rounds if the standard error of every averaged IQ point is at most this fraction of the point's magnitude.
+        time_budget: float
+            Stop before soft_avgs rounds if another round would take the total acquisition time over this many seconds (based on the average round time so far).
+        min_rounds: int
+            Minimum number of rounds before target_sem or rtol can stop the acquisition.
 
         Returns
         -------
@@ -1996,6 +2128,85 @@ class AcquireMixin:
             dimensions for a simple averaging program: (n_ch, n_reads, 2)
             dimensions for a program with multiple expts/steps: (n_ch, n_reads, n_expts, 2)
         """
+        for _ in self.acquire_iter(
+            soc,
+            soft_avgs=soft_avgs,
+            load_pulses=load_pulses,
+            start_src=start_src,
+            threshold=threshold,
+            angle=angle,
+            progress=progress,
+            remove_offset=remove_offset,
+            callback=callback,
+            online=online,
+            save_raw=save_raw,
+            stride=stride,
+            pipelined=pipelined,
+            spill_dir=spill_dir,
+            sink=sink,
+            target_sem=target_sem,
+            rtol=rtol,
+            time_budget=time_budget,
+            min_rounds=min_rounds,
+        ):
+            pass
+        return self.avg_d, self.std_d
+
+    def acquire_iter(
+        self,
+        soc,
+        soft_avgs=1,
+        load_pulses=True,
+        start_src="internal",
+        threshold=None,
+        angle=None,
+        progress=True,
+        remove_offset=True,
+        callback=None,
+        online=False,
+        save_raw=False,
+        stride=None,
+        pipelined=False,
+        spill_dir=None,
+        sink=None,
+        target_sem=None,
+        rtol=None,
+        time_budget=None,
+        min_rounds=2,
+        block=True,
+        on_round_start=None,
+    ):
+        """Acquire data using the accumulated readout, yielding the data as it's streamed.
+        This is a generator version of acquire(), for processing data as it arrives (e.g. live plotting or feedback) without waiting for all rounds to finish.
+        The parameters are the same as for acquire(), plus:
+
+        Parameters
+        ----------
+        block : bool
+            If True, wait for each chunk of data.
+            If False, never wait for the streamer: yield None whenever no new data is available, so the caller can do other work and resume later (see acquire_async()).
+        on_round_start : callable
+            Called with the round index after each round's readout has been started (see multiboard.acquire_multi()).
+            If it returns False, the round is called off and the acquisition ends with the rounds that were already completed.
+
+        Whenever a round ends before all its data has been read (it was called off or stopped early, or the generator was closed or failed),
+        the readout is aborted with QickSoc.stop_readout(), which stops the tProc and the streamer.
+
+        Each chunk of data read by the streamer is yielded as an AcquireChunk record, with fields:
+
+        * round: index of the soft-averaging round
+        * shots: range of shot numbers in this chunk (counting from the start of the round, in loop order)
+        * data: list of raw I/Q arrays (one per readout channel), shape (n_shots*n_reads, 2)
+        * stats: streamer statistics for this chunk
+
+        The data arrays are views of the streamer's buffers, and are only valid until the next chunk is requested; copy them if you need to keep them.
+        When the generator is exhausted, the averages (the return values of acquire()) are available as self.avg_d and self.std_d.
+
+        Yields
+        ------
+        AcquireChunk or None
+            the next chunk of data (None if not blocking and no data was ready)
+        """
 
         self.early_stop = False
 
@@ -2015,10 +2226,42 @@ class AcquireMixin:
         n_ro = len(self.ro_chs)
 
         total_count = functools.reduce(operator.mul, self.loop_dims)
-        self.acc_buf = [
-            np.zeros((*self.loop_dims, nreads, 2), dtype=np.int64)
-            for nreads in self.reads_per_shot
-        ]
+        if spill_dir is not None:
+            # averaging a spilled buffer would read it all back into memory, so average online
+            os.makedirs(spill_dir, exist_ok=True)
+            online = True
+            save_raw = True
+        keep_raw = save_raw or not online
+        if keep_raw:
+            # when pipelined, we fill one buffer while the other one is being averaged
+            nbufs = 2 if pipelined and not online else 1
+            bufs = [
+                [
+                    self._alloc_buf(
+                        spill_dir,
+                        "raw_%d_%d" % (i_ch, i),
+                        (*self.loop_dims, nreads, 2),
+                        np.int64,
+                    )
+                    for i_ch, nreads in enumerate(self.reads_per_shot)
+                ]
+                for i in range(nbufs)
+            ]
+            self.acc_buf = bufs[0]
+        else:
+            self.acc_buf = None
+        # don't leave shots from a previous acquisition
+        self.shots = None
+        if online and threshold is not None and save_raw:
+            self.shots = [
+                self._alloc_buf(
+                    spill_dir,
+                    "shots_%d" % i_ch,
+                    (*self.loop_dims, nreads),
+                    np.uint8,
+                )
+                for i_ch, nreads in enumerate(self.reads_per_shot)
+            ]
         self.stats = []
 
         # select which tqdm progress bar to show
@@ -2033,70 +2276,15 @@ class AcquireMixin:
         # avg_d doesn't have a specific shape here, so that it's easier for child programs to write custom _average_buf
         sum_d = None
         sum2_d = None
-        for ir in tqdm(range(soft_avgs), disable=hiderounds):
-            # Configure and enable buffer capture.
-            self.config_bufs(soc, enable_avg=True, enable_buf=False)
-
-            # Reload data memory.
-            soc.reload_mem()
+        # number of rounds in the sums, and whether they meet the stopping criteria
+        n_summed = 0
+        converged = False
 
-            count = 0
-            with tqdm(total=total_count, disable=hidereps) as pbar:
-                soc.start_readout(
-                    total_count,
-                    counter_addr=self.counter_addr,
-                    ch_list=list(self.ro_chs),
-                    reads_per_shot=self.reads_per_shot,
-                )
-                while count < total_count and not self.early_stop:
-                    new_data = obtain(soc.poll_data())
-                    for new_points, (d, s) in new_data:
-                        for ii, nreads in enumerate(self.reads_per_shot):
-                            # print(count, new_points, nreads, d[ii].shape, total_count)
-                            if new_points * nreads != d[ii].shape[0]:
-                                logger.error(
-                                    "data size mismatch: new_points=%d, nreads=%d, data shape %s"
-                                    % (new_points, nreads, d[ii].shape)
-                                )
-                            if count + new_points > total_count:
-                                logger.error(
-                                    "got too much data: count=%d, new_points=%d, total_count=%d"
-                                    % (count, new_points, total_count)
-                                )
-                            # use reshape to view the acc_buf array in a shape that matches the raw data
-                            # self.acc_buf[ii].reshape((-1,2))[count*nreads:(count+new_points)*nreads] = d[ii]
-                            c_start = count * nreads
-                            c_end = (count + new_points) * nreads
-                            buf1d = self.acc_buf[ii].reshape((-1, 2))
-                            try:
-                                buf1d[c_start:c_end] = d[ii]
-                            except Exception as e:
-                                print(e)
-                                num = buf1d[c_start:c_end].shape[0]
-                                buf1d[c_start:c_end] = d[ii][:num]
-                        count += new_points
-                        self.stats.append(s)
-                        pbar.update(new_points)
-
-            # if we're thresholding, apply the threshold before averaging
-            if threshold is None:
-                d_reps = self.acc_buf
-                round_d, round_std = self._average_buf(
-                    d_reps,
-                    self.reads_per_shot,
-                    length_norm=True,
-                    remove_offset=remove_offset,
-                )
-            else:
-                d_reps = [np.zeros_like(d) for d in self.acc_buf]
-                self.shots = self._apply_threshold(
-                    self.acc_buf, threshold, angle, remove_offset=remove_offset
-                )
-                for i, ch_shot in enumerate(self.shots):
-                    d_reps[i][..., 0] = ch_shot
-                round_d, round_std = self._average_buf(
-                    d_reps, self.reads_per_shot, length_norm=False
-                )
+        def add_round(ir, result, do_callback=True):
+            nonlocal sum_d, sum2_d, n_summed, converged
+            round_d, round_std, shots = result
+            if shots is not None:
+                self.shots = shots
 
             # sum over rounds axis
             if sum_d is None:
@@ -2111,20 +2299,286 @@ class AcquireMixin:
                 for ii, (u, o) in enumerate(zip(round_d, round_std)):
                     sum2_d[ii] += u**2 + o**2
 
-            # early stop
-            if self.early_stop:
-                soft_avgs = ir + 1  # set to the current round
-                break
+            n_summed += 1
+            if n_summed >= min_rounds:
+                converged = self._converged(sum_d, sum2_d, n_summed, target_sem, rtol)
 
             # callback
-            if callback is not None:
+            if do_callback and callback is not None:
                 callback(ir, sum_d, sum2_d)
 
-        # divide total by rounds
-        avg_d = [s / soft_avgs for s in sum_d]
-        std_d = [np.sqrt(s2 / soft_avgs - u**2) for s2, u in zip(sum2_d, avg_d)]
+        def reduce_round(ir, reduce_args, do_callback=True):
+            add_round(ir, self._reduce_round(*reduce_args), do_callback=do_callback)
+
+        # when pipelined, the future of the round being averaged in the background
+        executor = ThreadPoolExecutor(max_workers=1) if pipelined else None
+        pending = None
+        # true while a round's readout is started but not all of its data has been read
+        readout_running = False
+        t_start = time.time()
+        if sink is not None:
+            sink.open(
+                prog_attrs(self),
+                {
+                    "raw_%d" % i_ch: ((soft_avgs, total_count * nreads, 2), np.int32)
+                    for i_ch, nreads in enumerate(self.reads_per_shot)
+                },
+            )
+        try:
+            for ir in tqdm(range(soft_avgs), disable=hiderounds):
+                if keep_raw:
+                    self.acc_buf = bufs[ir % len(bufs)]
+
+                # Configure and enable buffer capture.
+                self.config_bufs(soc, enable_avg=True, enable_buf=False)
+
+                # Reload data memory.
+                soc.reload_mem()
+
+                accs = None
+                if online:
+                    accs = [
+                        WelfordAccumulator(self.loop_dims, self.avg_level, nreads)
+                        for nreads in self.reads_per_shot
+                    ]
+
+                count = 0
+                with tqdm(total=total_count, disable=hidereps) as pbar:
+                    soc.start_readout(
+                        total_count,
+                        counter_addr=self.counter_addr,
+                        ch_list=list(self.ro_chs),
+                        reads_per_shot=self.reads_per_shot,
+                        stride=stride,
+                        zero_copy=True,
+                    )
+                    readout_running = True
+                    called_off = (
+                        on_round_start is not None and on_round_start(ir) is False
+                    )
+                    while (
+                        count < total_count and not self.early_stop and not called_off
+                    ):
+                        # the packets are views of the streamer's ring buffer until we release them
+                        if block:
+                            new_data = obtain(soc.poll_data())
+                        else:
+                            new_data = obtain(soc.poll_data(totaltime=-1, timeout=0))
+                            if not new_data:
+                                yield None
+                                continue
+                        for new_points, (d, s) in new_data:
+                            if keep_raw:
+                                self._store_raw(count, new_points, total_count, d)
+                            if online:
+                                self._fold_online(
+                                    accs,
+                                    count,
+                                    new_points,
+                                    d,
+                                    threshold,
+                                    angle,
+                                    remove_offset,
+                                    save_raw,
+                                )
+                            if sink is not None:
+                                self._write_sink(sink, ir, count, new_points, d)
+                            self.stats.append(s)
+                            pbar.update(new_points)
+                            yield AcquireChunk(
+                                ir, range(count, count + new_points), d, s
+                            )
+                            count += new_points
+                        soc.release_data(len(new_data))
+
+                if count < total_count:
+                    # the round was called off or stopped early: don't leave the tProc armed or the streamer polling
+                    soc.stop_readout()
+                readout_running = False
+
+                if called_off:
+                    logger.info("round %d was called off" % (ir))
+                    soft_avgs = ir
+                    break
+
+                if spill_dir is not None:
+                    for buf in (self.acc_buf or []) + (self.shots or []):
+                        buf.flush()
+
+                reduce_args = (accs, self.acc_buf, threshold, angle, remove_offset)
+                if pipelined:
+                    # the worker averages this round and runs its callback while the next round runs
+                    future = executor.submit(
+                        reduce_round, ir, reduce_args, not self.early_stop
+                    )
+                    # finish the previous round before the next round reuses its buffer
+                    if pending is not None:
+                        pending.result()
+                    pending = future
+                else:
+                    reduce_round(ir, reduce_args, do_callback=not self.early_stop)
 
-        return avg_d, std_d
+                # early stop
+                if self.early_stop:
+                    if pending is not None:
+                        pending.result()
+                        pending = None
+                    soft_avgs = ir + 1  # set to the current round
+                    break
+
+                # stop if the results are good enough, or there's no time for another round
+                # (when pipelined, the results don't include this round yet, but it will be added)
+                elapsed = time.time() - t_start
+                out_of_time = (
+                    time_budget is not None
+                    and elapsed * (ir + 2) / (ir + 1) > time_budget
+                )
+                if ir + 1 < soft_avgs and (converged or out_of_time):
+                    logger.info(
+                        "stopping after %d rounds (%s)"
+                        % (ir + 1, "converged" if converged else "time budget")
+                    )
+                    soft_avgs = ir + 1
+                    break
+
+            if pending is not None:
+                pending.result()
+
+            if soft_avgs == 0:
+                # the first round was called off, so there's nothing to average
+                self.avg_d = None
+                self.std_d = None
+                return
+
+            # divide total by rounds
+            self.avg_d = [s / soft_avgs for s in sum_d]
+            self.std_d = [
+                np.sqrt(s2 / soft_avgs - u**2) for s2, u in zip(sum2_d, self.avg_d)
+            ]
+
+            if sink is not None:
+                for i_ch, (avg, std) in enumerate(zip(self.avg_d, self.std_d)):
+                    sink.write_array("avg_%d" % i_ch, avg)
+                    sink.write_array("std_%d" % i_ch, std)
+                sink.write_attrs({"rounds": soft_avgs})
+        finally:
+            if readout_running:
+                # an error, or the generator was closed in the middle of a round
+                soc.stop_readout()
+            if executor is not None:
+                executor.shutdown()
+            if sink is not None:
+                sink.close()
+
+    async def acquire_async(self, soc, poll_interval=0.01, **kwargs):
+        """Coroutine version of acquire(), for use with asyncio.
+        The acquisition runs in a worker thread, one chunk at a time (see acquire_iter()), so none of the calls to the QickSoc block the event loop:
+        not the configuration and program loading, the waits for averaging, or the polling (which are network calls for a remote board).
+        This lets one event loop drive acquisitions on several boards (or other instruments) concurrently.
+        If the coroutine is cancelled, the acquisition is stopped once the chunk in progress has been read.
+
+        Parameters
+        ----------
+        soc : QickSoc
+            Qick object
+        poll_interval : float
+            How long to sleep (in seconds) when no data is available
+        **kwargs
+            Other parameters are passed to acquire()
+
+        Returns
+        -------
+        list of numpy.ndarray, list of numpy.ndarray
+            averaged IQ values and their standard deviations (see acquire())
+        """
+        loop = asyncio.get_running_loop()
+        # one thread, so the generator is only ever advanced (or closed) by one call at a time
+        executor = ThreadPoolExecutor(max_workers=1)
+        chunks = self.acquire_iter(soc, block=False, **kwargs)
+        done = object()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(executor, next, chunks, done)
+                if chunk is done:
+                    break
+                # sleep if there was nothing to do
+                if chunk is None:
+                    await asyncio.sleep(poll_interval)
+        finally:
+            # if we were cancelled, this runs after the chunk in progress, and aborts the round
+            executor.submit(chunks.close)
+            executor.shutdown(wait=False)
+        return self.avg_d, self.std_d
+
+    def acquire_hist(
+        self,
+        soc,
+        hist_range,
+        bins=100,
+        soft_avgs=1,
+        load_pulses=True,
+        start_src="internal",
+        progress=True,
+        remove_offset=True,
+        stride=None,
+    ):
+        """Acquire 2D histograms of the single-shot IQ values, e.g. for readout calibration.
+        Each chunk of streamed data is binned as it arrives and then discarded, so memory is fixed no matter how many shots are taken.
+        The shots are binned in the same units as the output of acquire(): normalized by the readout window length, and with the readout offset removed if remove_offset is True.
+
+        The data is acquired in online mode (see acquire()), so the averages are also available afterwards as self.avg_d and self.std_d.
+
+        Parameters
+        ----------
+        soc : QickSoc
+            Qick object
+        hist_range : ((float, float), (float, float)) or list
+            Lower and upper edges of the I and Q ranges.
+            A list must have one range per declared readout channel.
+        bins : int or (int, int)
+            Number of bins along I and Q.
+        soft_avgs, load_pulses, start_src, progress, remove_offset, stride
+            See acquire().
+
+        Returns
+        -------
+        list of numpy.ndarray, list of list of numpy.ndarray
+            histogram counts for each readout channel, with shape (n_reads, bins_I, bins_Q);
+            and the I and Q bin edges for each readout channel
+        """
+        if np.ndim(hist_range) == 2:
+            hist_range = [hist_range] * len(self.ro_chs)
+        hists = [
+            HistogramAccumulator(nreads, bins, r)
+            for nreads, r in zip(self.reads_per_shot, hist_range)
+        ]
+        # normalization for each channel: (length, offset), or None for edge-counting readouts
+        norms = []
+        for ch, ro in self.ro_chs.items():
+            if ro["edge_counting"]:
+                norms.append(None)
+            else:
+                offset = (
+                    self._ro_offset(ch, ro.get("ro_config")) if remove_offset else 0
+                )
+                norms.append((ro["length"], offset))
+
+        for chunk in self.acquire_iter(
+            soc,
+            soft_avgs=soft_avgs,
+            load_pulses=load_pulses,
+            start_src=start_src,
+            progress=progress,
+            remove_offset=remove_offset,
+            online=True,
+            stride=stride,
+        ):
+            for hist, d_ch, norm in zip(hists, chunk.data, norms):
+                if norm is None:
+                    hist.add(d_ch)
+                else:
+                    hist.add(d_ch / norm[0] - norm[1])
+        return [h.counts for h in hists], [h.edges for h in hists]
 
     def _ro_offset(self, ch, chcfg):
         """Computes the IQ offset expected from this readout.
@@ -2155,6 +2609,90 @@ class AcquireMixin:
                 offset *= 2
         return offset
 
+    def _converged(self, sum_d, sum2_d, nrounds, target_sem, rtol):
+        """Check whether the running averages meet the stopping criteria.
+
+        Parameters
+        ----------
+        sum_d : list of numpy.ndarray
+            sum of the round averages
+        sum2_d : list of numpy.ndarray
+            sum of the squared round averages plus the round variances
+        nrounds : int
+            number of rounds in the sums
+        target_sem : float or None
+            maximum standard error of each I and Q value
+        rtol : float or None
+            maximum standard error of each IQ point, relative to its magnitude
+
+        Returns
+        -------
+        bool
+            True if all the given criteria are met (False if there are none)
+        """
+        if target_sem is None and rtol is None:
+            return False
+        # number of shots averaged into each point
+        nshots = nrounds * self.loop_dims[self.avg_level]
+        for s, s2 in zip(sum_d, sum2_d):
+            avg = s / nrounds
+            var = np.maximum(s2 / nrounds - avg**2, 0)
+            sem = np.sqrt(var / nshots)
+            if target_sem is not None and np.any(sem > target_sem):
+                return False
+            if rtol is not None:
+                sem_iq = np.sqrt(np.sum(sem**2, axis=-1))
+                if np.any(sem_iq > rtol * np.sqrt(np.sum(avg**2, axis=-1))):
+                    return False
+        return True
+
+    def _reduce_round(self, accs, acc_buf, threshold, angle, remove_offset):
+        """Average the data from one round.
+
+        Parameters
+        ----------
+        accs : list of WelfordAccumulator or None
+            the online accumulators for this round, if acquiring in online mode
+        acc_buf : list of numpy.ndarray
+            the raw buffers for this round (used if accs is None)
+        threshold : float or list of float or None
+            threshold to apply (see acquire())
+        angle : float or list of float or None
+            rotation angle before thresholding
+        remove_offset : bool
+            if True, subtract the readout offset
+
+        Returns
+        -------
+        list of numpy.ndarray, list of numpy.ndarray, list of numpy.ndarray or None
+            averages, standard deviations, and the threshold decisions (if thresholding a raw buffer)
+        """
+        # if we're thresholding, apply the threshold before averaging
+        if accs is not None:
+            round_d, round_std = self._average_online(
+                accs, length_norm=threshold is None, remove_offset=remove_offset
+            )
+            return round_d, round_std, None
+        elif threshold is None:
+            round_d, round_std = self._average_buf(
+                acc_buf,
+                self.reads_per_shot,
+                length_norm=True,
+                remove_offset=remove_offset,
+            )
+            return round_d, round_std, None
+        else:
+            d_reps = [np.zeros_like(d) for d in acc_buf]
+            shots = self._apply_threshold(
+                acc_buf, threshold, angle, remove_offset=remove_offset
+            )
+            for i, ch_shot in enumerate(shots):
+                d_reps[i][..., 0] = ch_shot
+            round_d, round_std = self._average_buf(
+                d_reps, self.reads_per_shot, length_norm=False
+            )
+            return round_d, round_std, shots
+
     def _average_buf(
         self,
         d_reps: np.ndarray,
@@ -2189,6 +2727,162 @@ class AcquireMixin:
 
         return avg_d, std_d
 
+    def _alloc_buf(self, spill_dir, name, shape, dtype):
+        """Allocate a zeroed data buffer.
+
+        Parameters
+        ----------
+        spill_dir : str or None
+            if not None, the buffer is a memory-mapped .npy file in this directory
+        name : str
+            file name (without extension) to use if spilling
+        shape : tuple of int
+            buffer shape
+        dtype : numpy.dtype
+            buffer data type
+
+        Returns
+        -------
+        numpy.ndarray or numpy.memmap
+            the buffer
+        """
+        if spill_dir is None:
+            return np.zeros(shape, dtype=dtype)
+        return np.lib.format.open_memmap(
+            os.path.join(spill_dir, name + ".npy"), mode="w+", dtype=dtype, shape=shape
+        )
+
+    def _store_raw(self, count, new_points, total_count, d):
+        """Copy a chunk of streamed data into the raw shot buffers.
+
+        Parameters
+        ----------
+        count : int
+            Number of shots received before this chunk.
+        new_points : int
+            Number of shots in this chunk.
+        total_count : int
+            Number of shots expected in the round.
+        d : list of numpy.ndarray
+            I/Q values for each readout channel, shape (new_points*nreads, 2).
+        """
+        for ii, nreads in enumerate(self.reads_per_shot):
+            # print(count, new_points, nreads, d[ii].shape, total_count)
+            if new_points * nreads != d[ii].shape[0]:
+                logger.error(
+                    "data size mismatch: new_points=%d, nreads=%d, data shape %s"
+                    % (new_points, nreads, d[ii].shape)
+                )
+            if count + new_points > total_count:
+                logger.error(
+                    "got too much data: count=%d, new_points=%d, total_count=%d"
+                    % (count, new_points, total_count)
+                )
+            # use reshape to view the acc_buf array in a shape that matches the raw data
+            # self.acc_buf[ii].reshape((-1,2))[count*nreads:(count+new_points)*nreads] = d[ii]
+            c_start = count * nreads
+            c_end = (count + new_points) * nreads
+            buf1d = self.acc_buf[ii].reshape((-1, 2))
+            try:
+                buf1d[c_start:c_end] = d[ii]
+            except ValueError:
+                # keep what fits
+                num = buf1d[c_start:c_end].shape[0]
+                logger.error(
+                    "can't store data for readout %d: %d I/Q values don't fit in buffer rows %d-%d (buffer has %d rows), keeping the first %d"
+                    % (ii, d[ii].shape[0], c_start, c_end, buf1d.shape[0], num)
+                )
+                buf1d[c_start:c_end] = d[ii][:num]
+
+    def _write_sink(self, sink, ir, count, new_points, d):
+        """Write a chunk of streamed data to a data sink.
+
+        Parameters
+        ----------
+        sink : AbsDataSink
+            The sink.
+        ir : int
+            Round number.
+        count : int
+            Number of shots received before this chunk.
+        new_points : int
+            Number of shots in this chunk.
+        d : list of numpy.ndarray
+            I/Q values for each readout channel, shape (new_points*nreads, 2).
+        """
+        for i_ch, nreads in enumerate(self.reads_per_shot):
+            reads = slice(count * nreads, (count + new_points) * nreads)
+            sink.write("raw_%d" % i_ch, (ir, reads), d[i_ch])
+
+    def _fold_online(
+        self, accs, count, new_points, d, threshold, angle, remove_offset, save_raw
+    ):
+        """Fold a chunk of streamed data into the online accumulators.
+        If thresholding, the chunk is thresholded first and the shot decisions are averaged in the I component.
+
+        Parameters
+        ----------
+        accs : list of WelfordAccumulator
+            Running statistics for each readout channel.
+        count : int
+            Number of shots received before this chunk.
+        new_points : int
+            Number of shots in this chunk.
+        d : list of numpy.ndarray
+            I/Q values for each readout channel, shape (new_points*nreads, 2).
+        threshold, angle, remove_offset
+            See acquire().
+        save_raw : bool
+            Also store the threshold decisions in the shots buffer.
+        """
+        if threshold is None:
+            for acc, d_ch in zip(accs, d):
+                acc.add(count, d_ch)
+            return
+        d_shots = self._apply_threshold(
+            d, threshold, angle, remove_offset=remove_offset
+        )
+        for ii, nreads in enumerate(self.reads_per_shot):
+            d_thr = np.zeros((len(d_shots[ii]), 2))
+            d_thr[:, 0] = d_shots[ii]
+            accs[ii].add(count, d_thr)
+            if save_raw:
+                c_start = count * nreads
+                c_end = (count + new_points) * nreads
+                self.shots[ii].reshape(-1)[c_start:c_end] = d_shots[ii]
+
+    def _average_online(self, accs, length_norm=True, remove_offset=True):
+        """Get the round averages from online accumulators.
+        This is the online-mode counterpart of _average_buf(), and applies the same normalization.
+
+        Parameters
+        ----------
+        accs : list of WelfordAccumulator
+            Running statistics for each readout channel.
+        length_norm : bool
+            normalize by readout window length (this setting is ignored and False is used for readouts where edge-counting is enabled)
+        remove_offset : bool
+            if normalizing by length, also subtract the readout's IQ offset if any
+
+        Returns
+        -------
+        list of numpy.ndarray, list of numpy.ndarray
+            averaged and standard deviation of the IQ data for this round
+        """
+        avg_d = []
+        std_d = []
+        for acc, (ch, ro) in zip(accs, self.ro_chs.items()):
+            avg, std = acc.result()
+            if length_norm and not ro["edge_counting"]:
+                avg /= ro["length"]
+                std /= ro["length"]
+                if remove_offset:
+                    avg -= self._ro_offset(ch, ro.get("ro_config"))
+            # the reads_per_shot axis should be the first one
+            avg_d.append(np.moveaxis(avg, -2, 0))
+            std_d.append(np.moveaxis(std, -2, 0))
+        return avg_d, std_d
+
     def _apply_threshold(self, acc_buf, threshold, angle, remove_offset):
         """
         This method converts the raw I/Q data to single shots according to the threshold and rotation angle
@@ -2213,7 +2907,7 @@ class AcquireMixin:
         Returns
         -------
         list of numpy.ndarray
-            Single shot data
+            Single shot data (uint8, 0 or 1)
 
         """
         # try to convert threshold to list of floats; if that fails, assume it's already a list
@@ -2229,14 +2923,36 @@ class AcquireMixin:
         except TypeError:
             angles = angle
 
+        # the comparison (I*cos + Q*sin)/length - offset*(cos + sin) > threshold
+        # is done in accumulated units with fixed-point cos and sin, so the data is never converted to float:
+        # (I*c + Q*s) > floor(length*(threshold + offset*(cos + sin)) * 2**frac_bits)
+        # I and Q fit in int32, so the products fit in int64
+        frac_bits = 30
         shots = []
         for i_ch, (ro_ch, ro) in enumerate(self.ro_chs.items()):
-            avg = acc_buf[i_ch] / ro["length"]
+            cos, sin = np.cos(angles[i_ch]), np.sin(angles[i_ch])
+            c = int(round(cos * 2**frac_bits))
+            s = int(round(sin * 2**frac_bits))
+            thr = thresholds[i_ch]
             if remove_offset:
-                offset = self.soccfg["readouts"][ro_ch]["iq_offset"]
-                avg -= offset
-            rotated = np.inner(avg, [np.cos(angles[i_ch]), np.sin(angles[i_ch])])
-            shots.append(np.heaviside(rotated - thresholds[i_ch], 0))
+                thr += self.soccfg["readouts"][ro_ch]["iq_offset"] * (cos + sin)
+            thr_int = math.floor(ro["length"] * thr * 2**frac_bits)
+
+            iq = np.asarray(acc_buf[i_ch]).reshape((-1, 2))
+            ch_shots = np.empty(iq.shape[0], dtype=np.uint8)
+            # process in blocks to keep the temporaries small
+            tmp = np.empty(min(len(iq), self.THRESHOLD_BLOCK), dtype=np.int64)
+            tmp2 = np.empty_like(tmp)
+            for start in range(0, len(iq), self.THRESHOLD_BLOCK):
+                block = iq[start : start + self.THRESHOLD_BLOCK]
+                n = len(block)
+                np.multiply(block[:, 0], c, out=tmp[:n], dtype=np.int64)
+                np.multiply(block[:, 1], s, out=tmp2[:n], dtype=np.int64)
+                tmp[:n] += tmp2[:n]
+                np.greater(
+                    tmp[:n], thr_int, out=ch_shots[start : start + n].view(np.bool_)
+                )
+            shots.append(ch_shots.reshape(np.shape(acc_buf[i_ch])[:-1]))
         return shots
 
     def get_time_axis(self, ro_index, length_only=False):
@@ -2298,6 +3014,46 @@ class AcquireMixin:
         """
         return np.arange(data.shape[0]) / self.soccfg["readouts"][ro_ch]["fs"]
 
+    def _wait_for_shots(self, soc, total_count, t_start, round_time, pbar=None):
+        """Wait for the tProc shot counter to reach the end of the round.
+        The wait is done in slices of WAIT_SLICE seconds, to update the progress bar and check for early stop.
+
+        Parameters
+        ----------
+        soc : QickSoc
+            Qick object
+        total_count : int
+            final value of the shot counter
+        t_start : float
+            time the round was started
+        round_time : float or None
+            expected duration of the round (in seconds), if known
+        pbar : tqdm
+            progress bar to update with the shot count
+
+        Returns
+        -------
+        bool
+            True if the round completed, False if it was stopped by set_early_stop()
+        """
+        count = 0
+        while count < total_count:
+            if self.early_stop:
+                return False
+            expected = None
+            if round_time is not None:
+                expected = max(0, t_start + round_time - time.time())
+            newcount = soc.wait_tproc_counter(
+                self.counter_addr,
+                total_count,
+                timeout=self.WAIT_SLICE,
+                expected_time=expected,
+            )
+            if pbar is not None:
+                pbar.update(newcount - count)
+            count = newcount
+        return True
+
     def run_rounds(
         self, soc, rounds=1, load_pulses=True, start_src="internal", progress=True
     ):
@@ -2317,6 +3073,8 @@ class AcquireMixin:
         progress: bool
             if true, displays progress bar
         """
+        self.early_stop = False
+
         # don't load memories now, we'll do that later
         self.config_all(soc, load_pulses=load_pulses, load_mem=False)
 
@@ -2340,6 +3098,8 @@ class AcquireMixin:
                 hidereps = False
 
         # run each round
+        # the duration of the previous round tells us how long to wait for the next one
+        round_time = None
         for ii in tqdm(range(rounds), disable=hiderounds):
             # make sure count variable is reset to 0
             soc.set_tproc_counter(addr=self.counter_addr, val=0)
@@ -2351,12 +3111,15 @@ class AcquireMixin:
             # if start_src="external", you must pulse the trigger input once for every round
             soc.start_tproc()
 
-            count = 0
+            t_round = time.time()
             with tqdm(total=total_count, disable=hidereps) as pbar:
-                while count < total_count:
-                    newcount = soc.get_tproc_counter(addr=self.counter_addr)
-                    pbar.update(newcount - count)
-                    count = newcount
+                completed = self._wait_for_shots(
+                    soc, total_count, t_round, round_time, pbar=pbar
+                )
+            if not completed:
+                # stopped by set_early_stop(), don't start any more rounds
+                break
+            round_time = time.time() - t_round
 
     def acquire_decimated(
         self,
@@ -2367,6 +3130,8 @@ class AcquireMixin:
         progress=True,
         remove_offset=True,
         callback=None,
+        sink=None,
+        chunk=None,
     ):
         """Acquire data using the decimating readout.
 
@@ -2384,6 +3149,14 @@ class AcquireMixin:
             if true, displays progress bar
         remove_offset: bool
             Subtract the readout's IQ offset, if any.
+        sink: AbsDataSink
+            Write the data to disk as it arrives (see myqick.sinks).
+            Each round's decimated I/Q values for each readout channel are written to datasets named "dec_<i>" with shape (soft_avgs, n_samples, 2), where i is the channel's index in the program's readout list.
+            The averaged results are written as "avg_<i>" at the end.
+            The program and its loop structure are saved as metadata.
+        chunk: int
+            Maximum number of decimated samples per DMA transfer (see QickSoc.get_decimated()).
+            None transfers each channel's data at once.
 
         Returns
         -------
@@ -2411,7 +3184,7 @@ class AcquireMixin:
         total_count = functools.reduce(operator.mul, self.loop_dims)
 
         # Initialize data buffers
-        # buffer for decimated data
+        # buffer for decimated data, summed over rounds (integer, so rounds are added without conversion)
         dec_buf = []
         for ch, ro in self.ro_chs.items():
             maxlen = self.soccfg["readouts"][ch]["buf_maxlen"]
@@ -2421,70 +3194,97 @@ class AcquireMixin:
                     % (ro["length"], ro["trigs"], total_count, maxlen)
                 )
             dec_buf.append(
-                np.zeros((ro["length"] * total_count * ro["trigs"], 2), dtype=float)
+                np.zeros((ro["length"] * total_count * ro["trigs"], 2), dtype=np.int64)
             )
+        # buffer for one round of decimated data, reused every round
+        # only for a local QickSoc: a remote one (Pyro or rpyc) can't write into our arrays, so it returns new ones
+        if isinstance(soc, QickConfig):
+            round_buf = [np.empty(d.shape, dtype=np.int16) for d in dec_buf]
+        else:
+            round_buf = [None for d in dec_buf]
+
+        if sink is not None:
+            sink.open(
+                prog_attrs(self),
+                {
+                    "dec_%d" % ii: ((soft_avgs, len(d), 2), np.int32)
+                    for ii, d in enumerate(dec_buf)
+                },
+            )
+        try:
+            # the duration of the previous round tells us how long to wait for the next one
+            round_time = None
+            # for each soft average, run and acquire decimated data
+            for ir in tqdm(range(soft_avgs), disable=not progress):
+                # buffer for accumulated data (for convenience/debug)
+                self.acc_buf = []
 
-        # for each soft average, run and acquire decimated data
-        for ir in tqdm(range(soft_avgs), disable=not progress):
-            # buffer for accumulated data (for convenience/debug)
-            self.acc_buf = []
+                # Configure and enable buffer capture.
+                self.config_bufs(soc, enable_avg=True, enable_buf=True)
 
-            # Configure and enable buffer capture.
-            self.config_bufs(soc, enable_avg=True, enable_buf=True)
+                # Reload data memory.
+                soc.reload_mem()
 
-            # Reload data memory.
-            soc.reload_mem()
+                # make sure count variable is reset to 0
+                soc.set_tproc_counter(addr=self.counter_addr, val=0)
 
-            # make sure count variable is reset to 0
-            soc.set_tproc_counter(addr=self.counter_addr, val=0)
+                # run the assembly program
+                # if start_src="external", you must pulse the trigger input once for every round
+                soc.start_tproc()
 
-            # run the assembly program
-            # if start_src="external", you must pulse the trigger input once for every round
-            soc.start_tproc()
-
-            count = 0
-            while count < total_count:
-                if self.early_stop:
+                t_round = time.time()
+                if not self._wait_for_shots(soc, total_count, t_round, round_time):
                     return []  # directly return empty list if early stop
-
-                count = soc.get_tproc_counter(addr=self.counter_addr)
-
-            for ii, (ch, ro) in enumerate(self.ro_chs.items()):
-                dec_buf[ii] += obtain(
-                    soc.get_decimated(
-                        ch=ch,
-                        address=0,
-                        length=ro["length"] * ro["trigs"] * total_count,
+                round_time = time.time() - t_round
+
+                for ii, (ch, ro) in enumerate(self.ro_chs.items()):
+                    dec = obtain(
+                        soc.get_decimated(
+                            ch=ch,
+                            address=0,
+                            length=ro["length"] * ro["trigs"] * total_count,
+                            out=round_buf[ii],
+                            chunk=chunk,
+                        )
                     )
-                )
-                self.acc_buf.append(
-                    obtain(
-                        soc.get_accumulated(
-                            ch=ch, address=0, length=ro["trigs"] * total_count
-                        ).reshape((*self.loop_dims, ro["trigs"], 2))
+                    dec_buf[ii] += dec
+                    if sink is not None:
+                        sink.write("dec_%d" % ii, (ir, slice(None)), dec)
+                    self.acc_buf.append(
+                        obtain(
+                            soc.get_accumulated(
+                                ch=ch, address=0, length=ro["trigs"] * total_count
+                            ).reshape((*self.loop_dims, ro["trigs"], 2))
+                        )
                     )
-                )
-            # callback
-            if callback is not None:
-                callback(ir)
+                # callback
+                if callback is not None:
+                    callback(ir)
 
-        onetrig = all([ro["trigs"] == 1 for ro in self.ro_chs.values()])
+            onetrig = all([ro["trigs"] == 1 for ro in self.ro_chs.values()])
 
-        # average the decimated data
-        result = []
-        for ii, (ch, ro) in enumerate(self.ro_chs.items()):
-            d_avg = dec_buf[ii] / soft_avgs
-            if remove_offset:
-                d_avg -= self._ro_offset(ch, ro.get("ro_config"))
-            if total_count == 1 and onetrig:
-                # simple case: data is 1D (one rep and one shot), just average over rounds
-                result.append(d_avg)
-            else:
-                # split the data into the individual reps
-                if onetrig or total_count == 1:
-                    d_reshaped = d_avg.reshape(total_count * ro["trigs"], -1, 2)
+            # average the decimated data
+            result = []
+            for ii, (ch, ro) in enumerate(self.ro_chs.items()):
+                d_avg = dec_buf[ii] / soft_avgs
+                if remove_offset:
+                    d_avg -= self._ro_offset(ch, ro.get("ro_config"))
+                if total_count == 1 and onetrig:
+                    # simple case: data is 1D (one rep and one shot), just average over rounds
+                    result.append(d_avg)
                 else:
-                    d_reshaped = d_avg.reshape(total_count, ro["trigs"], -1, 2)
-                result.append(d_reshaped)
-
-        return result
+                    # split the data into the individual reps
+                    if onetrig or total_count == 1:
+                        d_reshaped = d_avg.reshape(total_count * ro["trigs"], -1, 2)
+                    else:
+                        d_reshaped = d_avg.reshape(total_count, ro["trigs"], -1, 2)
+                    result.append(d_reshaped)
+
+            if sink is not None:
+                for ii, d in enumerate(result):
+                    sink.write_array("avg_%d" % ii, d)
+
+            return result
+        finally:
+            if sink is not None:
+                sink.close()
@@ -0,0 +1,161 @@
+"""
+Shadow copy of the configuration last written to the firmware, for skipping redundant writes.
+"""
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+from .helpers import NpEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(value):
+    """Hash a configuration value: an array (by its dtype, shape and contents) or anything JSON-serializable.
+
+    Parameters
+    ----------
+    value : numpy.ndarray, list, dict, or other JSON-serializable value
+        the value
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    h = hashlib.sha1()
+    if isinstance(value, np.ndarray):
+        h.update(str((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    else:
+        h.update(json.dumps(value, sort_keys=True, cls=NpEncoder).encode())
+    return h.hexdigest()
+
+
+class ConfigShadow:
+    """Remembers content hashes of the settings and memory blocks most recently written to the firmware,
+    so writes that wouldn't change anything can be skipped.
+
+    Settings are identified by a key, e.g. ("readout", ch).
+    Memory blocks are identified by a memory key and an address range: writing a block forgets any other blocks it overlaps.
+
+    The shadow only knows about writes that go through it.
+    If the firmware state is changed some other way (writing to the IPs directly, resetting or reprogramming the FPGA), call invalidate().
+
+    Parameters
+    ----------
+    enabled : bool
+        if False, check() always reports a change and nothing is recorded
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.settings = {}
+        # for each memory: {(start, length): hash}
+        self.blocks = defaultdict(dict)
+        # for each category: {"applied": n, "skipped": n}
+        self.stats = defaultdict(lambda: {"applied": 0, "skipped": 0})
+
+    def _count(self, category, changed):
+        self.stats[category]["applied" if changed else "skipped"] += 1
+        if not changed:
+            logger.debug("skipping unchanged %s" % (category))
+        return changed
+
+    def check(self, key, value):
+        """Check whether a setting would change, and record the new value.
+
+        Parameters
+        ----------
+        key : tuple
+            setting key; the first element is used as the category for the statistics
+        value
+            the new value (see content_hash())
+
+        Returns
+        -------
+        bool
+            True if the setting must be written
+        """
+        if not self.enabled:
+            return True
+        digest = content_hash(value)
+        changed = self.settings.get(key) != digest
+        self.settings[key] = digest
+        return self._count(key[0], changed)
+
+    def check_block(self, mem, start, length, value):
+        """Check whether a memory block would change, and record the new contents.
+
+        Parameters
+        ----------
+        mem : tuple
+            memory key; the first element is used as the category for the statistics
+        start : int
+            start address
+        length : int
+            block length
+        value
+            the new contents (see content_hash())
+
+        Returns
+        -------
+        bool
+            True if the block must be written
+        """
+        if not self.enabled:
+            return True
+        digest = content_hash(value)
+        blocks = self.blocks[mem]
+        changed = blocks.get((start, length)) != digest
+        if changed:
+            # forget any blocks this one overwrites
+            for s, n in list(blocks):
+                if s < start + length and start < s + n:
+                    del blocks[(s, n)]
+            blocks[(start, length)] = digest
+        return self._count(mem[0], changed)
+
+    def has_blocks(self, mem):
+        """Check whether the contents of any part of a memory are recorded.
+
+        Parameters
+        ----------
+        mem : tuple
+            memory key
+
+        Returns
+        -------
+        bool
+            True if some blocks are recorded (always False if the shadow is disabled)
+        """
+        return self.enabled and bool(self.blocks.get(mem))
+
+    def invalidate(self, category=None):
+        """Forget the recorded state, so everything is written next time.
+
+        Parameters
+        ----------
+        category : str
+            only forget settings and memories in this category (None = forget everything)
+        """
+        for key in list(self.settings):
+            if category is None or key[0] == category:
+                del self.settings[key]
+        for mem in list(self.blocks):
+            if category is None or mem[0] == category:
+                del self.blocks[mem]
+
+    def get_stats(self):
+        """Get the numbers of writes applied and skipped.
+
+        Returns
+        -------
+        dict
+            {"applied": n, "skipped": n} for each category
+        """
+        return {k: dict(v) for k, v in self.stats.items()}
@@ -0,0 +1,249 @@
+"""
+Data sinks, for writing acquisition data to disk as it arrives.
+Pass a sink to AcquireMixin.acquire() or acquire_decimated(), and each chunk of data is written to a chunked, compressed dataset as soon as it's read out,
+along with the program's metadata, so a run is saved without holding it in memory or making a second pass over it.
+"""
+
+import json
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .helpers import NpEncoder
+
+try:
+    import h5py
+except ModuleNotFoundError:
+    h5py = None
+
+try:
+    import zarr
+except ModuleNotFoundError:
+    zarr = None
+
+
+class AbsDataSink(ABC):
+    """Base class for data sinks.
+
+    The acquisition opens the sink with the metadata and the shapes of the datasets it will write,
+    fills the datasets in pieces as the data arrives, writes the final results as whole arrays, and closes the sink.
+    """
+
+    @abstractmethod
+    def open(self, attrs, datasets):
+        """Create the output.
+
+        Parameters
+        ----------
+        attrs : dict
+            Metadata (JSON-compatible values).
+        datasets : dict
+            Shape and dtype of each dataset that will be filled in with write(), keyed by name.
+        """
+        ...
+
+    @abstractmethod
+    def write(self, name, index, data):
+        """Write a piece of a dataset.
+
+        Parameters
+        ----------
+        name : str
+            Dataset name.
+        index : tuple
+            Index (int or slice for each dimension) of the piece in the dataset.
+        data : numpy.ndarray
+            The data.
+        """
+        ...
+
+    @abstractmethod
+    def write_array(self, name, data):
+        """Write a complete array as a new dataset.
+
+        Parameters
+        ----------
+        name : str
+            Dataset name.
+        data : numpy.ndarray
+            The data.
+        """
+        ...
+
+    @abstractmethod
+    def write_attrs(self, attrs):
+        """Add or update metadata.
+
+        Parameters
+        ----------
+        attrs : dict
+            Metadata (JSON-compatible values).
+        """
+        ...
+
+    @abstractmethod
+    def close(self):
+        """Finish writing the output."""
+        ...
+
+    def _chunks(self, shape):
+        # chunk along the longest (shot) axis, with one round per chunk
+        return tuple(
+            min(n, self.chunk_len) if i == len(shape) - 2 else (1 if i == 0 else n)
+            for i, n in enumerate(shape)
+        )
+
+
+class HDF5Sink(AbsDataSink):
+    """Writes acquisitions to an HDF5 file (requires h5py).
+    Metadata is stored as attributes of the root group.
+
+    Parameters
+    ----------
+    path : str
+        File path (an existing file is overwritten).
+    compression : str
+        HDF5 compression filter.
+    compression_opts
+        Options for the compression filter.
+    chunk_len : int
+        Number of reads per chunk.
+    """
+
+    def __init__(
+        self, path, compression="gzip", compression_opts=None, chunk_len=2**16
+    ):
+        if h5py is None:
+            raise RuntimeError("HDF5Sink requires the h5py package")
+        self.path = path
+        self.compression = compression
+        self.compression_opts = compression_opts
+        self.chunk_len = chunk_len
+        self.file = None
+
+    def open(self, attrs, datasets):
+        self.file = h5py.File(self.path, "w")
+        self.write_attrs(attrs)
+        for name, (shape, dtype) in datasets.items():
+            self.file.create_dataset(
+                name,
+                shape=shape,
+                dtype=dtype,
+                chunks=self._chunks(shape),
+                compression=self.compression,
+                compression_opts=self.compression_opts,
+            )
+
+    def write(self, name, index, data):
+        self.file[name][index] = data
+
+    def write_array(self, name, data):
+        self.file.create_dataset(name, data=data)
+
+    def write_attrs(self, attrs):
+        self.file.attrs.update(attrs)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ZarrSink(AbsDataSink):
+    """Writes acquisitions to a Zarr group (requires zarr).
+    Metadata is stored as attributes of the group.
+
+    Parameters
+    ----------
+    path : str
+        Store path (an existing store is overwritten).
+    chunk_len : int
+        Number of reads per chunk.
+    """
+
+    def __init__(self, path, chunk_len=2**16):
+        if zarr is None:
+            raise RuntimeError("ZarrSink requires the zarr package")
+        self.path = path
+        self.chunk_len = chunk_len
+        self.group = None
+
+    def open(self, attrs, datasets):
+        self.group = zarr.open_group(self.path, mode="w")
+        self.write_attrs(attrs)
+        for name, (shape, dtype) in datasets.items():
+            self.group.zeros(
+                name=name, shape=shape, dtype=dtype, chunks=self._chunks(shape)
+            )
+
+    def write(self, name, index, data):
+        self.group[name][index] = data
+
+    def write_array(self, name, data):
+        data = np.asarray(data)
+        arr = self.group.zeros(name=name, shape=data.shape, dtype=data.dtype)
+        arr[...] = data
+
+    def write_attrs(self, attrs):
+        self.group.attrs.update(attrs)
+
+    def close(self):
+        self.group = None
+
+
+def prog_attrs(prog):
+    """Metadata describing an acquisition program, for saving with its data.
+
+    Parameters
+    ----------
+    prog : AcquireMixin
+        The program.
+
+    Returns
+    -------
+    dict
+        The program (as the JSON dump from dump_prog()), the readout channels, the loop structure, and the sweeps.
+        For tProc v2 programs, "loops" lists the loop names and counts, and "sweeps" gives the rounded start value and the span for each loop
+        of every swept pulse parameter ({pulse: {parameter: {"start": x, "spans": {loop: x}}}} under "pulses")
+        and every swept time of a tagged instruction (the same, keyed by tag, under "times").
+        A swept value at loop indices i_loop is start + sum(spans[loop] * i_loop / (count_loop - 1)).
+    """
+    attrs = {
+        "prog": json.dumps(prog.dump_prog(), cls=NpEncoder),
+        "ro_chs": [int(ch) for ch in prog.ro_chs],
+        "loop_dims": [int(n) for n in prog.loop_dims],
+        "avg_level": int(prog.avg_level),
+        "reads_per_shot": [int(n) for n in prog.reads_per_shot],
+    }
+    # named sweep axes, if the program has them (tProc v2)
+    loop_dict = getattr(prog, "loop_dict", None)
+    if loop_dict is not None:
+        attrs["loops"] = json.dumps(list(loop_dict.items()), cls=NpEncoder)
+        attrs["sweeps"] = json.dumps(_sweeps(prog), cls=NpEncoder)
+    return attrs
+
+
+def _sweeps(prog):
+    # the swept pulse and time parameters of a compiled tProc v2 program
+    from .asm_v2 import QickParam
+
+    def describe(param):
+        return {"start": param.start, "spans": dict(param.spans)}
+
+    # a program loaded from the compile cache needs its pulse definitions rebuilt
+    prog._restore_declarations()
+    sweeps = {"pulses": {}, "times": {}}
+    for name in prog.pulses:
+        for par in prog.list_pulse_params(name):
+            param = prog.get_pulse_param(name, par)
+            if isinstance(param, QickParam):
+                sweeps["pulses"].setdefault(name, {})[par] = describe(param)
+    for tag, inst in prog.time_dict.items():
+        for par in prog.list_time_params(tag):
+            # times that aren't given as parameters (e.g. "auto" delays) have no value to look up
+            if inst.t_params[par] is None:
+                continue
+            param = prog.get_time_param(tag, par)
+            if isinstance(param, QickParam):
+                sweeps["times"].setdefault(tag, {})[par] = describe(param)
+    return sweeps
@@ -1,8 +1,11 @@
+import json
+import logging
 import os
 import time
 import traceback
+from collections import deque
 from queue import Queue
-from threading import Event, Thread
+from threading import Condition, Event, Lock, Thread
 
 import numpy as np
 
@@ -17,6 +20,324 @@ import numpy as np
 # To use Process instead of Thread, use the following import and change WORKERTYPE.
 # from multiprocessing import Process, Queue, Event
 
+logger = logging.getLogger(__name__)
+
+
+class SampleRing:
+    """
+    Preallocated per-channel ring buffers shared by the readout worker and the consumer.
+    The worker reserves a contiguous block in each channel's ring and DMAs the accumulated data straight into it;
+    the consumer reads views of the block and must release it when done, in the order the blocks were reserved.
+    This way each sample is copied exactly once, from the DMA buffer into the ring.
+
+    :param lengths: ring size (number of I/Q samples) for each channel
+    :type lengths: list of int
+    """
+
+    def __init__(self, lengths):
+        self.bufs = [np.zeros((n, 2), dtype=np.int32) for n in lengths]
+        # write position in each ring
+        self.heads = [0] * len(lengths)
+        # (start, length) of each reserved block, oldest first, for each ring
+        self.blocks = [deque() for n in lengths]
+        self.cond = Condition()
+
+    def _fit(self, iCh, n):
+        """Find where a block of n samples would go in a ring, or None if it doesn't fit now."""
+        size = len(self.bufs[iCh])
+        head = self.heads[iCh]
+        if n == 0:
+            return head
+        # empty blocks don't occupy any space
+        tail = next((start for start, length in self.blocks[iCh] if length), None)
+        if tail is None:
+            return 0 if n <= size else None
+        if head > tail:
+            # the used region is [tail, head): try to fit after it, otherwise wrap to the start
+            if head + n <= size:
+                return head
+            if n <= tail:
+                return 0
+            return None
+        # the used region wraps around: the free region is [head, tail)
+        return head if head + n <= tail else None
+
+    def reserve(self, lengths, stop_flag=None, timeout=0.01):
+        """Reserve one block in every channel's ring, waiting for the consumer to release blocks if necessary.
+
+        :param lengths: block size (number of I/Q samples) for each channel
+        :type lengths: list of int
+        :param stop_flag: if this Event is set while waiting, give up and return None
+        :type stop_flag: threading.Event
+        :param timeout: how often to check the stop flag while waiting (in seconds)
+        :type timeout: float
+        :return: writable views of the reserved blocks
+        :rtype: list of numpy.ndarray
+        """
+        for iCh, n in enumerate(lengths):
+            if n > len(self.bufs[iCh]):
+                raise RuntimeError(
+                    "requested block of %d samples is bigger than the ring (%d samples)"
+                    % (n, len(self.bufs[iCh]))
+                )
+        with self.cond:
+            while True:
+                starts = [self._fit(iCh, n) for iCh, n in enumerate(lengths)]
+                if None not in starts:
+                    break
+                if stop_flag is not None and stop_flag.is_set():
+                    return None
+                self.cond.wait(timeout)
+            views = []
+            for iCh, (start, n) in enumerate(zip(starts, lengths)):
+                self.blocks[iCh].append((start, n))
+                self.heads[iCh] = start + n
+                views.append(self.bufs[iCh][start : start + n])
+        return views
+
+    def release(self, nblocks=1):
+        """Release the oldest reserved blocks, so the worker can reuse their space.
+
+        :param nblocks: number of blocks to release (None = all of them)
+        :type nblocks: int
+        """
+        with self.cond:
+            for blocks in self.blocks:
+                n = len(blocks) if nblocks is None else min(nblocks, len(blocks))
+                for i in range(n):
+                    blocks.popleft()
+            self.cond.notify_all()
+
+    def reset(self):
+        """Release all blocks and rewind the rings."""
+        with self.cond:
+            for blocks in self.blocks:
+                blocks.clear()
+            self.heads = [0] * len(self.heads)
+            self.cond.notify_all()
+
+
+class AdaptiveStride:
+    """
+    Chooses the transfer size and polling interval for the streaming readout from the measured shot rate and DMA latency.
+    The aim is to keep the number of unread samples in the accumulated buffer within a target band:
+    big enough that each DMA transfer is efficient, small enough that the buffer never overflows while a transfer is in progress.
+    Between polls the worker sleeps for part of the time it expects to need to collect the next stride, instead of busy-polling the shot counter.
+
+    :param buf_shots: Number of shots that fit in the smallest accumulated buffer
+    :type buf_shots: int
+    :param band: Target range for the buffer occupancy at the end of a transfer, as fractions of the buffer size
+    :type band: tuple of float
+    :param max_sleep: Longest time to sleep between polls (in seconds)
+    :type max_sleep: float
+    """
+
+    # weight of the newest measurement in the running averages of rate and latency
+    SMOOTHING = 0.3
+
+    def __init__(self, buf_shots, band=(0.05, 0.25), max_sleep=0.05):
+        self.buf_shots = buf_shots
+        self.low, self.high = band
+        self.max_sleep = max_sleep
+        # start with the same stride as the fixed default
+        self.stride = max(1, int(0.1 * buf_shots))
+        # shots per second
+        self.rate = None
+        # seconds per transfer
+        self.latency = 0.0
+        self._last_poll = None
+
+    def _smooth(self, old, new):
+        if old is None:
+            return new
+        return (1 - self.SMOOTHING) * old + self.SMOOTHING * new
+
+    def update_rate(self, shots, t):
+        """Record a reading of the shot counter.
+
+        :param shots: Shot counter value
+        :type shots: int
+        :param t: Time of the reading (in seconds)
+        :type t: float
+        """
+        if self._last_poll is not None:
+            last_shots, last_t = self._last_poll
+            if t > last_t and shots > last_shots:
+                self.rate = self._smooth(self.rate, (shots - last_shots) / (t - last_t))
+        self._last_poll = (shots, t)
+
+    def update_latency(self, dt, unread):
+        """Record a transfer, and pick the stride for the next one.
+
+        :param dt: Time the transfer took (in seconds)
+        :type dt: float
+        :param unread: Number of shots that were waiting in the buffer when the transfer started
+        :type unread: int
+        """
+        self.latency = self._smooth(self.latency, dt)
+        if self.rate is None:
+            return
+        # shots that arrive while a transfer is in progress
+        inflight = self.rate * self.latency
+        occupancy = (unread + inflight) / self.buf_shots
+        target = 0.5 * (self.low + self.high) * self.buf_shots - inflight
+        if occupancy > self.high:
+            # we're getting close to overflow, back off quickly
+            target = min(target, self.stride / 2)
+        upper = self.high * self.buf_shots - inflight
+        self.stride = int(max(1, min(target, upper)))
+
+    def sleep_time(self, unread):
+        """How long to wait before polling the counter again.
+
+        :param unread: Number of shots waiting in the buffer
+        :type unread: int
+        :return: sleep time (in seconds)
+        :rtype: float
+        """
+        if not self.rate:
+            return 0
+        # sleep for half the time we expect to need, so we don't overshoot the stride
+        remaining = (self.stride - unread) / self.rate
+        return min(self.max_sleep, max(0, 0.5 * remaining))
+
+
+class StreamerTelemetry:
+    """
+    Metrics recorded by the readout worker, to show how close a streaming readout is to overflowing the accumulated buffers and where the time goes.
+    Distributions are kept as histograms with fixed bins, so the memory use doesn't depend on the length of the readout.
+    The metrics are reset at the start of each readout, and can be read with snapshot() while the readout is running or after it's done.
+
+    Each histogram has one more bin than its list of edges: bin i counts values in [edges[i-1], edges[i]),
+    and the first and last bins count values below the first edge and above the last edge.
+    """
+
+    # bin edges for durations (in seconds): log-spaced from 1 us to 10 s, 5 bins per decade
+    TIME_EDGES = np.logspace(-6, 1, 36)
+    # bin edges for buffer fill fractions
+    FILL_EDGES = np.linspace(0, 1, 21)
+    # bin edges for the data queue depth
+    QUEUE_EDGES = np.array([1, 2, 3, 4, 6, 8, 12, 16, 32, 64, 128])
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset([])
+
+    def reset(self, ch_list, buf_lengths=None):
+        """Clear the metrics at the start of a readout.
+
+        :param ch_list: List of readout channels
+        :type ch_list: list of int
+        :param buf_lengths: Accumulated buffer size for each channel
+        :type buf_lengths: list of int
+        """
+        with self.lock:
+            self.ch_list = list(ch_list)
+            self.buf_lengths = buf_lengths
+            self.t_start = None
+            self.t_first_data = None
+            self.t_last_poll = None
+            self.n_polls = 0
+            self.n_transfers = 0
+            self.errors = []
+            self.poll_interval = np.zeros(len(self.TIME_EDGES) + 1, dtype=np.int64)
+            self.queue_depth = np.zeros(len(self.QUEUE_EDGES) + 1, dtype=np.int64)
+            self.dma_time = {
+                ch: np.zeros(len(self.TIME_EDGES) + 1, dtype=np.int64) for ch in ch_list
+            }
+            self.fill = {
+                ch: np.zeros(len(self.FILL_EDGES) + 1, dtype=np.int64) for ch in ch_list
+            }
+            self.max_fill = {ch: 0.0 for ch in ch_list}
+
+    @staticmethod
+    def _bin(hist, edges, value):
+        hist[np.searchsorted(edges, value, side="right")] += 1
+
+    def record_start(self, t):
+        """Record the time the tProc was started."""
+        with self.lock:
+            self.t_start = t
+
+    def record_poll(self, t):
+        """Record a poll of the shot counter."""
+        with self.lock:
+            if self.t_last_poll is not None:
+                self._bin(self.poll_interval, self.TIME_EDGES, t - self.t_last_poll)
+            self.t_last_poll = t
+            self.n_polls += 1
+
+    def record_transfer(self, iCh, dt, npoints):
+        """Record a DMA transfer from an accumulated buffer.
+
+        :param iCh: Index of the channel in the channel list
+        :type iCh: int
+        :param dt: Transfer time (in seconds)
+        :type dt: float
+        :param npoints: Number of unread samples that were transferred
+        :type npoints: int
+        """
+        ch = self.ch_list[iCh]
+        fill = npoints / self.buf_lengths[iCh]
+        with self.lock:
+            self._bin(self.dma_time[ch], self.TIME_EDGES, dt)
+            self._bin(self.fill[ch], self.FILL_EDGES, fill)
+            self.max_fill[ch] = max(self.max_fill[ch], fill)
+
+    def record_data(self, t, depth):
+        """Record a packet being put in the data queue.
+
+        :param t: Time the packet was queued
+        :type t: float
+        :param depth: Data queue length after queueing the packet
+        :type depth: int
+        """
+        with self.lock:
+            if self.t_first_data is None:
+                self.t_first_data = t
+            self.n_transfers += 1
+            self._bin(self.queue_depth, self.QUEUE_EDGES, depth)
+
+    def record_error(self, e):
+        """Record an exception in the readout loop."""
+        with self.lock:
+            self.errors.append(repr(e))
+
+    def snapshot(self):
+        """Get the current metrics.
+        The result only contains lists, numbers and strings, so it can be passed through Pyro or saved as JSON.
+
+        :return: metrics and histogram edges; per-channel metrics are keyed by channel number
+        :rtype: dict
+        """
+        with self.lock:
+            first = None
+            if self.t_first_data is not None and self.t_start is not None:
+                first = self.t_first_data - self.t_start
+            return {
+                "time_to_first_data": first,
+                "n_polls": self.n_polls,
+                "n_transfers": self.n_transfers,
+                "errors": list(self.errors),
+                "time_edges": self.TIME_EDGES.tolist(),
+                "fill_edges": self.FILL_EDGES.tolist(),
+                "queue_edges": self.QUEUE_EDGES.tolist(),
+                "poll_interval": self.poll_interval.tolist(),
+                "queue_depth": self.queue_depth.tolist(),
+                "dma_time": {ch: h.tolist() for ch, h in self.dma_time.items()},
+                "fill": {ch: h.tolist() for ch, h in self.fill.items()},
+                "max_fill": dict(self.max_fill),
+            }
+
+    def export(self, path):
+        """Save the current metrics to a JSON file.
+
+        :param path: File path
+        :type path: str
+        """
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=4)
+
 
 class DataStreamer:
     """
@@ -33,11 +354,32 @@ class DataStreamer:
     # WORKERTYPE = Process
     WORKERTYPE = Thread
 
+    # size of the zero-copy ring for each channel, in multiples of the channel's accumulated buffer length
+    RING_DEPTH = 4
+
     def __init__(self, soc):
         self.soc = soc
+        # ring buffer for zero-copy readout, allocated on first use
+        self.ring = None
+        # metrics for the most recent readout
+        self.telemetry = StreamerTelemetry()
 
         self.start_worker()
 
+    def setup_ring(self, ch_list):
+        """
+        Prepare the zero-copy ring buffer for a readout of the given channels.
+        The ring is reused if it already has the right sizes, otherwise it is reallocated.
+
+        :param ch_list: List of readout channels
+        :type ch_list: list of int
+        """
+        lengths = [self.RING_DEPTH * self.soc.get_avg_max_length(ch) for ch in ch_list]
+        if self.ring is None or [len(b) for b in self.ring.bufs] != lengths:
+            self.ring = SampleRing(lengths)
+        else:
+            self.ring.reset()
+
     def start_worker(self):
         # Initialize flags and queues.
         # Passes run commands from the main thread to the worker thread.
@@ -49,6 +391,9 @@ class DataStreamer:
         # The main thread can use this flag to tell the worker thread to stop.
         # The main thread clears the flag when starting readout.
         self.stop_flag = Event()
+        # The worker thread uses this to tell the main thread when it has started the tProc.
+        # The main thread clears the flag when starting readout.
+        self.started_flag = Event()
         # The worker thread uses this to tell the main thread when it's done.
         # The main thread clears the flag when starting readout.
         self.done_flag = Event()
@@ -102,16 +447,34 @@ class DataStreamer:
         while True:
             try:
                 # wait for a job
-                total_shots, counter_addr, ch_list, reads_per_count, stride = (
-                    self.job_queue.get(block=True)
-                )
+                (
+                    total_shots,
+                    counter_addr,
+                    ch_list,
+                    reads_per_count,
+                    stride,
+                    zero_copy,
+                ) = self.job_queue.get(block=True)
                 # print("streamer loop: start", total_count)
+                telemetry = self.telemetry
+                telemetry.reset(
+                    ch_list, [self.soc.get_avg_max_length(ch) for ch in ch_list]
+                )
 
                 shots = 0
                 last_shots = 0
 
                 # how many shots worth of data to transfer at a time
-                if stride is None:
+                controller = None
+                if stride == "auto":
+                    buf_shots = min(
+                        self.soc.get_avg_max_length(ch) // nreads
+                        for ch, nreads in zip(ch_list, reads_per_count)
+                        if nreads > 0
+                    )
+                    controller = AdaptiveStride(buf_shots)
+                    stride = controller.stride
+                elif stride is None:
                     stride = int(
                         0.1 * self.soc.get_avg_max_length(0) / max(reads_per_count)
                     )
@@ -122,32 +485,57 @@ class DataStreamer:
                 stats = []
 
                 t_start = time.time()
+                telemetry.record_start(t_start)
 
                 # if the tproc is configured for internal start, this will start the program
                 # for external start, the program will not start until a start pulse is received
                 self.soc.start_tproc()
+                self.started_flag.set()
 
                 # Keep streaming data until you get all of it
                 while last_shots < total_shots:
                     if self.stop_flag.is_set():
-                        print("streamer loop: got stop flag")
+                        logger.info("streamer loop: got stop flag")
                         break
                     shots = self.soc.get_tproc_counter(addr=counter_addr)
+                    t_poll = time.time()
+                    telemetry.record_poll(t_poll)
+                    if controller is not None:
+                        controller.update_rate(shots, t_poll)
+                        stride = controller.stride
                     # wait until either you've gotten a full stride of measurements or you've finished (so you don't go crazy trying to download every measurement)
-                    if shots >= min(last_shots + stride, total_shots):
+                    if shots < min(last_shots + stride, total_shots):
+                        if controller is not None:
+                            time.sleep(controller.sleep_time(shots - last_shots))
+                    else:
                         newshots = shots - last_shots
                         # buffer for each channel
                         acc_buf = [None for nreads in reads_per_count]
+                        if zero_copy:
+                            # write straight into the ring, the consumer will read views of it
+                            acc_buf = self.ring.reserve(
+                                [newshots * nreads for nreads in reads_per_count],
+                                stop_flag=self.stop_flag,
+                            )
+                            if acc_buf is None:
+                                logger.info("streamer loop: got stop flag")
+                                break
+                            # reserve() may have waited for the consumer while the tProc kept filling the buffers,
+                            # so the overflow check must use the current count
+                            shots = self.soc.get_tproc_counter(addr=counter_addr)
 
                         # for each adc channel get the single shot data and add it to the buffer
                         for iCh, ch in enumerate(ch_list):
                             newpoints = newshots * reads_per_count[iCh]
-                            if newpoints >= self.soc.get_avg_max_length(ch):
+                            # the block we read is intact as long as the unread samples haven't wrapped around the buffer
+                            unread = (shots - last_shots) * reads_per_count[iCh]
+                            if unread >= self.soc.get_avg_max_length(ch):
                                 raise RuntimeError(
                                     "Overflowed the averages buffer (%d unread samples >= buffer size %d)."
-                                    % (newpoints, self.soc.get_avg_max_length(ch))
+                                    % (unread, self.soc.get_avg_max_length(ch))
                                     + "\nYou need to slow down the tProc by increasing relax_delay."
                                     + "\nIf the TQDM progress bar is enabled, disabling it may help."
+                                    + "\nIf the data is processed as it streams (acquire_iter() or a sink), the processing may be too slow."
                                 )
 
                             addr = (
@@ -155,20 +543,28 @@ class DataStreamer:
                                 * reads_per_count[iCh]
                                 % self.soc.get_avg_max_length(ch)
                             )
+                            t_dma = time.time()
                             data = self.soc.get_accumulated(
-                                ch=ch, address=addr, length=newpoints
+                                ch=ch, address=addr, length=newpoints, out=acc_buf[iCh]
+                            )
+                            telemetry.record_transfer(
+                                iCh, time.time() - t_dma, newpoints
                             )
                             acc_buf[iCh] = data
 
                         last_shots += newshots
 
+                        if controller is not None:
+                            controller.update_latency(time.time() - t_poll, newshots)
+
                         stats = (time.time() - t_start, shots, addr, newshots)
                         self.data_queue.put((newshots, (acc_buf, stats)))
+                        telemetry.record_data(time.time(), self.data_queue.qsize())
                 # if last_count==total_count: print("streamer loop: normal completion")
 
             except Exception as e:
-                print("streamer loop: got exception")
-                # traceback.print_exc()
+                logger.exception("streamer loop: got exception")
+                self.telemetry.record_error(e)
                 # pass the exception to the main thread
                 self.error_queue.put(e)
                 # put dummy data in the data queue, to trigger a poll_data read
@@ -176,5 +572,7 @@ class DataStreamer:
             finally:
                 # we should set the done flag regardless of whether we completed readout, used the stop flag, or errored out
                 self.done_flag.set()
+                # also release anyone waiting for the tProc to start, if we never got that far
+                self.started_flag.set()
                 # set tproc for internal start so we don't run the program repeatedly (this also clears the internal-start register)
                 self.soc.start_src("internal")
@@ -237,11 +237,27 @@ regex = {
     "CDS": r"\s*([\w&\+\']+)",
 }
 
+import functools
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# precompiled patterns for Assembler.get_list()
+_LABEL_RE = re.compile(regex["LABEL"])
+_DIRECTIVE_RE = re.compile(regex["DIRECTIVE"])
+_CMD_RE = re.compile(regex["CMD"])
+_LIT_RE = re.compile(regex["LIT"])
+_CDS_RE = re.compile(regex["CDS"])
+_WORD_SPLIT_RE = re.compile(r" |\(|\)|\[|\]")
+_OP_BIN_RE = re.compile(r"#b(\d+)")
+# (key, pattern, marker, RL, RR) for each parameter:
+# the marker is text the parameter can't match without, so the regex can be skipped on most lines
+_PARAM_RE = [
+    (key, re.compile(p["RegEx"]), p["RL"] or p["RegEx"], p["RL"], p["RR"])
+    for key, p in Param_List.items()
+]
+
 
 def find_pattern(regex: str, text: str):
     match = re.search(regex, text)
@@ -265,23 +281,22 @@ def check_name(name_str: str) -> bool:
     return True
 
 
-def integer2bin(strin: str, bits: int = 8, uint: int = 0) -> str:
+def int2field(dec: int, bits: int = 8, uint: int = 0) -> int:
     """
-        receives an integer in str format and returns their bits as a string.
+        checks that an integer fits in a bit field and returns the field value.
 
-    :strin (str): string with an integer
-    :bits (int): number of bits to return
+    :dec (int): the integer
+    :bits (int): field width
     :uint (int): is unsigned
-    :returns (str): bits as a string
+    :returns (int): field value (two's complement if negative)
     """
     if uint == 0:
-        minv = -(2 ** (bits - 1))
-        maxv = 2 ** (bits - 1) - 1
+        minv = -(1 << (bits - 1))
+        maxv = (1 << (bits - 1)) - 1
     else:
         minv = 0
-        maxv = 2 ** (bits) - 1
-    dec = int(strin, 10)
-    # Check max.
+        maxv = (1 << bits) - 1
+    # Check min.
     if dec < minv:
         raise RuntimeError("integer2bin: number %d is smaller than %d" % (dec, minv))
     # Check max.
@@ -289,13 +304,23 @@ def integer2bin(strin: str, bits: int = 8, uint: int = 0) -> str:
         raise RuntimeError("integer2bin: number %d is bigger than %d" % (dec, maxv))
     # Check if number is negative.
     if dec < 0:
-        dec = dec + 2**bits
-    # Convert to binary.
-    fmt = "{0:0" + str(bits) + "b}"
-    binv = fmt.format(dec)
-    return binv
+        dec = dec + (1 << bits)
+    return dec
+
+
+def integer2bin(strin: str, bits: int = 8, uint: int = 0) -> str:
+    """
+        receives an integer in str format and returns their bits as a string.
+
+    :strin (str): string with an integer
+    :bits (int): number of bits to return
+    :uint (int): is unsigned
+    :returns (str): bits as a string
+    """
+    return format(int2field(int(strin, 10), bits, uint), "0%db" % (bits))
 
 
+@functools.lru_cache(maxsize=1024)
 def get_src_type(src: str) -> str:
     """
     :returns (tuple): Type of Source
@@ -341,7 +366,11 @@ def check_lit(lit_str: str) -> bool:
     return r
 
 
-def get_imm_dt(lit: str, bit_len: int, lit_val: int = 0) -> str:
+@functools.lru_cache(maxsize=4096)
+def get_imm_dt(lit: str, bit_len: int, lit_val: int = 0) -> int:
+    """
+    :returns (int): the literal as a bit field of width bit_len, or its value if lit_val
+    """
     LIT = re.findall(
         "#(-?\d+)|#u(\d+)|#b(\d+)|#h([0-9A-F]+)|&(\d+)|@(-?\d+)", lit
     )  # S,R,W,Signed, Unsigned, Binary, Hexa
@@ -350,29 +379,29 @@ def get_imm_dt(lit: str, bit_len: int, lit_val: int = 0) -> str:
     LIT = LIT[0]
     try:
         if LIT[0]:  ## is Signed
-            literal = str(int(LIT[0]))
-            DataImm = "_" + integer2bin(literal, bit_len)
+            literal = int(LIT[0])
+            DataImm = int2field(literal, bit_len)
         elif LIT[1]:  ## is Unsigned
-            literal = str(int(LIT[1]))
-            DataImm = "_" + integer2bin(literal, bit_len, 1)
+            literal = int(LIT[1])
+            DataImm = int2field(literal, bit_len, 1)
         elif LIT[2]:  ## is Binary
-            literal = str(int(LIT[2], 2))
-            DataImm = "_" + integer2bin(literal, bit_len, 1)
+            literal = int(LIT[2], 2)
+            DataImm = int2field(literal, bit_len, 1)
         elif LIT[3]:  ## is Hexa
-            literal = str(int(LIT[3], 16))
-            DataImm = "_" + integer2bin(literal, bit_len, 1)
+            literal = int(LIT[3], 16)
+            DataImm = int2field(literal, bit_len, 1)
         elif LIT[4]:  ## is Address
-            literal = str(int(LIT[4]))
-            DataImm = "_" + integer2bin(literal, bit_len, 1)
+            literal = int(LIT[4])
+            DataImm = int2field(literal, bit_len, 1)
         elif LIT[5]:  ## is Time
-            literal = str(int(LIT[5]))
-            DataImm = "_" + integer2bin(literal, bit_len)
+            literal = int(LIT[5])
+            DataImm = int2field(literal, bit_len)
         else:
             raise RuntimeError("get_imm_dt: Data Format incorrect " + lit)
     except:
         raise RuntimeError("get_imm_dt: Data Format incorrect " + lit)
     if lit_val:
-        return int(literal)
+        return literal
     else:
         return DataImm
 
@@ -386,9 +415,10 @@ def check_reg(name_reg: str) -> bool:
     return r
 
 
-def get_reg_addr(reg: str, Type: str) -> str:
+@functools.lru_cache(maxsize=1024)
+def get_reg_addr(reg: str, Type: str) -> int:
     """
-    :returns: register_address.
+    :returns: register_address, as a bit field (7 bits for Dest, 8 for src_data, 6 for src_addr).
     """
     if not check_reg(reg):  # extr_num == name_num):
         raise RuntimeError("get_reg_addr: Register " + reg + " Name error")
@@ -399,51 +429,51 @@ def get_reg_addr(reg: str, Type: str) -> str:
                 raise RuntimeError(
                     "get_reg_addr: Register s" + str(REG[0]) + " is not a sreg (Max 15)"
                 )
-            return "00" + integer2bin(REG[0], 5, 1)
+            return (0b00 << 5) | int2field(int(REG[0]), 5, 1)
         elif REG[1]:  ## is DREG
             if int(REG[1]) > 31:
                 raise RuntimeError(
                     "get_reg_addr: Register d" + str(REG[1]) + " is not a dreg (Max 31)"
                 )
-            return "01" + integer2bin(REG[1], 5, 1)
+            return (0b01 << 5) | int2field(int(REG[1]), 5, 1)
         elif REG[2]:  ## is WREG
             if int(REG[2]) > 5:
                 raise RuntimeError(
                     "get_reg_addr: Register w" + str(REG[2]) + " is not a wreg (Max 5)"
                 )
-            return "10" + integer2bin(REG[2], 5, 1)
+            return (0b10 << 5) | int2field(int(REG[2]), 5, 1)
     elif Type == "src_data":
         if REG[0]:  ## is SREG
             if int(REG[0]) > 15:
                 raise RuntimeError(
                     "get_reg_addr: Register s" + str(REG[0]) + " is not a sreg (Max 15)"
                 )
-            return "0_00" + integer2bin(REG[0], 5, 1)
+            return (0b000 << 5) | int2field(int(REG[0]), 5, 1)
         elif REG[1]:  ## is DREG
             if int(REG[1]) > 31:
                 raise RuntimeError(
                     "get_reg_addr: Register d" + str(REG[1]) + " is not a dreg (Max 31)"
                 )
-            return "0_01" + integer2bin(REG[1], 5, 1)
+            return (0b001 << 5) | int2field(int(REG[1]), 5, 1)
         elif REG[2]:  ## is WREG
             if int(REG[2]) > 5:
                 raise RuntimeError(
                     "get_reg_addr: Register w" + str(REG[1]) + " is not a wreg (Max 5)"
                 )
-            return "0_10" + integer2bin(REG[2], 5, 1)
+            return (0b010 << 5) | int2field(int(REG[2]), 5, 1)
     elif Type == "src_addr":
         if REG[0]:  ## is SREG
             if int(REG[0]) > 15:
                 raise RuntimeError(
                     "get_reg_addr: Register s" + str(REG[0]) + " is not a sreg (Max 15)"
                 )
-            return "0" + integer2bin(REG[0], 5, 1)
+            return (0 << 5) | int2field(int(REG[0]), 5, 1)
         elif REG[1]:  ## is DREG
             if int(REG[1]) > 31:
                 raise RuntimeError(
                     "get_reg_addr: Register d" + str(REG[1]) + " is not a dreg (Max 31)"
                 )
-            return "1" + integer2bin(REG[1], 5, 1)
+            return (1 << 5) | int2field(int(REG[1]), 5, 1)
         elif REG[2]:  ## is WREG
             if int(REG[2]) > 5:
                 raise RuntimeError(
@@ -452,7 +482,7 @@ def get_reg_addr(reg: str, Type: str) -> str:
             raise RuntimeError(
                 "get_reg_addr: Register w" + str(REG[2]) + " Can not be wreg"
             )
-    return "X"
+    raise RuntimeError("get_reg_addr: Register " + reg + " type " + Type + " error")
 
 
 class LFSR:
@@ -481,6 +511,76 @@ class LFSR:
         print(self.val_bin, self.val_int)
 
 
+class InstWord:
+    """
+        a binary instruction, packed from its fields into a 72-bit integer.
+        all instructions share the same fields; the text representation (the fields as 0s and 1s, separated by '_') is only built when requested.
+
+    :HEADER, AI, DF, COND, CFG, ADDR, DATA, RD (int): field values, see FIELDS for the widths
+    :cmd (str): command name, appended to the text representation as a comment
+    """
+
+    # (name, bits) of each field, most significant first
+    FIELDS = (
+        ("HEADER", 3),
+        ("AI", 1),
+        ("DF", 2),
+        ("COND", 3),
+        ("CFG", 7),
+        ("ADDR", 17),
+        ("DATA", 32),
+        ("RD", 7),
+    )
+
+    __slots__ = ("value", "cmd")
+
+    def __init__(
+        self,
+        HEADER: int,
+        AI: int,
+        DF: int,
+        COND: int,
+        CFG: int,
+        ADDR: int,
+        DATA: int,
+        RD: int,
+        cmd: str = "",
+    ):
+        self.value = (
+            (HEADER << 69)
+            | (AI << 68)
+            | (DF << 66)
+            | (COND << 63)
+            | (CFG << 56)
+            | (ADDR << 39)
+            | (DATA << 7)
+            | RD
+        )
+        self.cmd = cmd
+
+    def words(self) -> list:
+        """
+        :returns (list): the instruction as 8 32-bit ints, least significant first (the format of program memory)
+        """
+        v = self.value
+        return [v & 0xFFFFFFFF, (v >> 32) & 0xFFFFFFFF, v >> 64, 0, 0, 0, 0, 0]
+
+    def __str__(self) -> str:
+        bits = format(self.value, "072b")
+        fields = []
+        start = 0
+        for name, n in self.FIELDS:
+            fields.append(bits[start : start + n])
+            start += n
+        text = "_".join(fields)
+        if self.cmd:
+            text += " //" + self.cmd
+        return text
+
+    def __repr__(self) -> str:
+        return "InstWord(%s)" % (self)
+
+
 class Assembler:
     WAIT_TIME_OFFSET = 10
 
@@ -585,20 +685,16 @@ class Assembler:
                     ADDR = command["ADDR"]
                     if ADDR in val_list:
                         label = key_list[val_list.index(ADDR)]
-                        # command.pop['ADDR']
-                        command["LABEL"] = label
+                        # the program list is left as is
+                        command = dict(command, LABEL=label)
             assembler_code += process_command(command, address)
 
-        # ADD Address to commands with LABEL
-        for line_number, command in enumerate(program_list):
-            if "LABEL" in command:
-                if command["LABEL"] in label_dict:
-                    command["ADDR"] = label_dict[command["LABEL"]]
-                else:
-                    raise RuntimeError(
-                        "LABEL: Label " + command["LABEL"] + " not recognized"
-                    )
-            command["LINE"] = line_number
+        # CHECK that the labels used are defined
+        for command in program_list:
+            if "LABEL" in command and command["LABEL"] not in label_dict:
+                raise RuntimeError(
+                    "LABEL: Label " + command["LABEL"] + " not recognized"
+                )
         return assembler_code
 
     @staticmethod
@@ -636,409 +732,310 @@ class Assembler:
     def get_list(asm_str: str) -> tuple:
         """
         process the asm and return the program instructions as a list of dictionaries with the labels.
-        :assembler string (asm_str): string with the ASM.
+        The labels, aliases and constants are read in a quick first pass, and the instructions are parsed in a second pass;
+        branches and label loads are resolved once all label addresses are known.
+        Labels, aliases and constants can be used before they are defined.
+        IMPORTANT: This function updates 'Alias_List'.
+
+        :assembler string (asm_str): list of lines of ASM, stripped of comments and whitespace.
         :returns (tuple): (program_list, label_dict)
         :program_list (list): program instructions as a list of dictionaries.
         :label_dict (dict): dictionary with all labels found plus their memory address in program memory. ({'LABEL': '&0'})
         """
+        # register 15 predefinition.
+        label_dict = {"s15": "s15"}
+        # first pass: check the label names and read the aliases and constants, in order,
+        # so aliases and constants (like labels) can be used before they are defined
+        label_names = set(label_dict)
+        for line_number, command in enumerate(asm_str, start=1):
+            if not command:
+                continue
+            label = _LABEL_RE.search(command) if ":" in command else None
+            directive = _DIRECTIVE_RE.search(command) if "." in command else None
+            if label:  # check the label isn't already registered
+                label = label.group()
+                L_Name = command[:-1]
+                if not check_name(L_Name):
+                    raise RuntimeError(
+                        "LABEL_RECOGNITION: Label Name error in line  "
+                        + str(line_number)
+                    )
+                if label in label_names:
+                    raise RuntimeError(
+                        'LABEL_RECOGNITION: Label  "'
+                        + label
+                        + '" already in use as LABEL in line '
+                        + str(line_number)
+                    )
+                if label in Alias_List:
+                    raise RuntimeError(
+                        'LABEL_RECOGNITION: Label "'
+                        + label
+                        + '" already in use as ALIAS in line '
+                        + str(line_number)
+                    )
+                if label == "reg":
+                    raise RuntimeError(
+                        "LABEL_RECOGNITION: reg is not a valid label in line  "
+                        + str(line_number)
+                    )
+                label_names.add(label)
+            elif directive:
+                directive = directive.group()
 
-        label_line_idxs = []
-
-        def label_recognition(file_lines: list) -> dict:
-            """
-            gets and returns all labels from file.
-            IMPORTANT: This function updates 'Alias_List'.
+                if directive == "ALIAS":
+                    directive_params = list(filter(lambda x: x, command.split(" ")))
+                    if len(directive_params) != 3:
+                        raise RuntimeError(
+                            "DIRECTIVE_RECOGNITION: ALIAS Parameters error in line "
+                            + str(line_number)
+                        )
+                    A_Name = directive_params[1]
+                    A_Reg = directive_params[2]
+                    if not check_name(A_Name):
+                        raise RuntimeError(
+                            "DIRECTIVE_RECOGNITION: Alias Name Error in line "
+                            + str(line_number)
+                        )
+                    if A_Name in Alias_List:
+                        raise RuntimeError(
+                            'DIRECTIVE_RECOGNITION: Alias "'
+                            + A_Name
+                            + '" already in use as ALIAS in line '
+                            + str(line_number)
+                        )
+                    if A_Name in label_names:
+                        raise RuntimeError(
+                            'DIRECTIVE_RECOGNITION: Alias "'
+                            + A_Name
+                            + '" already in use as LABEL in line '
+                            + str(line_number)
+                        )
+                    if not check_reg(A_Reg):
+                        raise RuntimeError(
+                            "DIRECTIVE_RECOGNITION: Register Name error in line "
+                            + str(line_number)
+                        )
+                    Alias_List.update({A_Name: A_Reg})
+                    logger.info(
+                        "ALIAS_RECOGNITION:  > " + A_Reg + " is called " + A_Name
+                    )
+                elif directive == "CONST":
+                    directive_params = list(filter(lambda x: x, command.split(" ")))
+                    if len(directive_params) != 3:
+                        raise RuntimeError(
+                            "DIRECTIVE_RECOGNITION: CONST Parameters error in line "
+                            + str(line_number)
+                        )
+                    C_name = directive_params[1]
+                    C_val = directive_params[2]
+                    if not check_name(C_name):
+                        raise RuntimeError(
+                            "DIRECTIVE_RECOGNITION: Alias Name Error in line "
+                            + str(line_number)
+                        )
+                    if C_name in Alias_List:
+                        raise RuntimeError(
+                            'DIRECTIVE_RECOGNITION: Const "'
+                            + C_name
+                            + '" already in use as ALIAS in line '
+                            + str(line_number)
+                        )
+                    if C_name in label_names:
+                        raise RuntimeError(
+                            'DIRECTIVE_RECOGNITION: Const "'
+                            + C_name
+                            + '" already in use as LABEL in line '
+                            + str(line_number)
+                        )
+                    lit_val = get_imm_dt(C_val, 32, 1)
+                    # if error:
+                    #    raise RuntimeError('DIRECTIVE_RECOGNITION: CONST '+C_name+' Value '+C_val+' is not a Literal in line ' + str(line_number) )
+                    Alias_List.update({C_name: C_val})
+                    logger.info(
+                        "DIRECTIVE_RECOGNITION: > " + C_val + " is called " + C_name
+                    )
 
-            :file_lines (list): file as a list of strings, each element represents a new line. (should be stripped)
-            :returns: label_dictionary
-            :label_dictionary (dict): dictionary with all labels found plus their memory address in program memory. ({'LABEL': '&0'})
-            """
-            # register 15 predefinition.
-            label_dict = {"s15": "s15"}
-            mem_addr = 1  # address 0 goes NOP
+        # second pass: addresses and instructions
+        program_list = [{"P_ADDR": 1, "LINE": 2, "CMD": "NOP"}]
+        # (command_info, label, line_number, mem_addr) for each reference to a label, resolved at the end
+        label_refs = []
+        mem_addr = 0  # address 0 goes NOP
+        for line_number, command in enumerate(asm_str, start=1):
+            if not command:
+                continue
             # Check if LABEL, DIRETIVE OR INSTRUCTION
-            for line_number, command in enumerate(file_lines, start=1):
-                if command:
-                    label = find_pattern(regex["LABEL"], command)
-                    directive = find_pattern(regex["DIRECTIVE"], command)
-                    instruction = find_pattern(regex["CMD"], command)
-                    if label:  # add label to label_dict if not already registered.
-                        L_Name = command[:-1]
-                        if not check_name(L_Name):
-                            raise RuntimeError(
-                                "LABEL_RECOGNITION: Label Name error in line  "
-                                + str(line_number)
-                            )
-                        if label in label_dict:
-                            raise RuntimeError(
-                                'LABEL_RECOGNITION: Label  "'
-                                + label
-                                + '" already in use as LABEL in line '
-                                + str(line_number)
-                            )
-                        if label in Alias_List:
-                            raise RuntimeError(
-                                'LABEL_RECOGNITION: Label "'
-                                + label
-                                + '" already in use as ALIAS in line '
-                                + str(line_number)
-                            )
-                        if label == "reg":
-                            raise RuntimeError(
-                                "LABEL_RECOGNITION: reg is not a valid label in line  "
-                                + str(line_number)
-                            )
-                        label_dict[label] = "&" + str(mem_addr)
-                        label_line_idxs.append(line_number)
-                    elif directive:  # identify Aliases and adds them to Alias_List.
-                        if directive == "ALIAS":
-                            directive_params = list(
-                                filter(lambda x: x, command.split(" "))
-                            )
-                            if len(directive_params) != 3:
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: ALIAS Parameters error in line "
-                                    + str(line_number)
-                                )
-                            A_Name = directive_params[1]
-                            A_Reg = directive_params[2]
-                            if not check_name(A_Name):
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: Alias Name Error in line "
-                                    + str(line_number)
-                                )
-                            if A_Name in Alias_List:
-                                raise RuntimeError(
-                                    'DIRECTIVE_RECOGNITION: Alias "'
-                                    + A_Name
-                                    + '" already in use as ALIAS in line '
-                                    + str(line_number)
-                                )
-                            if A_Name in label_dict:
-                                raise RuntimeError(
-                                    'DIRECTIVE_RECOGNITION: Alias "'
-                                    + A_Name
-                                    + '" already in use as LABEL in line '
-                                    + str(line_number)
-                                )
-                            if not check_reg(A_Reg):
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: Register Name error in line "
-                                    + str(line_number)
-                                )
-                            Alias_List.update({A_Name: A_Reg})
-                            logger.info(
-                                "ALIAS_RECOGNITION:  > "
-                                + A_Reg
-                                + " is called "
-                                + A_Name
-                            )
-                        elif directive == "CONST":
-                            directive_params = list(
-                                filter(lambda x: x, command.split(" "))
-                            )
-                            if len(directive_params) != 3:
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: CONST Parameters error in line "
-                                    + str(line_number)
-                                )
-                            C_name = directive_params[1]
-                            C_val = directive_params[2]
-                            if not check_name(C_name):
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: Alias Name Error in line "
-                                    + str(line_number)
-                                )
-                            if C_name in Alias_List:
-                                raise RuntimeError(
-                                    'DIRECTIVE_RECOGNITION: Const "'
-                                    + C_name
-                                    + '" already in use as ALIAS in line '
-                                    + str(line_number)
-                                )
-                            if C_name in label_dict:
-                                raise RuntimeError(
-                                    'DIRECTIVE_RECOGNITION: Const "'
-                                    + C_name
-                                    + '" already in use as LABEL in line '
-                                    + str(line_number)
-                                )
-                            lit_val = get_imm_dt(C_val, 32, 1)
-                            # if error:
-                            #    raise RuntimeError('DIRECTIVE_RECOGNITION: CONST '+C_name+' Value '+C_val+' is not a Literal in line ' + str(line_number) )
-                            Alias_List.update({C_name: C_val})
-                            logger.info(
-                                "DIRECTIVE_RECOGNITION: > "
-                                + C_val
-                                + " is called "
-                                + C_name
-                            )
-                        elif directive == "ADDR":
-                            directive_params = list(
-                                filter(lambda x: x, command.split(" "))
-                            )
-                            if len(directive_params) != 2:
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: ADDR Parameters error in line "
-                                    + str(line_number)
-                                )
-                            if not check_num(directive_params[1]):
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: Address Value "
-                                    + directive_params[1]
-                                    + " error in Line "
-                                    + str(line_number)
-                                )
-                            Value = int(directive_params[1])
-                            distance = Value - mem_addr
-                            if distance < 0:
-                                raise RuntimeError(
-                                    "DIRECTIVE_RECOGNITION: New Memory Address "
-                                    + str(Value)
-                                    + " before than next empty address ("
-                                    + str(mem_addr)
-                                    + ") in Line "
-                                    + str(line_number)
-                                )
-                            mem_addr = Value
-                        elif directive == "END":
-                            mem_addr += 1
-                        else:
-                            raise RuntimeError(
-                                "DIRECTIVE_RECOGNITION: Directive Not Recognized in Line "
-                                + str(line_number)
-                            )
-                    elif (
-                        instruction
-                    ):  # Identify instructions to correctly set addresses.
-                        if instruction not in instList.keys():
-                            raise RuntimeError(
-                                "CMD_RECOGNITION: Command Not Recognized in Line "
-                                + str(line_number)
-                            )
-                        if instruction == "WAIT":
-                            mem_addr += 2
-                        else:
-                            mem_addr += 1
-                    else:
+            label = _LABEL_RE.search(command) if ":" in command else None
+            directive = _DIRECTIVE_RE.search(command) if "." in command else None
+            if label:
+                label_dict[label.group()] = "&" + str(mem_addr + 1)
+            elif directive:
+                directive = directive.group()
+
+                if directive in ["ALIAS", "CONST"]:
+                    # already read in the first pass
+                    pass
+                elif directive == "ADDR":
+                    directive_params = list(filter(lambda x: x, command.split(" ")))
+                    if len(directive_params) != 2:
                         raise RuntimeError(
-                            "CMD_RECOGNITION: Instruction Not Recognized in Line "
+                            "DIRECTIVE_RECOGNITION: ADDR Parameters error in line "
                             + str(line_number)
                         )
-
-            show_info = "\n## ALIAS LIST"
-            show_info += "\n" + ("###############################")
-            show_info += "\n" + ("REG  > ALIAS NAME\n-----|-------------")
-            for key in Alias_List:
-                show_info += "\n" + str((f"{Alias_List[key]:<3}" + " > " + key))
-            show_info += "\n" + ("###############################")
-            logger.debug("ALIAS_RECOGNITION: " + show_info)
-
-            show_info = "\n## LABEL LIST "
-            show_info += "\n" + ("###############################")
-            show_info += "\n" + (
-                "LABEL NAME       > PMEM ADDRESS\n-----------------|-------------  "
-            )
-            for key in label_dict:
-                if key != "s15":
-                    show_info += "\n" + str((f"{key:<15}" + " > " + label_dict[key]))
-            show_info += "\n" + ("###############################")
-            logger.debug("LABEL_RECOGNITION: " + show_info)
-
-            return label_dict
-
-        def command_recognition(file_lines: list, label_dict: dict) -> list:
-            """
-            gets and returns all commands from file.
-            IMPORTANT: Uses 'Alias_List', 'Param_List'.
-
-            :file_lines (list): file as a list of strings, each element represents a new line. (should be stripped)
-            :label_dict (dict): dictionary with all labels found plus their memory address in program memory. ({'LABEL': '&0'}). see ' label_recognition() '
-            :returns: program_list
-            :program_list (list): program instructions as a list of dictionaries.
-
-            """
-            program_list = [{"P_ADDR": 1, "LINE": 2, "CMD": "NOP"}]
-            # program_list = []
-            mem_addr = 0
-            for line_number, command in enumerate(file_lines, start=1):
-                command_info = {}
-                instruction = find_pattern(regex["CMD"], command)
-                directive = find_pattern(regex["DIRECTIVE"], command)
-                if (not command) or (line_number in label_line_idxs):
-                    continue
-                elif directive:
-                    if directive == "END":
-                        mem_addr += 1
-                        command_info = {
-                            "LINE": line_number,
-                            "P_ADDR": mem_addr,
-                            "ADDR": f"&{str(mem_addr)}",
-                            "CMD": "JUMP",
-                        }
-                        program_list.append(command_info)
-                        logger.debug("COMMAND_RECOGNITION: END OF PROGRAM")
-                    elif directive == "ADDR":  ## Already Verified on Label Recognition
-                        directive_params = list(filter(lambda x: x, command.split(" ")))
-                        Value = int(directive_params[1])
-                        distance = Value - mem_addr
-                        for ind in range(distance - 1):
-                            mem_addr += 1
-                            command_nop = {}
-                            command_nop["P_ADDR"] = mem_addr
-                            command_nop["LINE"] = line_number
-                            command_nop["CMD"] = "NOP"
-                            program_list.append(command_nop)
-                elif instruction:
-                    if instruction not in instList.keys():
+                    if not check_num(directive_params[1]):
                         raise RuntimeError(
-                            f"COMMAND_RECOGNITION: < {instruction} > is not a Recognized Command in Line "
+                            "DIRECTIVE_RECOGNITION: Address Value "
+                            + directive_params[1]
+                            + " error in Line "
                             + str(line_number)
                         )
-                    mem_addr += 1
-                    command_info["P_ADDR"] = mem_addr
-                    # CHECK for Literal Values
-                    ###############################################################
-                    LIT = re.findall(regex["LIT"], command)
-                    if LIT and len(LIT) == 2 and LIT[0] != LIT[1]:
+                    Value = int(directive_params[1])
+                    distance = Value - mem_addr
+                    if distance < 1:
                         raise RuntimeError(
-                            "COMMAND_RECOGNITION: Literals not equals in Line "
+                            "DIRECTIVE_RECOGNITION: New Memory Address "
+                            + str(Value)
+                            + " before than next empty address ("
+                            + str(mem_addr + 1)
+                            + ") in Line "
                             + str(line_number)
                         )
+                    for ind in range(distance - 1):
+                        mem_addr += 1
+                        command_nop = {}
+                        command_nop["P_ADDR"] = mem_addr
+                        command_nop["LINE"] = line_number
+                        command_nop["CMD"] = "NOP"
+                        program_list.append(command_nop)
+                elif directive == "END":
+                    mem_addr += 1
+                    command_info = {
+                        "LINE": line_number,
+                        "P_ADDR": mem_addr,
+                        "ADDR": f"&{str(mem_addr)}",
+                        "CMD": "JUMP",
+                    }
+                    program_list.append(command_info)
+                    logger.debug("COMMAND_RECOGNITION: END OF PROGRAM")
+                else:
+                    raise RuntimeError(
+                        "DIRECTIVE_RECOGNITION: Directive Not Recognized in Line "
+                        + str(line_number)
+                    )
+            else:
+                instruction = _CMD_RE.match(command)
+                if not instruction:
+                    raise RuntimeError(
+                        "CMD_RECOGNITION: Instruction Not Recognized in Line "
+                        + str(line_number)
+                    )
+                if instruction.group() not in instList:
+                    raise RuntimeError(
+                        "CMD_RECOGNITION: Command Not Recognized in Line "
+                        + str(line_number)
+                    )
+                command_info = {}
+                mem_addr += 1
+                command_info["P_ADDR"] = mem_addr
+                # CHECK for Literal Values
+                ###############################################################
+                LIT = _LIT_RE.findall(command)
+                if LIT and len(LIT) == 2 and LIT[0] != LIT[1]:
+                    raise RuntimeError(
+                        "COMMAND_RECOGNITION: Literals not equals in Line "
+                        + str(line_number)
+                    )
 
-                    # CHANGE ALIAS
-                    ###############################################################
-                    cmd_words = re.split(" |\(|\)|\[|\]", command)
+                # CHANGE ALIAS
+                ###############################################################
+                cmd_words = set(_WORD_SPLIT_RE.split(command))
+                if not cmd_words.isdisjoint(Alias_List):
+                    # replace in Alias_List order, as an alias name may be part of another one
                     for key in Alias_List:
-                        CHANGE = find_pattern(key, command)
                         if key in cmd_words:
-                            command = (
-                                command.replace(CHANGE, Alias_List[key])
-                                if CHANGE
-                                else command
-                            )
+                            command = command.replace(key, Alias_List[key])
 
-                    # Extract PARAMETERS
-                    ###############################################################
-                    command_info["LINE"] = (
-                        line_number  # Stores Line Number for ERROR Messages
-                    )
-                    for key in Param_List:
-                        PARAM = re.findall(Param_List[key]["RegEx"], command)
-                        if PARAM:
-                            if len(PARAM) > 1:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Duplicated Parameter "
-                                    + key
-                                    + " in line "
-                                    + str(line_number)
-                                )
-                            command_info[key] = PARAM[0].strip()
-                            aux = (
-                                Param_List[key]["RL"] + PARAM[0] + Param_List[key]["RR"]
+                # Extract PARAMETERS
+                ###############################################################
+                command_info["LINE"] = (
+                    line_number  # Stores Line Number for ERROR Messages
+                )
+                for key, param_re, marker, RL, RR in _PARAM_RE:
+                    if marker not in command:
+                        continue
+                    PARAM = param_re.findall(command)
+                    if PARAM:
+                        if len(PARAM) > 1:
+                            raise RuntimeError(
+                                "COMMAND_RECOGNITION: Duplicated Parameter "
+                                + key
+                                + " in line "
+                                + str(line_number)
                             )
-                            command = command.replace(aux, "")
-                    # COMMANDS PARAMETERS CHECK
-                    ###############################################################
-                    CMD_DEST_SOURCE = re.findall(regex["CDS"], command)
-                    ## SINGLE PARAMETERS CHECK
-                    ###########################################################
-                    if "OP" in command_info:
-                        comp_OP_PARAM = "#b(\d+)"
-                        param_op = re.findall(comp_OP_PARAM, command_info["OP"])
-                        if param_op:
-                            try:
-                                str(int(param_op[0], 2))
-                            except ValueError:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Binary value incorrect in Line "
-                                    + str(line_number)
-                                )
-                    if "LIT" in command_info:
-                        # Remove underscores
-                        command_info["LIT"] = command_info["LIT"].replace("_", "")
-                        # Check if Binary OK
-                        if command_info["LIT"][0] == "b":
-                            try:
-                                command_info["LIT"] = str(
-                                    int(command_info["LIT"][1:], 2)
-                                )
-                            except ValueError:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Binary value incorrect in Line "
-                                    + str(line_number)
-                                )
-                        command_info["LIT"] = "#" + command_info["LIT"]
-                    ###########################################################
-                    if "TIME" in command_info:
-                        command_info["TIME"] = "@" + command_info["TIME"]
-                    ###########################################################
-                    if "WW" in command_info:
-                        command_info["WW"] = "1"
-                    ###########################################################
-                    if "UF" in command_info:
-                        command_info["UF"] = "1"
-                        if not ("OP" in command_info):
+                        command_info[key] = PARAM[0].strip()
+                        command = command.replace(RL + PARAM[0] + RR, "")
+                # COMMANDS PARAMETERS CHECK
+                ###############################################################
+                CMD_DEST_SOURCE = _CDS_RE.findall(command)
+                ## SINGLE PARAMETERS CHECK
+                ###########################################################
+                if "OP" in command_info:
+                    param_op = _OP_BIN_RE.findall(command_info["OP"])
+                    if param_op:
+                        try:
+                            str(int(param_op[0], 2))
+                        except ValueError:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: No Operation < -op() > set for Flag Update < -uf > in Line "
+                                "COMMAND_RECOGNITION: Binary value incorrect in Line "
                                 + str(line_number)
                             )
+                if "LIT" in command_info:
+                    # Remove underscores
+                    command_info["LIT"] = command_info["LIT"].replace("_", "")
+                    # Check if Binary OK
+                    if command_info["LIT"][0] == "b":
+                        try:
+                            command_info["LIT"] = str(int(command_info["LIT"][1:], 2))
+                        except ValueError:
+                            raise RuntimeError(
+                                "COMMAND_RECOGNITION: Binary value incorrect in Line "
+                                + str(line_number)
+                            )
+                    command_info["LIT"] = "#" + command_info["LIT"]
+                ###########################################################
+                if "TIME" in command_info:
+                    command_info["TIME"] = "@" + command_info["TIME"]
+                ###########################################################
+                if "WW" in command_info:
+                    command_info["WW"] = "1"
+                ###########################################################
+                if "UF" in command_info:
+                    command_info["UF"] = "1"
+                    if not ("OP" in command_info):
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: No Operation < -op() > set for Flag Update < -uf > in Line "
+                            + str(line_number)
+                        )
 
-                    ## COMMAND VERIFICATION
-                    ###########################################################
-                    if CMD_DEST_SOURCE[0] == "REG_WR":
-                        if len(CMD_DEST_SOURCE) <= 2:
+                ## COMMAND VERIFICATION
+                ###########################################################
+                if CMD_DEST_SOURCE[0] == "REG_WR":
+                    if len(CMD_DEST_SOURCE) <= 2:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: "
+                            + CMD_DEST_SOURCE[0]
+                            + " Not enough parameters in Line "
+                            + str(line_number)
+                        )
+                    if CMD_DEST_SOURCE[1] == "r_wave":
+                        if "TIME" in command_info:
                             raise RuntimeError(
                                 "COMMAND_RECOGNITION: "
                                 + CMD_DEST_SOURCE[0]
-                                + " Not enough parameters in Line "
+                                + " Instruction is NOT a timed intruction < -@Time > in Line "
                                 + str(line_number)
                             )
-                        if CMD_DEST_SOURCE[1] == "r_wave":
-                            if "TIME" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: "
-                                    + CMD_DEST_SOURCE[0]
-                                    + " Instruction is NOT a timed intruction < -@Time > in Line "
-                                    + str(line_number)
-                                )
-                        else:
-                            if "WP" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
-                                    + str(line_number)
-                                )
-                            if "WR" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Not allowed Write Register < -wr() > in Line "
-                                    + str(line_number)
-                                )
-                            if "WW" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
-                                    + str(line_number)
-                                )
-                            if "TIME" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: "
-                                    + CMD_DEST_SOURCE[0]
-                                    + " Instruction is NOT a timed intruction < -@Time > in Line "
-                                    + str(line_number)
-                                )
-
-                    elif CMD_DEST_SOURCE[0] in [
-                        "NOP",
-                        "TEST",
-                        "RET",
-                        "TIME",
-                        "FLAG",
-                        "ARITH",
-                        "DIV",
-                        "NET",
-                        "COM",
-                        "PA",
-                        "PB",
-                    ]:
+                    else:
                         if "WP" in command_info:
                             raise RuntimeError(
                                 "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
@@ -1061,308 +1058,360 @@ class Assembler:
                                 + " Instruction is NOT a timed intruction < -@Time > in Line "
                                 + str(line_number)
                             )
-                    ###########################################################
-                    elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
-                        if "WP" in command_info:
+
+                elif CMD_DEST_SOURCE[0] in [
+                    "NOP",
+                    "TEST",
+                    "RET",
+                    "TIME",
+                    "FLAG",
+                    "ARITH",
+                    "DIV",
+                    "NET",
+                    "COM",
+                    "PA",
+                    "PB",
+                ]:
+                    if "WP" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
+                            + str(line_number)
+                        )
+                    if "WR" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write Register < -wr() > in Line "
+                            + str(line_number)
+                        )
+                    if "WW" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
+                            + str(line_number)
+                        )
+                    if "TIME" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: "
+                            + CMD_DEST_SOURCE[0]
+                            + " Instruction is NOT a timed intruction < -@Time > in Line "
+                            + str(line_number)
+                        )
+                ###########################################################
+                elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
+                    if "WP" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
+                            + str(line_number)
+                        )
+                    if "WW" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
+                            + str(line_number)
+                        )
+                    if "TIME" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: "
+                            + CMD_DEST_SOURCE[0]
+                            + " Instruction is NOT a timed intruction < -@Time > in Line "
+                            + str(line_number)
+                        )
+
+                elif CMD_DEST_SOURCE[0] == "DMEM_WR":
+                    if "WP" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
+                            + str(line_number)
+                        )
+                    if "WW" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
+                            + str(line_number)
+                        )
+                    if "TIME" in command_info:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: DMEM_WR is NOT a timed intruction < -@Time > in Line "
+                            + str(line_number)
+                        )
+                    if not ("ADDR" in command_info):
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: Memory Address < [] > not set in Line "
+                            + str(line_number)
+                        )
+
+                ###########################################################
+                elif CMD_DEST_SOURCE[0] == "WMEM_WR":
+                    if "TIME" in command_info:
+                        if "WR" in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
+                                "COMMAND_RECOGNITION: Not allowed SDI with Literal Time in Line "
                                 + str(line_number)
                             )
-                        if "WW" in command_info:
+                        if "OP" in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
+                                "COMMAND_RECOGNITION: Not allowed ALU Operation Operation with Literal Time in Line "
                                 + str(line_number)
                             )
-                        if "TIME" in command_info:
+                    if ("WP" in command_info) and not ("PORT" in command_info):
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: No Port Address < -p() > in Line "
+                            + str(line_number)
+                        )
+                ###########################################################
+                elif CMD_DEST_SOURCE[0] in ["DPORT_WR", "WPORT_WR", "TRIG"]:
+                    if not ("PORT" in command_info):
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: No port in PORT_WR Instruction in line "
+                            + str(line_number)
+                        )
+
+                # GET COMMAND DESTINATION SOURCE
+                ###############################################################
+                command_info["CMD"] = CMD_DEST_SOURCE[0]
+                ###############################################################################
+                ## MORE THAN ONE SOURCE
+                if len(CMD_DEST_SOURCE) > 3:
+                    if CMD_DEST_SOURCE[0] in ["ARITH", "NET", "PA", "PB"]:
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                        command_info["R1"] = CMD_DEST_SOURCE[2]
+                        command_info["R2"] = CMD_DEST_SOURCE[3]
+                        if len(CMD_DEST_SOURCE) > 4:
+                            command_info["R3"] = CMD_DEST_SOURCE[4]
+                        if len(CMD_DEST_SOURCE) > 5:
+                            command_info["R4"] = CMD_DEST_SOURCE[5]
+                            if CMD_DEST_SOURCE[0] == "NET":
+                                raise RuntimeError(
+                                    "COMMAND_RECOGNITION: NET command max 3 Registers in line "
+                                    + str(line_number)
+                                )
+                        if len(CMD_DEST_SOURCE) > 6:
                             raise RuntimeError(
                                 "COMMAND_RECOGNITION: "
                                 + CMD_DEST_SOURCE[0]
-                                + " Instruction is NOT a timed intruction < -@Time > in Line "
+                                + " Command max 4 Registers in line "
                                 + str(line_number)
                             )
 
-                    elif CMD_DEST_SOURCE[0] == "DMEM_WR":
-                        if "WP" in command_info:
-                            raise RuntimeError(
-                                "COMMAND_RECOGNITION: Not allowed Write Port < -wp() > in Line "
-                                + str(line_number)
-                            )
-                        if "WW" in command_info:
+                    elif (CMD_DEST_SOURCE[0] == "REG_WR") and (
+                        CMD_DEST_SOURCE[2] == "label"
+                    ):
+                        command_info["DST"] = CMD_DEST_SOURCE[1]
+                        command_info["SRC"] = CMD_DEST_SOURCE[2]
+                        label_refs.append(
+                            (command_info, CMD_DEST_SOURCE[3], line_number, mem_addr)
+                        )
+                    else:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: [>3] Parameter Error in line "
+                            + str(line_number)
+                        )
+
+                ###############################################################################
+                ## ONLY ONE SOURCE / DEST
+                elif len(CMD_DEST_SOURCE) == 3:
+                    if CMD_DEST_SOURCE[0] == "REG_WR":
+                        if CMD_DEST_SOURCE[2] == "label":
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: Not allowed Write WaveMemory < -ww() > in Line "
+                                "COMMAND_RECOGNITION: Missing label in line "
                                 + str(line_number)
                             )
-                        if "TIME" in command_info:
+                        command_info["DST"] = CMD_DEST_SOURCE[1]
+                        command_info["SRC"] = CMD_DEST_SOURCE[2]
+                    elif CMD_DEST_SOURCE[0] == "DPORT_WR":
+                        if int(command_info["PORT"]) > 3:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: DMEM_WR is NOT a timed intruction < -@Time > in Line "
+                                "COMMAND_RECOGNITION: Data Port MAX port number is p3 in line "
                                 + str(line_number)
                             )
-                        if not ("ADDR" in command_info):
+                        command_info["DST"] = command_info["PORT"]
+                        command_info.pop("PORT")
+                        command_info["SRC"] = CMD_DEST_SOURCE[1]
+                        command_info["DATA"] = CMD_DEST_SOURCE[2]
+                    elif CMD_DEST_SOURCE[0] in ["COM", "TIME", "NET", "PA", "PB"]:
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                        command_info["R1"] = CMD_DEST_SOURCE[2]
+                    elif CMD_DEST_SOURCE[0] == "DIV":
+                        command_info["NUM"] = CMD_DEST_SOURCE[1]
+                        command_info["DEN"] = CMD_DEST_SOURCE[2]
+                    else:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: [3] Parameter Error in line "
+                            + str(line_number)
+                        )
+                ###############################################################################
+                ## NO SOURCE OR -- SOURCE IN EXTRACTED PARAMETER
+                elif len(CMD_DEST_SOURCE) == 2:
+                    if CMD_DEST_SOURCE[0] == "DMEM_WR":
+                        command_info["SRC"] = CMD_DEST_SOURCE[1]
+                        command_info["DST"] = "[" + command_info["ADDR"] + "]"
+                        command_info.pop("ADDR")
+                    elif CMD_DEST_SOURCE[0] == "TRIG":
+                        command_info["SRC"] = CMD_DEST_SOURCE[1]
+                        if int(command_info["PORT"]) > 31:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: Memory Address < [] > not set in Line "
+                                "COMMAND_RECOGNITION: Trigger Port max por number is p31 in line "
                                 + str(line_number)
                             )
-
-                    ###########################################################
-                    elif CMD_DEST_SOURCE[0] == "WMEM_WR":
-                        if "TIME" in command_info:
-                            if "WR" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Not allowed SDI with Literal Time in Line "
-                                    + str(line_number)
-                                )
-                            if "OP" in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Not allowed ALU Operation Operation with Literal Time in Line "
-                                    + str(line_number)
-                                )
-                        if ("WP" in command_info) and not ("PORT" in command_info):
+                        command_info["DST"] = command_info["PORT"]
+                        command_info.pop("PORT")
+                    elif CMD_DEST_SOURCE[0] == "WPORT_WR":
+                        command_info["SRC"] = CMD_DEST_SOURCE[1]
+                        if int(command_info["PORT"]) > 15:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: No Port Address < -p() > in Line "
+                                "COMMAND_RECOGNITION: Wave Port Port max value is 15 in line "
                                 + str(line_number)
                             )
-                    ###########################################################
-                    elif CMD_DEST_SOURCE[0] in ["DPORT_WR", "WPORT_WR", "TRIG"]:
-                        if not ("PORT" in command_info):
+                        command_info["DST"] = command_info["PORT"]
+                        command_info.pop("PORT")
+                    elif CMD_DEST_SOURCE[0] in ["FLAG", "NET", "COM", "PA", "PB"]:
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                    elif CMD_DEST_SOURCE[0] == "TIME":  # DST is ADDR
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                    elif CMD_DEST_SOURCE[0] == "DIV":
+                        if "LIT" not in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: No port in PORT_WR Instruction in line "
+                                "COMMAND_RECOGNITION: Dividend Parameter Error in line "
                                 + str(line_number)
                             )
+                        command_info["NUM"] = CMD_DEST_SOURCE[1]
+                        command_info["DEN"] = command_info["LIT"]
+                    elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
+                        label_refs.append(
+                            (command_info, CMD_DEST_SOURCE[1], line_number, mem_addr)
+                        )
+                    elif CMD_DEST_SOURCE[0] == "WAIT":
+                        logger.debug("COMMAND_RECOGNITION: WAIT adding Instruction")
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                        command_info["P_ADDR"] = mem_addr
 
-                    # GET COMMAND DESTINATION SOURCE
-                    ###############################################################
-                    CMD_DEST_SOURCE = re.findall(regex["CDS"], command)
-                    command_info["CMD"] = CMD_DEST_SOURCE[0]
-                    ###############################################################################
-                    ## MORE THAN ONE SOURCE
-                    if len(CMD_DEST_SOURCE) > 3:
-                        if CMD_DEST_SOURCE[0] in ["ARITH", "NET", "PA", "PB"]:
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                            command_info["R1"] = CMD_DEST_SOURCE[2]
-                            command_info["R2"] = CMD_DEST_SOURCE[3]
-                            if len(CMD_DEST_SOURCE) > 4:
-                                command_info["R3"] = CMD_DEST_SOURCE[4]
-                            if len(CMD_DEST_SOURCE) > 5:
-                                command_info["R4"] = CMD_DEST_SOURCE[5]
-                                if CMD_DEST_SOURCE[0] == "NET":
-                                    raise RuntimeError(
-                                        "COMMAND_RECOGNITION: NET command max 3 Registers in line "
-                                        + str(line_number)
-                                    )
-                            if len(CMD_DEST_SOURCE) > 6:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: "
-                                    + CMD_DEST_SOURCE[0]
-                                    + " Command max 4 Registers in line "
-                                    + str(line_number)
-                                )
+                        mem_addr += 1
+                    elif CMD_DEST_SOURCE[0] == "CLEAR":
+                        command_info["C_OP"] = CMD_DEST_SOURCE[1]
+                        logger.debug("COMMAND_RECOGNITION: CLEAR Instruction")
+                        command_info["P_ADDR"] = mem_addr
 
-                        elif (CMD_DEST_SOURCE[0] == "REG_WR") and (
-                            CMD_DEST_SOURCE[2] == "label"
-                        ):
-                            command_info["DST"] = CMD_DEST_SOURCE[1]
-                            command_info["SRC"] = CMD_DEST_SOURCE[2]
-                            if CMD_DEST_SOURCE[3] not in label_dict:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Label: "
-                                    + CMD_DEST_SOURCE[3]
-                                    + " Not defined in line "
-                                    + str(line_number)
-                                )
-                            command_info["ADDR"] = label_dict[CMD_DEST_SOURCE[3]]
-                            logger.info(
-                                "COMMAND_RECOGNITION: REG_WR command source label: "
-                                + CMD_DEST_SOURCE[3]
-                                + " replaced by value "
-                                + command_info["ADDR"]
-                                + "  in line "
-                                + str(line_number)
-                            )
-                        else:
+                    else:
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: [2] Parameter Error in line "
+                            + str(line_number)
+                        )
+                ###############################################################################
+                ## NO DESTINATION OR -- DESTINATION / SOURCE IN EXTRACTED PARAMETER
+                elif len(CMD_DEST_SOURCE) == 1:
+                    if CMD_DEST_SOURCE[0] in ["NOP", "ARITH", "TEST", "RET"]:
+                        pass
+                    elif CMD_DEST_SOURCE[0] == "DPORT_RD":
+                        if "PORT" not in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: [>3] Parameter Error in line "
+                                "COMMAND_RECOGNITION: No Port for DPORT_RD in line "
                                 + str(line_number)
                             )
-
-                    ###############################################################################
-                    ## ONLY ONE SOURCE / DEST
-                    elif len(CMD_DEST_SOURCE) == 3:
-                        if CMD_DEST_SOURCE[0] == "REG_WR":
-                            if CMD_DEST_SOURCE[2] == "label":
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Missing label in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = CMD_DEST_SOURCE[1]
-                            command_info["SRC"] = CMD_DEST_SOURCE[2]
-                        elif CMD_DEST_SOURCE[0] == "DPORT_WR":
-                            if int(command_info["PORT"]) > 3:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Data Port MAX port number is p3 in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = command_info["PORT"]
-                            command_info.pop("PORT")
-                            command_info["SRC"] = CMD_DEST_SOURCE[1]
-                            command_info["DATA"] = CMD_DEST_SOURCE[2]
-                        elif CMD_DEST_SOURCE[0] in ["COM", "TIME", "NET", "PA", "PB"]:
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                            command_info["R1"] = CMD_DEST_SOURCE[2]
-                        elif CMD_DEST_SOURCE[0] == "DIV":
-                            command_info["NUM"] = CMD_DEST_SOURCE[1]
-                            command_info["DEN"] = CMD_DEST_SOURCE[2]
-                        else:
+                        if int(command_info["PORT"]) > 7:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: [3] Parameter Error in line "
+                                "COMMAND_RECOGNITION: Data Port Read max value is 7 in line "
                                 + str(line_number)
                             )
-                    ###############################################################################
-                    ## NO SOURCE OR -- SOURCE IN EXTRACTED PARAMETER
-                    elif len(CMD_DEST_SOURCE) == 2:
-                        if CMD_DEST_SOURCE[0] == "DMEM_WR":
-                            command_info["SRC"] = CMD_DEST_SOURCE[1]
-                            command_info["DST"] = "[" + command_info["ADDR"] + "]"
-                            command_info.pop("ADDR")
-                        elif CMD_DEST_SOURCE[0] == "TRIG":
-                            command_info["SRC"] = CMD_DEST_SOURCE[1]
-                            if int(command_info["PORT"]) > 31:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Trigger Port max por number is p31 in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = command_info["PORT"]
-                            command_info.pop("PORT")
-                        elif CMD_DEST_SOURCE[0] == "WPORT_WR":
-                            command_info["SRC"] = CMD_DEST_SOURCE[1]
-                            if int(command_info["PORT"]) > 15:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Wave Port Port max value is 15 in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = command_info["PORT"]
-                            command_info.pop("PORT")
-                        elif CMD_DEST_SOURCE[0] in ["FLAG", "NET", "COM", "PA", "PB"]:
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                        elif CMD_DEST_SOURCE[0] == "TIME":  # DST is ADDR
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                        elif CMD_DEST_SOURCE[0] == "DIV":
-                            if "LIT" not in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Dividend Parameter Error in line "
-                                    + str(line_number)
-                                )
-                            command_info["NUM"] = CMD_DEST_SOURCE[1]
-                            command_info["DEN"] = command_info["LIT"]
-                        elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
-                            if CMD_DEST_SOURCE[1] in label_dict:
-                                if CMD_DEST_SOURCE[1] == "s15":
-                                    logger.info(
-                                        "COMMAND_RECOGNITION: BRANCH to r_addr  > line "
-                                        + str(line_number)
-                                    )
-                                else:
-                                    logger.info(
-                                        "COMMAND_RECOGNITION: BRANCH to label : "
-                                        + CMD_DEST_SOURCE[1]
-                                        + " is done to address "
-                                        + label_dict[CMD_DEST_SOURCE[1]]
-                                        + "  > line "
-                                        + str(line_number)
-                                    )
-                                command_info["ADDR"] = label_dict[CMD_DEST_SOURCE[1]]
-                                command_info["LABEL"] = CMD_DEST_SOURCE[1]
-                            else:
-                                if CMD_DEST_SOURCE[1] == "PREV":
-                                    command_info["ADDR"] = "&" + str(mem_addr - 1)
-                                elif CMD_DEST_SOURCE[1] == "HERE":
-                                    command_info["ADDR"] = "&" + str(mem_addr)
-                                elif CMD_DEST_SOURCE[1] == "NEXT":
-                                    command_info["ADDR"] = "&" + str(mem_addr + 1)
-                                elif CMD_DEST_SOURCE[1] == "SKIP":
-                                    command_info["ADDR"] = "&" + str(mem_addr + 2)
-                                else:
-                                    raise RuntimeError(
-                                        "COMMAND_RECOGNITION: Branch Address ERROR (Should be a label) in line "
-                                        + str(line_number)
-                                    )
-                        elif CMD_DEST_SOURCE[0] == "WAIT":
-                            logger.debug("COMMAND_RECOGNITION: WAIT adding Instruction")
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                            command_info["P_ADDR"] = mem_addr
-
-                            mem_addr += 1
-                        elif CMD_DEST_SOURCE[0] == "CLEAR":
-                            command_info["C_OP"] = CMD_DEST_SOURCE[1]
-                            logger.debug("COMMAND_RECOGNITION: CLEAR Instruction")
-                            command_info["P_ADDR"] = mem_addr
-
-                        else:
+                        command_info["DST"] = command_info["PORT"]
+                        command_info.pop("PORT")
+                    elif CMD_DEST_SOURCE[0] == "WMEM_WR":
+                        if "ADDR" not in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: [2] Parameter Error in line "
+                                "COMMAND_RECOGNITION: No Address for WMEM_WR in line "
                                 + str(line_number)
                             )
-                    ###############################################################################
-                    ## NO DESTINATION OR -- DESTINATION / SOURCE IN EXTRACTED PARAMETER
-                    elif len(CMD_DEST_SOURCE) == 1:
-                        if CMD_DEST_SOURCE[0] in ["NOP", "ARITH", "TEST", "RET"]:
-                            pass
-                        elif CMD_DEST_SOURCE[0] == "DPORT_RD":
-                            if "PORT" not in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: No Port for DPORT_RD in line "
-                                    + str(line_number)
-                                )
-                            if int(command_info["PORT"]) > 7:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Data Port Read max value is 7 in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = command_info["PORT"]
-                            command_info.pop("PORT")
-                        elif CMD_DEST_SOURCE[0] == "WMEM_WR":
-                            if "ADDR" not in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: No Address for WMEM_WR in line "
-                                    + str(line_number)
-                                )
-                            command_info["DST"] = "[" + command_info["ADDR"] + "]"
-                            command_info.pop("ADDR")
-                        elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
-                            if "ADDR" not in command_info:
-                                raise RuntimeError(
-                                    "COMMAND_RECOGNITION: Address Parameter Error in line "
-                                    + str(line_number)
-                                )
-                            command_info["ADDR"] = command_info["ADDR"]
-                        else:
+                        command_info["DST"] = "[" + command_info["ADDR"] + "]"
+                        command_info.pop("ADDR")
+                    elif CMD_DEST_SOURCE[0] in ["JUMP", "CALL"]:
+                        if "ADDR" not in command_info:
                             raise RuntimeError(
-                                "COMMAND_RECOGNITION: [1] Parameter Error in line "
+                                "COMMAND_RECOGNITION: Address Parameter Error in line "
                                 + str(line_number)
                             )
+                        command_info["ADDR"] = command_info["ADDR"]
                     else:
-                        raise (
-                            RuntimeError(
-                                "COMMAND_RECOGNITION: Error Processing Line "
-                                + str(line_number)
-                            )
-                            + ". Command not recognized."
+                        raise RuntimeError(
+                            "COMMAND_RECOGNITION: [1] Parameter Error in line "
+                            + str(line_number)
                         )
-
-                    # ADD CMD TO PROGRAM
-                    ###########################################################
-                    program_list.append(command_info)
                 else:
+                    raise (
+                        RuntimeError(
+                            "COMMAND_RECOGNITION: Error Processing Line "
+                            + str(line_number)
+                        )
+                        + ". Command not recognized."
+                    )
+
+                # ADD CMD TO PROGRAM
+                ###########################################################
+                program_list.append(command_info)
+        # RESOLVE LABELS
+        ###############################################################
+        for command_info, label, line_number, mem_addr in label_refs:
+            if command_info["CMD"] == "REG_WR":
+                if label not in label_dict:
                     raise RuntimeError(
-                        "COMMAND_RECOGNITION: Not a Command in Line " + str(line_number)
+                        "COMMAND_RECOGNITION: Label: "
+                        + label
+                        + " Not defined in line "
+                        + str(line_number)
+                    )
+                command_info["ADDR"] = label_dict[label]
+                logger.info(
+                    "COMMAND_RECOGNITION: REG_WR command source label: "
+                    + label
+                    + " replaced by value "
+                    + command_info["ADDR"]
+                    + "  in line "
+                    + str(line_number)
+                )
+            elif label in label_dict:
+                if label == "s15":
+                    logger.info(
+                        "COMMAND_RECOGNITION: BRANCH to r_addr  > line "
+                        + str(line_number)
                     )
-            return program_list
+                else:
+                    logger.info(
+                        "COMMAND_RECOGNITION: BRANCH to label : "
+                        + label
+                        + " is done to address "
+                        + label_dict[label]
+                        + "  > line "
+                        + str(line_number)
+                    )
+                command_info["ADDR"] = label_dict[label]
+                command_info["LABEL"] = label
+            elif label == "PREV":
+                command_info["ADDR"] = "&" + str(mem_addr - 1)
+            elif label == "HERE":
+                command_info["ADDR"] = "&" + str(mem_addr)
+            elif label == "NEXT":
+                command_info["ADDR"] = "&" + str(mem_addr + 1)
+            elif label == "SKIP":
+                command_info["ADDR"] = "&" + str(mem_addr + 2)
+            else:
+                raise RuntimeError(
+                    "COMMAND_RECOGNITION: Branch Address ERROR (Should be a label) in line "
+                    + str(line_number)
+                )
 
-        ##### START ASSEMBLER TO LIST
-        logger.debug("ASM2LIST: ##### STEP_1 - LABEL RECOGNITION")
-        label_dict = label_recognition(asm_str)
+        if logger.isEnabledFor(logging.DEBUG):
+            show_info = "\n## ALIAS LIST"
+            show_info += "\n" + ("###############################")
+            show_info += "\n" + ("REG  > ALIAS NAME\n-----|-------------")
+            for key in Alias_List:
+                show_info += "\n" + str((f"{Alias_List[key]:<3}" + " > " + key))
+            show_info += "\n" + ("###############################")
+            logger.debug("ALIAS_RECOGNITION: " + show_info)
 
-        logger.debug("ASM2LIST: ##### STEP_2 - COMMAND RECOGNITION")
-        program_list = command_recognition(asm_str, label_dict)
+            show_info = "\n## LABEL LIST "
+            show_info += "\n" + ("###############################")
+            show_info += "\n" + (
+                "LABEL NAME       > PMEM ADDRESS\n-----------------|-------------  "
+            )
+            for key in label_dict:
+                if key != "s15":
+                    show_info += "\n" + str((f"{key:<15}" + " > " + label_dict[key]))
+            show_info += "\n" + ("###############################")
+            logger.debug("LABEL_RECOGNITION: " + show_info)
 
         return (program_list, label_dict)
 
@@ -1372,44 +1421,24 @@ class Assembler:
     ) -> list:
         """
         translates a program list to binary form.
+        The program list is not modified, so it can be reused (e.g. with list2asm() or to translate it again).
         :program_list (list): each element is a dictionary with all the commands and instructions. see ' asm2list() '
         :label_dict (dict): dictionary with label information only if program_list contains labels.
         :save_unparsed_filename (str): if not null, opens this file and saves unparsed binary ('_' not removed).
         :returns (tuple): (binary_program_list, binary_program_array)
-        :binary_program_list (list): each element is a string with 0s and 1s representing the binary program
+        :binary_program_list (list): each element is an InstWord; str() of an element gives the binary program line as 0s and 1s
         :binary_program_array (list): each element is a list of 32-bit ints representing the binary program
         """
 
-        def parse_lines_and_labels(program_list: list, label_dict: dict) -> None:
-            for line_number, command in enumerate(program_list, start=1):
-                if (
-                    ("LABEL" in command)
-                    and (command["LABEL"] in label_dict)
-                    and "ADDR" not in command
-                ):
-                    command["ADDR"] = label_dict[command["LABEL"]]
-                if not "LINE" in command:
-                    command["LINE"] = line_number
-
         logger.debug("LIST2BIN: ##### LIST 2 BIN")
 
-        parse_lines_and_labels(program_list, label_dict)
-
-        # first line is NOP
-        # binary_program_list = ['000_000__000__0_0_0_00_00___00000___000000__000000____0_0000000__0_0000000__0000000000000000__0000000']
-        binary_program_list = []
-        CODE = "x"
-        for command in program_list:
-            logger.debug("list2bin: translating %s" % (command))
-            if "CMD" not in command:
-                raise RuntimeError(
-                    "COMMAND_TRANSLATION: No Command at line " + str(command["LINE"])
-                )
+        def translate(command: dict) -> list:
             if not ("UF" in command):
                 command["UF"] = "0"
+
             ###############################################################################
             if command["CMD"] == "NOP":
-                CODE = "000_000__000__0_0_0_00_00___00000___000000__000000____0_0000000__0_0000000__0000000000000000__0000000"
+                CODE = InstWord(0, 0, 0, 0, 0, 0, 0, 0)
             ###############################################################################
             elif command["CMD"] == "TEST":
                 command["UF"] = "1"
@@ -1431,13 +1460,13 @@ class Assembler:
                 CODE = Instruction.PORT_WR(command)
             ###############################################################################
             elif command["CMD"] == "JUMP":
-                CODE = Instruction.BRANCH(command, "00")
+                CODE = Instruction.BRANCH(command, 0b00)
             ###############################################################################
             elif command["CMD"] == "CALL":
-                CODE = Instruction.BRANCH(command, "10")
+                CODE = Instruction.BRANCH(command, 0b10)
             ###############################################################################
             elif command["CMD"] == "RET":
-                CODE = Instruction.BRANCH(command, "11")
+                CODE = Instruction.BRANCH(command, 0b11)
             ###############################################################################
             elif command["CMD"] in ["TIME", "FLAG", "DIV"]:
                 CODE = Instruction.CTRL(command)
@@ -1461,40 +1490,58 @@ class Assembler:
                     "COMMAND_TRANSLATION: Command Listed but not programmed > "
                     + command["CMD"]
                 )
-            ###################################################################################
-            length = CODE.count("0") + CODE.count("1")
-            if length != 72:
-                if command["CMD"] == "WAIT":
+            if command["CMD"] == "WAIT":
+                if debug:
                     logger.debug(
                         "COMMAND_TRANSLATION: Command Wait add one more instruction "
                         + str(command["LINE"])
                     )
-                else:
+            else:
+                CODE.cmd = command["CMD"]
+                CODE = [CODE]
+            for word in CODE:
+                if word.value >> 72:
                     raise RuntimeError(
-                        f"COMMAND_TRANSLATION: {CODE}\nINSTRUCTION LENGTH > {length} at line {command['LINE']}"
+                        f"COMMAND_TRANSLATION: INSTRUCTION LENGTH > {word.value.bit_length()} at line {command['LINE']}"
                     )
-            if command["CMD"] == "WAIT":
-                binary_program_list.extend(CODE)
-            else:
-                CODE = CODE + " //" + command["CMD"]
-                binary_program_list.append(CODE)
+            return CODE
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # programs repeat many instructions, so each distinct instruction is only translated once
+        # the line number and program address don't change the translation, except the address of a WAIT
+        encoded = {}
+        binary_program_list = []
+        for line_number, command in enumerate(program_list, start=1):
+            if debug:
+                logger.debug("list2bin: translating %s" % (command))
+            line_number = command.get("LINE", line_number)
+            if "CMD" not in command:
+                raise RuntimeError(
+                    "COMMAND_TRANSLATION: No Command at line " + str(line_number)
+                )
+            key = command.copy()
+            key.pop("LINE", None)
+            if key["CMD"] != "WAIT":
+                key.pop("P_ADDR", None)
+            if "LABEL" in key and key["LABEL"] in label_dict and "ADDR" not in key:
+                key["ADDR"] = label_dict[key["LABEL"]]
+            items = tuple(key.items())
+            CODE = encoded.get(items)
+            if CODE is None:
+                # the Instruction methods fill in defaults and rewrite some fields, so they get a copy
+                current = dict(key, LINE=line_number)
+                if "P_ADDR" in command:
+                    current["P_ADDR"] = command["P_ADDR"]
+                CODE = translate(current)
+                encoded[items] = CODE
+            binary_program_list.extend(CODE)
 
         if save_unparsed_filename:
             with open(save_unparsed_filename, "w+") as f:
                 for line in binary_program_list:
                     f.write(f"{line}\n")
 
-        binary_array = []
-        for line_bin in binary_program_list:
-            tmp = line_bin.replace("_", "")
-            b0 = "0b" + tmp[40:72]
-            n0 = int(b0, 2)
-            b1 = "0b" + tmp[8:40]
-            n1 = int(b1, 2)
-            b2 = "0b" + tmp[:8]
-            n2 = int(b2, 2)
-            binary_line = [n0, n1, n2, 0, 0, 0, 0, 0]
-            binary_array.append(binary_line)
+        binary_array = [word.words() for word in binary_program_list]
         return binary_program_list, binary_array
 
     def file_asm2bin(filename: str, save_unparsed_filename: str = "") -> list:
@@ -1532,8 +1579,8 @@ class Assembler:
 class Instruction:
     # PROCESSING
     @staticmethod
-    def __PROCESS_CONDITION(command: dict) -> str:
-        cond = ""
+    def __PROCESS_CONDITION(command: dict) -> int:
+        cond = 0
         if "IF" in command:
             if command["IF"] not in condList:
                 raise RuntimeError(
@@ -1542,17 +1589,15 @@ class Instruction:
                     + ") in instruction "
                     + str(command["LINE"])
                 )
-            cond = condList[command["IF"]]
-        else:
-            cond = "000"
+            cond = int(condList[command["IF"]], 2)
         return cond
 
     @staticmethod
     def __PROCESS_WR(command: dict) -> tuple:  #### Get WR
-        RD = "0000000"
-        Rdi = Wr = "0"
+        RD = 0
+        Rdi = Wr = 0
         if "WR" in command:
-            Wr = "1"
+            Wr = 1
             regex_inside_parenthesis = r"\s*([\w]+)"
             DEST_SOURCE = re.findall(regex_inside_parenthesis, command["WR"])
             #### SOURCE
@@ -1567,14 +1612,14 @@ class Instruction:
                         "Parameter.WR: Operation < -op() > option not found in instruction "
                         + str(command["LINE"])
                     )
-                Rdi = "0"
+                Rdi = 0
             elif DEST_SOURCE[1] == "imm":
                 if "LIT" not in command:
                     raise RuntimeError(
                         "Parameter.WR: Literal Value not found in instruction "
                         + str(command["LINE"])
                     )
-                Rdi = "1"
+                Rdi = 1
             else:
                 raise RuntimeError(
                     "Parameter.WR: Posible Source Dest for <-wr(reg source)> are (op, imm) in instruction "
@@ -1587,8 +1632,8 @@ class Instruction:
     @staticmethod
     def __PROCESS_WP(command: dict) -> tuple:
         #### WRITE PORT
-        Wp = Sp = "0"
-        Dp = "000000"
+        Wp = Sp = 0
+        Dp = 0
         if "WP" in command:
             #### DESTINATION PORT
             if "PORT" not in command:
@@ -1596,12 +1641,12 @@ class Instruction:
                     "Parameter.WP: Port Address not recognized < pX > "
                     + str(command["LINE"])
                 )
-            Wp = "1"
-            Dp = integer2bin(command["PORT"], 6)
+            Wp = 1
+            Dp = int2field(int(command["PORT"]), 6)
             if command["WP"] == "r_wave":
-                Sp = "1"
+                Sp = 1
             elif command["WP"] == "wmem":
-                Sp = "0"
+                Sp = 0
             else:
                 raise RuntimeError(
                     "Parameter.WP: Source Wave Port not recognized (wreg, r_wave) "
@@ -1611,37 +1656,31 @@ class Instruction:
 
     @staticmethod
     def __PROCESS_SOURCE(command: dict) -> tuple:
-        df = alu_op = "X"
-        rsD0 = rsD1 = DataImm = ""
+        """
+        :returns (tuple): (data source, 32 bits; ALU operation; data format)
+        """
         FULL = (command["CMD"] == "REG_WR") and (command["SRC"] == "op")
         if "OP" in command:
             cmd_op = command["OP"].split()
             if len(cmd_op) == 1:  # Operation is COPY REG (Add Zero)
-                # print('LEN 1')
                 src_type = get_src_type(cmd_op[0])
-                # print('src_type[0] > ', src_type )
-                df = "01"
-                rsD1 = "0_0000000"
-                if FULL:
-                    alu_op = "0000"  # REG_WR rd op -op(rs)
-                else:
-                    alu_op = "00"  # -wr(rd op) -op(rs)
+                df = 0b01
+                alu_op = 0  # REG_WR rd op -op(rs) or -wr(rd op) -op(rs)
 
                 if "LIT" in command:
                     DataImm = get_imm_dt(command["LIT"], 16)
                 else:
-                    DataImm = "_0000000000000000"
+                    DataImm = 0
 
                 if src_type[0] != "R":
                     raise RuntimeError("Parameter.SRC: Operand can not be a Literal.")
 
                 rsD0 = get_reg_addr(cmd_op[0], "src_data")
+                Data_Source = (rsD0 << 24) | DataImm
 
             elif len(cmd_op) == 2:
-                # print('LEN 2 >',cmd_op)
                 operation = cmd_op[0]
                 src_type = get_src_type(cmd_op[1])
-                # print('src_type[1] > ', src_type)
                 if not FULL:
                     raise RuntimeError(
                         "Parameter.SRC: 1-FULL Operation Not Allowed > "
@@ -1654,26 +1693,20 @@ class Instruction:
                         "Parameter.SRC: Operation Not Recognized > "
                         + str(command["OP"])
                     )
-                df = "10"
-                alu_op = aluList[operation]
-                DataImm = "__000000000000000000000000"
+                df = 0b10
+                alu_op = int(aluList[operation], 2)
                 if src_type[0] != "R":
                     raise RuntimeError("Parameter.SRC: Operand can not be a Literal.")
                 rsD0 = get_reg_addr(cmd_op[1], "src_data")
+                Data_Source = rsD0 << 24
                 ## ABS Should be on rsD1
                 if operation == "ABS":
-                    df = "01"
-                    rsD1 = rsD0
-                    rsD0 = "0_0000000"
-                    DataImm = "_0000000000000000"
-                # if (error!=0):
-                #    raise RuntimeError('Parameter.SRC: 1-Operation Not Allowed > ' + str(command['OP']) +' in instruction ' + str(command['LINE']) )
+                    df = 0b01
+                    Data_Source = rsD0 << 16
 
             elif len(cmd_op) == 3:
-                # print('LEN 3 >',cmd_op)
                 ## CHECK FOR FIRST OPERAND (ALU_IN_A > rsD0)
                 src_type = get_src_type(cmd_op[0])
-                # print('First Operand >',src_type, cmd_op[0])
                 if src_type[0] != "R":
                     raise RuntimeError(
                         "Parameter.SRC: First Operand can not be a Literal."
@@ -1681,19 +1714,17 @@ class Instruction:
                 rsD0 = get_reg_addr(cmd_op[0], "src_data")
                 ## CHECK FOR SECOND OPERAND (ALU_IN_B > Imm|rsD1)
                 src_type = get_src_type(cmd_op[2])
-                # print('Second Operand >',src_type, cmd_op[2])
                 if src_type[0] == "R":  ## REG OP REG
-                    df = "01"
+                    df = 0b01
                     rsD1 = get_reg_addr(cmd_op[2], "src_data")
                     ## Literal for Second Data Task -wr(rd imm)
                     if "LIT" in command:
                         DataImm = get_imm_dt(command["LIT"], 16)
                     else:
-                        DataImm = "_0000000000000000"
+                        DataImm = 0
+                    Data_Source = (rsD0 << 24) | (rsD1 << 16) | DataImm
                 elif src_type[0] == "N":  ## is Number
                     DataImm = get_imm_dt(cmd_op[2], 24)
-                    # if (error):
-                    #    raise RuntimeError('Parameter.SRC: Literal Value error in instruction ' + str(command['LINE']) )
                     if cmd_op[1] in ["SR", "SL", "ASR"]:
                         lit_val = get_imm_dt(cmd_op[2], 24, 1)
                         if lit_val > 15:
@@ -1701,10 +1732,13 @@ class Instruction:
                                 "Parameter.SRC: Max Shift is 15 in instruction "
                                 + str(command["LINE"])
                             )
-                        # if (error):
-                        #    raise RuntimeError('Parameter.SRC: Literal Value error in instruction ' + str(command['LINE']) )
-                    df = "10"
-                    DataImm = "_" + DataImm
+                    df = 0b10
+                    Data_Source = (rsD0 << 24) | DataImm
+                else:
+                    raise RuntimeError(
+                        "Parameter.SRC: Second Operand not recognized in instruction "
+                        + str(command["LINE"])
+                    )
 
                 ## CHECK FOR OPERATION
                 operation = cmd_op[1]
@@ -1714,71 +1748,81 @@ class Instruction:
                             "Parameter.SRC: ALU {Full List} Operation Not Recognized in instruction "
                             + str(command["LINE"])
                         )
-                    alu_op = aluList[operation]
+                    alu_op = int(aluList[operation], 2)
                 else:
                     if operation not in aluList_s:
                         raise RuntimeError(
                             "Parameter.SRC: ALU {Reduced List} Operation Not Recognized in instruction "
                             + str(command["LINE"])
                         )
-                    alu_op = aluList_s[operation]
+                    alu_op = int(aluList_s[operation], 2)
+            else:
+                raise RuntimeError(
+                    "Parameter.SRC: Operation format error > "
+                    + str(command["OP"])
+                    + " in instruction "
+                    + str(command["LINE"])
+                )
         ## LITERAL and NO OP
         elif "LIT" in command:
-            df = "11"
-            alu_op = "00"
-            DataImm = "__" + get_imm_dt(command["LIT"], 32)
+            df = 0b11
+            alu_op = 0
+            Data_Source = get_imm_dt(command["LIT"], 32)
         else:
-            df = "11"
-            alu_op = "00"
-            DataImm = "___00000000000000000000000000000000"
-
-        # if (error):
-        #    raise RuntimeError('Parameter.SRC: Error in line ' + str(command['LINE']) )
-        #    return error, 'X', 'X', 'X'
-        Data_Source = rsD0 + "__" + rsD1 + "_" + DataImm
+            df = 0b11
+            alu_op = 0
+            Data_Source = 0
         return Data_Source, alu_op, df
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def __PROCESS_MEM_ADDR(ADDR_CMD: str) -> tuple:
-        AI = "0"
-        rsA0 = rsA1 = "x"
+        """
+        :returns (tuple): (rsA0, 11 bits; rsA1, 6 bits; address is immediate)
+        """
+        AI = 0
+        rsA0 = rsA1 = None
         comp_ADDR_FMT = "s(\d+)|r(\d+)|&(\d+)|\s*([A-Z]{3}|[A-Z]{2}|\+|\-)"
         param_op = re.findall(comp_ADDR_FMT, ADDR_CMD)
         if len(param_op) == 1:
             ## CHECK FOR OPERAND
-            rsA1 = "000000"  # Register ZERO
+            rsA1 = 0  # Register ZERO
             if param_op[0][0]:  ## is SREG
-                rsA0 = "00000___0" + integer2bin(param_op[0][0], 5)
+                rsA0 = (0 << 5) | int2field(int(param_op[0][0]), 5)
             elif param_op[0][1]:  ## is DREG
-                rsA0 = "00000___1" + integer2bin(param_op[0][1], 5)
+                rsA0 = (1 << 5) | int2field(int(param_op[0][1]), 5)
             elif param_op[0][2]:  ## is Literal
-                rsA0 = "___" + integer2bin(param_op[0][2], 11)
-                AI = "1"
+                rsA0 = int2field(int(param_op[0][2]), 11)
+                AI = 1
             else:
                 raise RuntimeError("Parameter.MEM_ADDR: First Operand not recognized.")
         elif len(param_op) == 3:
             ## CHECK FOR FIRST OPERAND
             if param_op[0][0]:  ## is SREG
-                rsA1 = "0" + integer2bin(param_op[0][0], 5)
+                rsA1 = (0 << 5) | int2field(int(param_op[0][0]), 5)
             elif param_op[0][1]:  ## is DREG
-                rsA1 = "1" + integer2bin(param_op[0][1], 5)
+                rsA1 = (1 << 5) | int2field(int(param_op[0][1]), 5)
             elif param_op[0][2]:  ## is Literal
                 raise RuntimeError(
                     "Parameter.MEM_ADDR: First Operand can not be a Literal."
                 )
             ## CHECK FOR SECOND OPERAND
             if param_op[2][0]:  ## is SREG
-                rsA0 = "00000___0" + integer2bin(param_op[2][0], 5)
+                rsA0 = (0 << 5) | int2field(int(param_op[2][0]), 5)
             elif param_op[2][1]:  ## is DREG
-                rsA0 = "00000___1" + integer2bin(param_op[2][1], 5)
+                rsA0 = (1 << 5) | int2field(int(param_op[2][1]), 5)
             elif param_op[2][2]:  ## is Literal
-                rsA0 = "___" + integer2bin(param_op[2][2], 11)
-                AI = "1"
+                rsA0 = int2field(int(param_op[2][2]), 11)
+                AI = 1
             ## CHECK FOR PLUS
             if param_op[1][3] != "+":  ## is R_Reg
                 raise RuntimeError(
                     "Parameter.MEM_ADDR: Address Operand should be < + >."
                 )
+            if rsA0 is None or rsA1 is None:
+                raise RuntimeError(
+                    "Parameter.MEM_ADDR: Address Operand not recognized: " + ADDR_CMD
+                )
         else:
             raise RuntimeError(
                 "Parameter.MEM_ADDR: Address format error, should be Data Register(r) or Literal(&): "
@@ -1788,9 +1832,10 @@ class Instruction:
 
     # INSTRUCTIONS
     @staticmethod
-    def REG_WR(current: dict) -> str:
-        AI = "0"
-        RdP = "000000"
+    def REG_WR(current: dict) -> InstWord:
+        AI = 0
+        RdP = 0
+        UF = int(current["UF"])
         ######### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         ######### SOURCES
@@ -1802,8 +1847,8 @@ class Instruction:
                     + str(current["LINE"])
                 )
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-            CFG = "00__" + current["UF"] + "__" + alu_op
-            ADDR = "___00000000000__000000"  # 17 Bits 11 + 6
+            CFG = (0b00 << 5) | (UF << 4) | alu_op
+            ADDR = 0  # 17 Bits 11 + 6
         #### SOURCE IMM
         elif current["SRC"] == "imm":
             #### Get Data Source
@@ -1813,8 +1858,8 @@ class Instruction:
                     + str(current["LINE"])
                 )
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-            CFG = "11__" + current["UF"] + "_00_" + alu_op
-            ADDR = "___00000000000__000000"  # 17 Bits 11 + 6
+            CFG = (0b11 << 5) | (UF << 4) | (0b00 << 2) | alu_op
+            ADDR = 0  # 17 Bits 11 + 6
         #### SOURCE LABEL
         elif current["SRC"] == "label":
             #### Get Data Source
@@ -1830,13 +1875,12 @@ class Instruction:
                     "Instruction.REG_WR: Address error in line " + str(current["LINE"])
                 )
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-            ADDR = "___00000000000__000000"  # 17 Bits 11 + 6
-            CFG = "11__" + current["UF"] + "_00_00"
+            ADDR = 0  # 17 Bits 11 + 6
+            CFG = (0b11 << 5) | (UF << 4) | (0b00 << 2) | 0b00
         #### SOURCE DATA MEMORY
         elif current["SRC"] == "dmem":
             #### Get Data Source
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-            CFG = "01__" + current["UF"] + "_00_" + alu_op
             #### Get ADDRESS
             if "ADDR" not in current:
                 raise RuntimeError(
@@ -1844,24 +1888,21 @@ class Instruction:
                     + str(current["LINE"])
                 )
             rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["ADDR"])
-            ADDR = rsA0 + "__" + rsA1
-            CFG = "01__" + current["UF"] + "_00_" + alu_op
+            ADDR = (rsA0 << 6) | rsA1
+            CFG = (0b01 << 5) | (UF << 4) | (0b00 << 2) | alu_op
         #### SOURCE WAVE MEM
         elif current["SRC"] == "wmem":
-            if COND != "000":
+            if COND != 0:
                 raise RuntimeError(
                     "Instruction.REG_WR: Wave Register Write is not conditional < -if() >  in instruction "
                     + str(current["LINE"])
                 )
-            WW = WP = "0"
+            WW = 0
             if "WW" in current:
-                WW = "1"
+                WW = 1
             #### WRITE PORT
             WP, Sp, RdP = Instruction.__PROCESS_WP(current)
-            COND = WW + Sp + WP
-            #### WRITE REGISTER
-            Wr = Rdi = "0"
-            Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
+            COND = (WW << 2) | (Sp << 1) | WP
             #### Get Data Source
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
             #### Get ADDRESS
@@ -1871,12 +1912,12 @@ class Instruction:
                     + str(current["LINE"])
                 )
             rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["ADDR"])
-            if rsA1 != "000000":
+            if rsA1 != 0:
                 raise RuntimeError(
                     "Instruction.REG_WR: Wave Memory Addres Error Source Should be LIT or Reg in instruction "
                     + str(current["LINE"])
                 )
-            ADDR = rsA0 + "__" + RdP
+            ADDR = (rsA0 << 6) | RdP
         else:
             raise RuntimeError(
                 "Instruction.REG_WR: Posible REG_WR sources are (op, imm, dmem, wmem, label ) in instruction "
@@ -1890,15 +1931,8 @@ class Instruction:
                     "Instruction.REG_WR: Wave Memory Source Should have a Wave Register <r_wave> Destination "
                     + str(current["LINE"])
                 )
-            Wr = Rdi = "0"
             Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
-            CFG = "10__" + current["UF"] + "_" + Wr + Rdi + "_" + alu_op
-        elif (current["SRC"] == "label") and ():
-            if RD != "15":
-                logger.warning(
-                    "Instruction.REG_WR: Register used to BRANCH should be s15 in instruction "
-                    + str(current["LINE"])
-                )
+            CFG = (0b10 << 5) | (UF << 4) | (Wr << 3) | (Rdi << 2) | alu_op
         else:
             comp_OP_PARAM = "^s(\d+)|^r(\d+)|^w(\d+)|(r_wave)"
             RD = re.findall(comp_OP_PARAM, current["DST"])
@@ -1910,34 +1944,18 @@ class Instruction:
                     + str(current["LINE"])
                 )
             RD = get_reg_addr(current["DST"], "Dest")
-        return (
-            "100_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "__"
-            + CFG
-            + "___"
-            + ADDR
-            + "____"
-            + DATA
-            + "__"
-            + RD
-        )
+        return InstWord(0b100, AI, DF, COND, CFG, ADDR, DATA, RD)
 
     @staticmethod
-    def DMEM_WR(current: dict) -> str:
+    def DMEM_WR(current: dict) -> InstWord:
         #### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         #### WRITE REGISTER
-        Wr = Rdi = "0"
         Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
         #### DATA SOURCE
         DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
         #### ADDRESS
         rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["DST"])
-        ADDR = rsA0 + "__" + rsA1
         #### SOURCE
         if current["SRC"] == "op":
             if "OP" not in current:
@@ -1945,41 +1963,33 @@ class Instruction:
                     "Instruction.MEM_WR: >  -op() option not found in instruction "
                     + str(current["LINE"])
                 )
-            DI = "0"
+            DI = 0
         elif current["SRC"] == "imm":
             if "LIT" not in current:
                 raise RuntimeError(
                     "Instruction.MEM_WR: No Literal value found in instruction "
                     + str(current["LINE"])
                 )
-            DI = "1"
+            DI = 1
         else:
             raise RuntimeError(
                 "Instruction.MEM_WR: Posible MEM_WR sources are (op, imm) in instruction "
                 + str(current["LINE"])
             )
-        CFG = current["UF"] + "_" + Wr + Rdi + "_" + alu_op
-        return (
-            "101_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "__0_"
-            + DI
-            + "_"
-            + CFG
-            + "___"
-            + ADDR
-            + "____"
-            + DATA
-            + "__"
-            + RD
+        CFG = (
+            (0 << 6)
+            | (DI << 5)
+            | (int(current["UF"]) << 4)
+            | (Wr << 3)
+            | (Rdi << 2)
+            | alu_op
         )
+        ADDR = (rsA0 << 6) | rsA1
+        return InstWord(0b101, AI, DF, COND, CFG, ADDR, DATA, RD)
 
     @staticmethod
-    def WMEM_WR(current: dict) -> str:
-        AI = Wp = TI = "0"
+    def WMEM_WR(current: dict) -> InstWord:
+        TI = 0
         #### WMEM ADDRESS
         if "DST" not in current:
             raise RuntimeError(
@@ -1987,105 +1997,75 @@ class Instruction:
                 + str(current["LINE"])
             )
         rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["DST"])
-        if rsA1 != "000000":
+        if rsA1 != 0:
             raise RuntimeError(
                 "Instruction.REG_WR: Wave Memory Addres Error Source Should be LIT or Reg in line "
                 + str(current["LINE"])
             )
         #### WRITE REGISTER
-        Wr = Rdi = "0"
         Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
         #### WRITE PORT
         Wp, Sp, Dp = Instruction.__PROCESS_WP(current)
         #### DATA SOURCE
         DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-        # if error:
-        #    raise RuntimeError('Instruction.WMEM_WR: Error in line ' + str(current['LINE']) )
-        #    CODE = 'X'
         if "TIME" in current:
-            TI = "1"
-            TIME = get_imm_dt(current["TIME"], 32)
-            # if (error):
-            #    raise RuntimeError('Parameter.WMEM_WR: Time Value error in instruction ')
-            DATA = "_____" + TIME
-        CFG = "1_" + TI + "_" + current["UF"] + "_" + Wr + Rdi + "_" + alu_op
-        return (
-            "101_"
-            + AI
-            + DF
-            + "__1"
-            + Sp
-            + Wp
-            + "__"
-            + CFG
-            + "___"
-            + rsA0
-            + "__"
-            + Dp
-            + "____"
-            + DATA
-            + "__"
-            + RD
+            TI = 1
+            DATA = get_imm_dt(current["TIME"], 32)
+        COND = (1 << 2) | (Sp << 1) | Wp
+        CFG = (
+            (1 << 6)
+            | (TI << 5)
+            | (int(current["UF"]) << 4)
+            | (Wr << 3)
+            | (Rdi << 2)
+            | alu_op
         )
+        ADDR = (rsA0 << 6) | Dp
+        return InstWord(0b101, AI, DF, COND, CFG, ADDR, DATA, RD)
 
     @staticmethod
-    def CFG(current: dict) -> str:
-        AI = SO = TO = "0"
-        ADDR = "00000000000_000000"
+    def CFG(current: dict) -> InstWord:
+        AI = SO = TO = 0
         #### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         #### WRITE REGISTER
-        Wr = Rdi = "0"
         Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
         #### DATA SOURCE
         DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-        # if (error):
-        #    logger.error('Instruction.CFG: Error in line ' + str(current['LINE']) )
-        #    CODE = 'X'
-        CFG = current["UF"] + "_" + Wr + Rdi + "_" + alu_op
-        return (
-            "000_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "__"
-            + SO
-            + TO
-            + "__"
-            + CFG
-            + "_______"
-            + ADDR
-            + "____"
-            + DATA
-            + "__"
-            + RD
+        CFG = (
+            (SO << 6)
+            | (TO << 5)
+            | (int(current["UF"]) << 4)
+            | (Wr << 3)
+            | (Rdi << 2)
+            | alu_op
         )
+        return InstWord(0b000, AI, DF, COND, CFG, 0, DATA, RD)
 
     @staticmethod
-    def BRANCH(current: dict, cj: str) -> str:
+    def BRANCH(current: dict, cj: int) -> InstWord:
         #### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         #### WRITE REGISTER
-        Wr = Rdi = "0"
         Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
         #### DATA SOURCE
         DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
         #### DESTINATION MEMORY ADDRESS
-        if cj == "11":  # RET Instruction. ADDR came from STACK
+        if cj == 0b11:  # RET Instruction. ADDR came from STACK
             current["UF"] = "0"
-            AI = "0"
-            ADDR = "_00000000000_000000"
+            AI = 0
+            ADDR = 0
         else:
             comp_addr = "&(\d+)|s(\d+)"
             addr = re.findall(comp_addr, current["ADDR"])
             try:
                 if addr[0][0]:  # LITERAL
-                    ADDR = "_" + integer2bin(addr[0][0], 11, uint=1) + "_000000"
-                    AI = "1"
+                    # 11-bit address, the low 6 bits are unused
+                    ADDR = int2field(int(addr[0][0]), 11, uint=1) << 6
+                    AI = 1
                 elif addr[0][1] == "15":  # SREG s15
-                    ADDR = "_00000000000_000000"
-                    AI = "0"
+                    ADDR = 0
+                    AI = 0
                 else:
                     raise RuntimeError(
                         "Instruction.BRANCH: JUMP Memory Address not recognized (imm or s15)"
@@ -2094,47 +2074,25 @@ class Instruction:
                 raise RuntimeError(
                     f"COMMAND RECOGNITION: for address at line {current['LINE']}. (possible extra [])"
                 )
-        # if (error):
-        #    raise RuntimeError("Instruction.BRANCH: Exit with Error in instruction " + str(current['LINE']) )
-        #    CODE = 'X'
-        CFG = current["UF"] + "_" + Wr + Rdi + "_" + alu_op
-        return (
-            "001_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "__"
-            + cj
-            + "__"
-            + CFG
-            + "______"
-            + ADDR
-            + "____"
-            + DATA
-            + "__"
-            + RD
-        )
+        CFG = (cj << 5) | (int(current["UF"]) << 4) | (Wr << 3) | (Rdi << 2) | alu_op
+        return InstWord(0b001, AI, DF, COND, CFG, ADDR, DATA, RD)
 
     @staticmethod
-    def PORT_WR(current: dict) -> str:
+    def PORT_WR(current: dict) -> InstWord:
         ##### DATA PORTS
         if current["CMD"] in ["DPORT_WR", "DPORT_RD", "TRIG"]:
-            SO = AI = Ww = Sp = "0"
-            rsA0 = "___00000000000"
-            #### WRITE REGISTER
-            Wr = Rdi = "0"
-            Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
+            SO = AI = Ww = Sp = 0
+            rsA0 = 0
             #### PORT DESTINATION
             #### TRIG PORT
             if current["CMD"] == "TRIG":
-                Wp = "1"
-                AI = Sp = "1"
+                Wp = 1
+                AI = Sp = 1
                 current["DST"] = str(int(current["DST"]) + 32)
                 if current["SRC"] == "set":
-                    rsA0 = "___00000000001"
+                    rsA0 = 1
                 elif current["SRC"] == "clr":
-                    rsA0 = "___00000000000"
+                    rsA0 = 0
                 else:
                     raise RuntimeError(
                         "Instruction.PORT_WR: Possible options for TRIG command are (set, clr)"
@@ -2142,8 +2100,8 @@ class Instruction:
 
             #### DATA PORT
             elif current["CMD"] == "DPORT_WR":
-                Wp = "1"
-                Sp = "0"
+                Wp = 1
+                Sp = 0
                 if current["SRC"] == "imm":
                     if "DATA" not in current:
                         raise RuntimeError(
@@ -2155,16 +2113,16 @@ class Instruction:
                             "Instruction.PORT_WR: Data imm should be smaller than 2047 No Port Data value found in line "
                             + str(current["LINE"])
                         )
-                    AI = Sp = "1"
+                    AI = Sp = 1
                     # DATA CAMES WITHOUT #
-                    rsA0 = "___" + integer2bin(current["DATA"], 11)
+                    rsA0 = int2field(int(current["DATA"]), 11)
                 elif current["SRC"] == "reg":
                     if "DATA" not in current:
                         raise RuntimeError(
                             "Instruction.PORT_WR: No Port Register found in line "
                             + str(current["LINE"])
                         )
-                    AI = Sp = "0"
+                    AI = Sp = 0
                     comp_REG_FMT = "r(\d+)"
                     param_op = re.findall(comp_REG_FMT, current["DATA"])
                     if not param_op:
@@ -2172,7 +2130,7 @@ class Instruction:
                             "Instruction.PORT_WR: Register Selection Error, should be dreg in line "
                             + str(current["LINE"])
                         )
-                    rsA0 = "00000___1" + integer2bin(param_op[0], 5)
+                    rsA0 = (1 << 5) | int2field(int(param_op[0]), 5)
                 else:
                     raise RuntimeError(
                         "Instruction.PORT_WR: Posible DPORT_WR sources are (imm, reg) in line "
@@ -2180,27 +2138,27 @@ class Instruction:
                     )
             #### READ DATA PORT
             else:
-                TO = Wp = "0"
+                Wp = 0
         ##### WAVEFORM PORT
         else:
-            AI = Ww = Sp = "0"
-            SO = Wp = "1"
+            AI = Ww = Sp = 0
+            SO = Wp = 1
             #### SOURCE
             if current["SRC"] == "wmem":
-                Sp = "0"
+                Sp = 0
                 if "ADDR" not in current:
                     raise RuntimeError(
                         "Instruction.PORT_WR: No address specified for < wmem > in line "
                         + str(current["LINE"])
                     )
                 rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["ADDR"])
-                if rsA1 != "000000":
+                if rsA1 != 0:
                     raise RuntimeError(
                         "Instruction.REG_WR: Wave Memory Addres Error Source Should be LIT or Reg in line "
                         + str(current["LINE"])
                     )
             elif current["SRC"] == "r_wave":
-                Sp = "1"
+                Sp = 1
                 #### WRITE WAVE MEMORY
                 if "WW" in current:
                     if "ADDR" not in current:
@@ -2208,111 +2166,91 @@ class Instruction:
                             "Instruction.PORT_WR: No address specified for < -ww > in line "
                             + str(current["LINE"])
                         )
-                    Ww = "1"
+                    Ww = 1
                     rsA0, rsA1, AI = Instruction.__PROCESS_MEM_ADDR(current["ADDR"])
-                    if rsA1 != "000000":
+                    if rsA1 != 0:
                         raise RuntimeError(
                             "Instruction.REG_WR: Wave Memory Addres Error Source Should be LIT or Reg in line "
                             + str(current["LINE"])
                         )
                 else:
-                    Ww = "0"
-                    rsA0 = "___00000000000"
+                    Ww = 0
+                    rsA0 = 0
             else:
                 raise RuntimeError(
                     "Instruction.PORT_WR: Posible wave sources are (wmem, r_wave) in line "
                     + str(current["LINE"])
                 )
-                DF = "11"
         #### OUT TIME
         if "TIME" in current:
-            TO = "1"
-            DF = "11"
-            TIME = get_imm_dt(current["TIME"], 32)
-            # if (error):
-            #    raise RuntimeError('Parameter.WMEM_WR: Time Value error in instruction ')
-            DATA = "_____" + TIME
-
-            # DATA = '______'+ integer2bin(current['TIME'], 32)
-            CFG = SO + TO + "____00000"
-            RD = "0000000"
+            TO = 1
+            DF = 0b11
+            DATA = get_imm_dt(current["TIME"], 32)
+            CFG = (SO << 6) | (TO << 5)
+            RD = 0
             if "WR" in current or "OP" in current:
                 raise RuntimeError(
                     "Instruction.PORT_WR: If time specified, Not allowed SDI <-wr(), -op()> in line "
                     + str(current["LINE"])
                 )
         else:
-            TO = "0"
+            TO = 0
             logger.debug(
-                "Instruction.PORT_WR: No time specified for command will use s_time in line "
-                + str(current["LINE"])
+                "Instruction.PORT_WR: No time specified for command will use s_time in line %s",
+                current["LINE"],
             )
             #### WRITE REGISTER
-            Wr = Rdi = "0"
             Wr, Rdi, RD = Instruction.__PROCESS_WR(current)
             #### DATA SOURCE
             DATA, alu_op, DF = Instruction.__PROCESS_SOURCE(current)
-            CFG = SO + TO + "__" + current["UF"] + "_" + Wr + Rdi + "_" + alu_op
+            CFG = (
+                (SO << 6)
+                | (TO << 5)
+                | (int(current["UF"]) << 4)
+                | (Wr << 3)
+                | (Rdi << 2)
+                | alu_op
+            )
         #### OUT PORT
         if "DST" not in current:
             raise RuntimeError(
                 "Instruction.PORT_WR: No Destination Port in line "
                 + str(current["LINE"])
             )
-        rsA1 = integer2bin(current["DST"], 6, 1)
-        # if (error):
-        #    raise RuntimeError("Instruction.PORT_WR: Exit with Error in line " + str(current['LINE']) )
-        #    CODE = 'X'
-        COND = Ww + Sp + Wp
-        ADDR = rsA0 + "__" + rsA1
-        return (
-            "110"
-            + "_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "__"
-            + CFG
-            + "___"
-            + ADDR
-            + "____"
-            + DATA
-            + "__"
-            + RD
-        )
+        rsA1 = int2field(int(current["DST"]), 6, 1)
+        COND = (Ww << 2) | (Sp << 1) | Wp
+        ADDR = (rsA0 << 6) | rsA1
+        return InstWord(0b110, AI, DF, COND, CFG, ADDR, DATA, RD)
 
     ################################ TO UPDATE CODE HERE. NOT LAST VERSION
     @staticmethod
-    def CTRL(current: dict) -> str:
-        Header = "010"
-        RA0 = RA1 = "000000"
-        RD0 = RD1 = "0_0000000"
-        ImmFill = "__0000000000000000"
-        DF = "01"
-        AI = "0"
+    def CTRL(current: dict) -> InstWord:
+        Header = 0b010
+        RA0 = RA1 = 0
+        RD0 = RD1 = 0
+        IMM = None
+        DF = 0b01
+        AI = 0
         #### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         ######### TIME
         if current["CMD"] == "TIME":
-            CTRL_ADDR = "000"
+            CTRL_ADDR = 0b000
             if current["C_OP"] == "rst":
-                OPERATION = "_0001"
+                OPERATION = 0b0001
             elif current["C_OP"] == "updt":
-                OPERATION = "_0010"
+                OPERATION = 0b0010
             elif current["C_OP"] == "set_ref":
-                OPERATION = "_0100"
+                OPERATION = 0b0100
             elif current["C_OP"] == "inc_ref":
-                OPERATION = "_1000"
+                OPERATION = 0b1000
             else:
                 raise RuntimeError(
                     "Instruction.CTRL: Posible Operations for TIME command are (rst, set_ref, inc_ref)"
                 )
             if "LIT" in current:
-                DF = "11"
-                RD0 = "_"
-                RD1 = get_imm_dt(current["LIT"], 32)
-                ImmFill = "__"
+                DF = 0b11
+                IMM = get_imm_dt(current["LIT"], 32)
             elif "R1" in current:
                 RD1 = get_reg_addr(current["R1"], "src_data")
             else:
@@ -2320,29 +2258,27 @@ class Instruction:
                     raise RuntimeError("Instruction.CTRL: No Time Data")
         ######### FLAG
         elif current["CMD"] == "FLAG":
-            CTRL_ADDR = "001"
+            CTRL_ADDR = 0b001
             if current["C_OP"] == "set":
-                OPERATION = "_0001"
+                OPERATION = 0b0001
             elif current["C_OP"] == "clr":
-                OPERATION = "_0010"
+                OPERATION = 0b0010
             elif current["C_OP"] == "inv":
-                OPERATION = "_0100"
+                OPERATION = 0b0100
             else:
                 raise RuntimeError(
                     "Instruction.CTRL: Posible Operations for FLAG command are (set, clr, inv)"
                 )
         ######### DIVISION
         elif current["CMD"] == "DIV":
-            CTRL_ADDR = "011"
-            OPERATION = "_0000"
+            CTRL_ADDR = 0b011
+            OPERATION = 0b0000
             RA1 = get_reg_addr(current["NUM"], "src_addr")
             if check_reg(current["DEN"]):  # Is Register
                 RD1 = get_reg_addr(current["DEN"], "src_data")
             elif check_lit(current["DEN"]):  # Is Literal Value
-                DF = "11"
-                RD0 = "_"
-                RD1 = get_imm_dt(current["DEN"], 32)
-                ImmFill = "__"
+                DF = 0b11
+                IMM = get_imm_dt(current["DEN"], 32)
             else:
                 raise RuntimeError(
                     "Instruction.CTRL: DIV Denominator not recognized in line "
@@ -2350,61 +2286,59 @@ class Instruction:
                 )
         ######### NET
         elif current["CMD"] == "NET":
-            Header = "011"
-            CTRL_ADDR = "_00"  # QNET ADDRESS
+            Header = 0b011
+            CTRL_ADDR = 0b00  # QNET ADDRESS
             if current["C_OP"] == "set_net":
-                OPERATION = "00001"
+                OPERATION = 0b00001
             elif current["C_OP"] == "sync_net":
-                OPERATION = "01000"
+                OPERATION = 0b01000
             elif current["C_OP"] == "updt_offset":
-                OPERATION = "01001"
+                OPERATION = 0b01001
             elif current["C_OP"] == "set_dt":
-                OPERATION = "01010"
+                OPERATION = 0b01010
             elif current["C_OP"] == "get_dt":
-                OPERATION = "01011"
+                OPERATION = 0b01011
             elif current["C_OP"] == "set_flag":
-                OPERATION = "01010"
+                OPERATION = 0b01010
             elif current["C_OP"] == "get_flag":
-                OPERATION = "01011"
+                OPERATION = 0b01011
             else:
                 raise RuntimeError("Instruction.CTRL: NET Operation not recognized")
         ######### COM
         elif current["CMD"] == "COM":
-            Header = "011"
-            CTRL_ADDR = "_01"  # QCOM ADDRESS
+            Header = 0b011
+            CTRL_ADDR = 0b01  # QCOM ADDRESS
             if current["C_OP"] == "set_flag":
                 if current["R1"] == "0":
-                    OPERATION = "00000"
+                    OPERATION = 0b00000
                 elif current["R1"] == "1":
-                    OPERATION = "00010"
+                    OPERATION = 0b00010
                 else:
                     raise RuntimeError("Instruction.CTRL: COM flag value can be 0 or 1")
             elif current["C_OP"] == "sync":
-                OPERATION = "00110"
+                OPERATION = 0b00110
             elif current["C_OP"] == "reset":
-                OPERATION = "11111"
+                OPERATION = 0b11111
             else:
                 if current["C_OP"] == "set_byte_1":
-                    OPERATION = "00100"
+                    OPERATION = 0b00100
                 elif current["C_OP"] == "set_byte_2":
-                    OPERATION = "00101"
+                    OPERATION = 0b00101
                 elif current["C_OP"] == "set_hw_1":
-                    OPERATION = "01000"
+                    OPERATION = 0b01000
                 elif current["C_OP"] == "set_hw_2":
-                    OPERATION = "01001"
+                    OPERATION = 0b01001
                 elif current["C_OP"] == "set_word_1":
-                    OPERATION = "01100"
+                    OPERATION = 0b01100
                 elif current["C_OP"] == "set_word_2":
-                    OPERATION = "01101"
+                    OPERATION = 0b01101
                 else:
                     raise RuntimeError(
                         "Instruction.CTRL: Possible Operations for COM command are (set_flag, set_byte, set_hw, set_word)"
                     )
                 if "LIT" in current:
-                    DF = "11"
-                    RD0 = ""
-                    RD1 = get_imm_dt(current["LIT"], 32)
-                    ImmFill = ""
+                    DF = 0b11
+                    IMM = get_imm_dt(current["LIT"], 32)
                 elif "R1" in current:
                     RD1 = get_reg_addr(current["R1"], "src_data")
                 else:
@@ -2412,17 +2346,17 @@ class Instruction:
                         raise RuntimeError("Instruction.CTRL: No Time Data")
         ######### CUSTOM Peripheral
         elif current["CMD"] == "PA" or current["CMD"] == "PB":
-            Header = "011"
+            Header = 0b011
             if current["CMD"] == "PA":
-                CTRL_ADDR = "_10"  # PA PERIPHERAL
+                CTRL_ADDR = 0b10  # PA PERIPHERAL
             else:
-                CTRL_ADDR = "_11"  # PB PERIPHERAL
+                CTRL_ADDR = 0b11  # PB PERIPHERAL
             if int(current["C_OP"]) > 31:
                 raise RuntimeError(
                     "COMMAND_RECOGNITION: External Peripheral Operation not in range [0:31] in line "
                     + str(current["LINE"])
                 )
-            OPERATION = integer2bin(current["C_OP"], 5, 1)
+            OPERATION = int2field(int(current["C_OP"]), 5, 1)
             if "LIT" in current:
                 raise RuntimeError(
                     "Instruction.CTRL: No Immediate value allowed in Peripheral instruction"
@@ -2435,35 +2369,22 @@ class Instruction:
                 RA0 = get_reg_addr(current["R3"], "src_addr")
             if "R4" in current:
                 RA1 = get_reg_addr(current["R4"], "src_addr")
-        # if (error):
-        #    raise RuntimeError("Instruction.CTRL: Error in instruction " + str(current['LINE']) )
-        #    CODE = 'X'
-        return (
-            Header
-            + "_"
-            + AI
-            + DF
-            + "__"
-            + COND
-            + "___"
-            + CTRL_ADDR
-            + "__"
-            + OPERATION
-            + "___00000___"
-            + RA0
-            + "__"
-            + RA1
-            + "____"
-            + RD0
-            + "__"
-            + RD1
-            + ImmFill
-            + "__0000000"
-        )
+        # the 7 control bits are a 3-bit address and 4-bit operation (header 010),
+        # or a 2-bit peripheral address and 5-bit operation (header 011)
+        if Header == 0b010:
+            CTRL = (CTRL_ADDR << 4) | OPERATION
+        else:
+            CTRL = (CTRL_ADDR << 5) | OPERATION
+        if IMM is None:
+            DATA = (RD0 << 24) | (RD1 << 16)
+        else:
+            DATA = IMM
+        ADDR = (0 << 12) | (RA0 << 6) | RA1
+        return InstWord(Header, AI, DF, COND, CTRL, ADDR, DATA, 0)
 
     @staticmethod
-    def ARITH(current: dict) -> str:
-        RsC = RsD = "000000"
+    def ARITH(current: dict) -> InstWord:
+        RsC = RsD = 0
         #### CONDITIONAL
         COND = Instruction.__PROCESS_CONDITION(current)
         if "LIT" in current:
@@ -2471,7 +2392,7 @@ class Instruction:
         if "C_OP" not in current:
             raise RuntimeError("Instruction.ARITH: No ARITH Operation ")
         if current["C_OP"] in arithList:
-            ARITH_OP = arithList[current["C_OP"]]
+            ARITH_OP = int(arithList[current["C_OP"]], 2)
         if current["C_OP"] == "T":  # A*B
             if any([x not in current for x in ["R1", "R2"]]):
                 raise RuntimeError(
@@ -2549,27 +2470,13 @@ class Instruction:
             RsC = get_reg_addr(current["R4"], "src_addr")
         else:
             raise RuntimeError("Instruction.ARITH: No Recognized Operation")
-        # if (error):
-        #    raise RuntimeError("Instruction.ARITH: Exit with Error in line " + str(current['LINE']) )
-        #    CODE = 'X'
-        return (
-            "010_001__"
-            + COND
-            + "___010___"
-            + ARITH_OP
-            + "___00000___"
-            + RsC
-            + "__"
-            + RsD
-            + "____"
-            + RsA
-            + "__"
-            + RsB
-            + "__0000000000000000__0000000"
-        )
+        CTRL = (0b010 << 4) | ARITH_OP
+        ADDR = (0 << 12) | (RsC << 6) | RsD
+        DATA = (RsA << 24) | (RsB << 16)
+        return InstWord(0b010, 0, 0b01, COND, CTRL, ADDR, DATA, 0)
 
     @staticmethod
-    def WAIT(current: dict) -> str:
+    def WAIT(current: dict) -> list:
         binary_multi_list = []
         current["ADDR"] = "&" + str(current["P_ADDR"])
         test_op = ""
@@ -2602,12 +2509,12 @@ class Instruction:
         CODE = Instruction.CFG(current)  ## ADD TEST INSTRUCTION
         binary_multi_list.append(CODE)
         current["IF"] = jump_cond
-        CODE = Instruction.BRANCH(current, "00")  ## ADD JUMP INSTRUCTION
+        CODE = Instruction.BRANCH(current, 0b00)  ## ADD JUMP INSTRUCTION
         binary_multi_list.append(CODE)
         return binary_multi_list
 
     @staticmethod
-    def CLEAR(current: dict) -> str:
+    def CLEAR(current: dict) -> InstWord:
         current["CMD"] = "REG_WR"
         current["DST"] = "s2"
         current["SRC"] = "imm"
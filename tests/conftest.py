@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from myqick.qick_asm import QickConfig
+
+VERSION_FILE = os.path.join(os.path.dirname(__file__), "..", "lib", "myqick", "VERSION")
+
+
+@pytest.fixture
+def soccfg_v2():
+    """Firmware configuration of a board with a tProc v2 and no generators or readouts."""
+    with open(VERSION_FILE) as f:
+        version = f.read().strip()
+    tproc = {
+        "type": "qick_processor",
+        "revision": 23,
+        "f_time": 409.6,
+        "f_core": 200.0,
+        "pmem_size": 4096,
+        "dmem_size": 4096,
+        "wmem_size": 1024,
+        "output_pins": [],
+        "start_pin": None,
+        "stop_pin": None,
+        "trig_output": None,
+        "in_port": 0,
+        "out_tport": 8,
+        "out_dport": 4,
+        "out_wport": 16,
+        "dreg_qty": 16,
+        "core_ctrl": 0,
+        "ext_flag": False,
+        "io_ctrl": 0,
+        "lfsr": 0,
+        "has_io_ctrl": 0,
+        "has_lfsr": 0,
+        "has_div": 1,
+        "has_arith": 1,
+        "has_time_read": 1,
+        "has_tnet": 0,
+        "has_custom_periph": 0,
+        "has_dmem_time": 0,
+        "has_rand": 0,
+        "out_trig_qty": 8,
+        "fifo_depth": 32,
+        "debug": 0,
+    }
+    cfg = {
+        "sw_version": version,
+        "fw_timestamp": "test",
+        "board": "ZCU216",
+        "refclk_freq": 245.76,
+        "tprocs": [tproc],
+        "gens": [],
+        "readouts": [],
+        "iqs": [],
+        "extra_description": [],
+    }
+    return QickConfig(cfg)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from myqick.accumulate import HistogramAccumulator, ShotIndexer, WelfordAccumulator
+
+
+def split(n, rng):
+    """Random chunk boundaries covering range(n)."""
+    cuts = np.sort(rng.choice(np.arange(1, n), size=min(5, n - 1), replace=False))
+    return list(zip([0, *cuts], [*cuts, n]))
+
+
+@pytest.mark.parametrize("avg_level", [0, 1, 2])
+@pytest.mark.parametrize("nshots_chunk", [1, 3, 7, 1000])
+def test_groups_matches_unique(avg_level, nshots_chunk):
+    indexer = ShotIndexer([3, 4, 5], avg_level, 2)
+    total = 3 * 4 * 5
+    for start in range(0, total, nshots_chunk):
+        n = min(nshots_chunk, total - start)
+        cells, inv, counts = indexer.groups(start, n)
+        ref_cells, ref_inv, ref_counts = np.unique(
+            indexer.cells(start, n), return_inverse=True, return_counts=True
+        )
+        # same grouping, but the cells may come in a different order
+        assert sorted(cells.tolist()) == ref_cells.tolist()
+        assert np.array_equal(cells[inv], ref_cells[ref_inv])
+        assert np.array_equal(counts[inv], ref_counts[ref_inv])
+
+
+@pytest.mark.parametrize("avg_level", [0, 1, 2])
+def test_welford_matches_numpy(avg_level):
+    rng = np.random.default_rng(avg_level)
+    loop_dims = [4, 3, 5]
+    nreads = 2
+    total = np.prod(loop_dims)
+    data = rng.normal(100, 20, size=(total * nreads, 2)).round()
+
+    acc = WelfordAccumulator(loop_dims, avg_level, nreads)
+    for start, end in split(total, rng):
+        acc.add(start, data[start * nreads : end * nreads])
+    mean, std = acc.result()
+
+    full = data.reshape((*loop_dims, nreads, 2))
+    assert mean.shape == std.shape
+    assert np.allclose(mean, full.mean(axis=avg_level))
+    assert np.allclose(std, full.std(axis=avg_level))
+
+
+def test_welford_partial():
+    # cells that haven't received data yet are zero
+    acc = WelfordAccumulator([2, 3], 0, 1)
+    acc.add(0, np.array([[1.0, 2.0], [3.0, 4.0]]))
+    mean, std = acc.result()
+    assert np.array_equal(mean, [[[1.0, 2.0]], [[3.0, 4.0]], [[0.0, 0.0]]])
+    assert np.array_equal(std, np.zeros((3, 1, 2)))
+
+
+def test_histogram_matches_numpy():
+    rng = np.random.default_rng(0)
+    nreads = 3
+    bins = (8, 5)
+    hist_range = ((-2.0, 2.0), (-1.0, 3.0))
+    data = rng.normal(0.5, 1.5, size=(600 * nreads, 2))
+    # points on the edges: the upper edge is inside, like numpy
+    data[:nreads] = [[2.0, 3.0], [-2.0, -1.0], [2.0, -1.0]]
+
+    acc = HistogramAccumulator(nreads, bins, hist_range)
+    for start, end in split(600, rng):
+        acc.add(data[start * nreads : end * nreads])
+
+    for i in range(nreads):
+        x = data[i::nreads]
+        ref, ref_i, ref_q = np.histogram2d(
+            x[:, 0], x[:, 1], bins=bins, range=hist_range
+        )
+        assert np.array_equal(acc.counts[i], ref)
+        assert acc.outside[i] == len(x) - ref.sum()
+    assert np.allclose(acc.edges[0], ref_i)
+    assert np.allclose(acc.edges[1], ref_q)
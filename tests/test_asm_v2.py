@@ -0,0 +1,139 @@
+import logging
+
+import numpy as np
+import pytest
+
+from myqick.asm_v2 import AveragerProgramV2, QickProgramV2, Waveform
+from myqick.helpers import pmem_digest
+
+
+def wave(gain=100):
+    return Waveform(freq=1, phase=2, env=0, gain=gain, length=10, conf=0)
+
+
+def build_waves(cls, soccfg, write=None, raw_write=None):
+    prog = cls(soccfg)
+    prog.add_raw_pulse("a", [wave()])
+    prog.add_raw_pulse("b", [wave()])
+    prog.add_raw_pulse("c", [wave(200)])
+    if write is not None:
+        prog.write_wmem(write)
+    if raw_write is not None:
+        prog.asm_inst({"CMD": "WMEM_WR", "DST": "&%d" % prog.wave2idx[raw_write]})
+    prog.add_raw_pulse("d", [wave()])
+    prog.end()
+    prog.compile()
+    return prog
+
+
+def test_identical_waves_share(soccfg_v2):
+    prog = build_waves(QickProgramV2, soccfg_v2)
+    idx = prog.wave2idx
+    assert idx["a_w0"] == idx["b_w0"] == idx["d_w0"] != idx["c_w0"]
+    assert len(prog.waves) == len(prog.binprog["wmem"]) == 2
+
+
+def test_write_wmem_unshares(soccfg_v2):
+    prog = build_waves(QickProgramV2, soccfg_v2, write="a_w0")
+    idx = prog.wave2idx
+    assert idx["b_w0"] == idx["d_w0"]
+    assert len(set(idx.values())) == 3
+    # every entry is named after a waveform that uses it, and has the same contents
+    for name, i in idx.items():
+        assert prog.waves[i].name in [k for k, v in idx.items() if v == i]
+    wmem = prog.binprog["wmem"]
+    assert wmem[idx["a_w0"]] == wmem[idx["b_w0"]]
+    assert prog.asm().count("WMEM_WR") == 1
+
+
+def test_no_sharing(soccfg_v2, caplog):
+    class NoShare(QickProgramV2):
+        SHARE_WAVES = False
+
+    with caplog.at_level(logging.WARNING):
+        prog = build_waves(NoShare, soccfg_v2, raw_write="b_w0")
+    assert sorted(prog.wave2idx.values()) == [0, 1, 2, 3]
+    assert not caplog.records
+
+
+def test_raw_write_warns(soccfg_v2, caplog):
+    with caplog.at_level(logging.WARNING):
+        build_waves(QickProgramV2, soccfg_v2, raw_write="b_w0")
+    assert "SHARE_WAVES" in caplog.text
+
+
+class ParamProgram(AveragerProgramV2):
+    def _initialize(self, cfg):
+        self.declare_param("amp", 5)
+        self.declare_param("phase", -3, addr=7)
+        self.add_reg("r0")
+
+    def _body(self, cfg):
+        self.read_param("r0", "amp")
+        self.delay(0.5)
+
+
+class FakeSoc:
+    """Records the data memory writes."""
+
+    def __init__(self):
+        self.writes = []
+
+    def update_dmem(self, buff, addr=0, prog_digest=None):
+        self.writes.append((list(buff), addr, prog_digest))
+
+
+def test_params(soccfg_v2):
+    prog = ParamProgram(soccfg_v2, reps=3, final_delay=1)
+    assert prog.binprog["dmem"] == [5, 0, 0, 0, 0, 0, 0, -3]
+    pmem = [list(x) for x in prog.binprog["pmem"]]
+
+    soc = FakeSoc()
+    prog.update_params(soc, amp=100, phase=4)
+    assert prog.binprog["dmem"] == [100, 0, 0, 0, 0, 0, 0, 4]
+    # the program memory doesn't change, and the update is for this program
+    assert [list(x) for x in prog.binprog["pmem"]] == pmem
+    assert soc.writes == [
+        ([100, 0, 0, 0, 0, 0, 0, 4], 0, pmem_digest(prog.binprog["pmem"]))
+    ]
+
+    soc.writes.clear()
+    prog.update_params(soc, phase=-(2**31))
+    assert soc.writes == [([-(2**31)], 7, pmem_digest(prog.binprog["pmem"]))]
+
+    with pytest.raises(RuntimeError):
+        prog.update_params(nonexistent=1)
+    with pytest.raises(ValueError):
+        prog.update_params(amp=2**31)
+    assert prog.params["amp"]["value"] == 100
+
+
+def test_params_round_trip(soccfg_v2):
+    prog = ParamProgram(soccfg_v2, reps=3, final_delay=1)
+    prog.update_params(amp=42)
+    copy = QickProgramV2(soccfg_v2)
+    copy.load_prog(prog.dump_prog())
+    assert copy.params == prog.params
+    assert copy.compile_datamem() == prog.binprog["dmem"]
+    assert np.array_equal(copy.binprog["pmem"], prog.binprog["pmem"])
+    copy.update_params(amp=43)
+    assert copy.binprog["dmem"][0] == 43
+
+
+def test_compile_datamem_override(soccfg_v2):
+    class Extended(ParamProgram):
+        def compile_datamem(self):
+            return super().compile_datamem() + [99]
+
+    class Replaced(ParamProgram):
+        def compile_datamem(self):
+            return [11, 12, 13]
+
+    prog = Extended(soccfg_v2, reps=3, final_delay=1)
+    prog.update_params(phase=1)
+    assert prog.binprog["dmem"] == [5, 0, 0, 0, 0, 0, 0, 1, 99]
+
+    prog = Replaced(soccfg_v2, reps=3, final_delay=1)
+    with pytest.raises(RuntimeError):
+        prog.update_params(amp=100)
+    assert prog.binprog["dmem"] == [11, 12, 13]
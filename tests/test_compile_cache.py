@@ -0,0 +1,103 @@
+import pytest
+
+from myqick.asm_v2 import AveragerProgramV2, QickSweep1D
+from myqick.compile_cache import CompileCache, set_compile_cache
+from myqick.helpers import progs2json
+
+
+class SweepProgram(AveragerProgramV2):
+    def _initialize(self, cfg):
+        self.declare_param("amp", 5)
+        self.add_loop("a", cfg["n"])
+
+    def _body(self, cfg):
+        self.delay(QickSweep1D("a", 0.1, cfg["t"]), tag="d1")
+        self.delay_auto(0.1)
+
+
+@pytest.fixture
+def cache():
+    cache = CompileCache(maxsize=4)
+    set_compile_cache(cache)
+    yield cache
+    set_compile_cache(None)
+
+
+def dump(prog):
+    return progs2json({**prog.dump_prog(), "binprog": prog.binprog})
+
+
+def make(soccfg, **cfg):
+    return SweepProgram(soccfg, reps=10, final_delay=1.0, cfg=cfg)
+
+
+def test_hit_matches_compile(soccfg_v2, cache):
+    ref = make(soccfg_v2, n=5, t=0.5)
+    assert cache.get_stats()["misses"] == 1
+    prog = make(soccfg_v2, n=5, t=0.5)
+    assert cache.get_stats()["hits"] == 1
+    assert dump(prog) == dump(ref)
+    assert prog.loop_dims == ref.loop_dims
+    assert prog.counter_addr == ref.counter_addr
+
+    # different arguments are a different program
+    other = make(soccfg_v2, n=6, t=0.5)
+    assert cache.get_stats()["misses"] == 2
+    assert dump(other) != dump(ref)
+
+
+def test_hit_high_level(soccfg_v2, cache):
+    ref = make(soccfg_v2, n=5, t=0.5)
+    prog = make(soccfg_v2, n=5, t=0.5)
+    # the sweeps are rebuilt when they're needed, without changing the compiled program
+    binprog = prog.binprog
+    assert (
+        prog.get_time_param("d1", "t", as_array=True).tolist()
+        == ref.get_time_param("d1", "t", as_array=True).tolist()
+    )
+    assert prog.binprog is binprog
+    assert dump(prog) == dump(ref)
+
+
+def test_copies(soccfg_v2, cache):
+    make(soccfg_v2, n=5, t=0.5)
+    prog1 = make(soccfg_v2, n=5, t=0.5)
+    prog2 = make(soccfg_v2, n=5, t=0.5)
+    ref = dump(prog2)
+    # changing one program doesn't change the others or the cache
+    prog1.update_params(amp=77)
+    prog1.binprog["pmem"][0][0] += 1
+    assert dump(prog2) == ref
+    assert dump(make(soccfg_v2, n=5, t=0.5)) == ref
+
+
+def test_get_copies():
+    cache = CompileCache()
+    cache.put("k", {"prog_list": [{"CMD": "NOP"}], "binprog": {"dmem": [1, 2]}})
+    a = cache.get("k")
+    a["binprog"]["dmem"][0] = 5
+    assert cache.get("k")["binprog"]["dmem"] == [1, 2]
+    assert cache.get("other") is None
+    assert cache.get_stats() == {
+        "hits": 2,
+        "disk_hits": 0,
+        "misses": 1,
+        "uncacheable": 0,
+    }
+
+
+def test_lru_and_disk(tmp_path):
+    cache = CompileCache(maxsize=2, path=str(tmp_path))
+    for k in "abc":
+        cache.put(k, {"x": k})
+    assert list(cache.entries) == ["b", "c"]
+    # evicted entries are still on disk
+    assert cache.get("a") == {"x": "a"}
+    assert cache.get_stats()["disk_hits"] == 1
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_uncacheable(soccfg_v2, cache):
+    make(soccfg_v2, n=5, t=0.5, f=lambda x: x)
+    assert cache.get_stats()["uncacheable"] == 1
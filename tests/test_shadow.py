@@ -0,0 +1,53 @@
+import numpy as np
+
+from myqick.shadow import ConfigShadow
+
+
+def test_disabled():
+    shadow = ConfigShadow()
+    assert shadow.check(("readout", 0), 1)
+    assert shadow.check(("readout", 0), 1)
+    assert shadow.check_block(("env", 0), 0, 4, np.zeros(4))
+    assert not shadow.has_blocks(("env", 0))
+    assert shadow.get_stats() == {}
+
+
+def test_settings():
+    shadow = ConfigShadow(enabled=True)
+    assert shadow.check(("readout", 0), {"freq": 100})
+    assert not shadow.check(("readout", 0), {"freq": 100})
+    assert shadow.check(("readout", 1), {"freq": 100})
+    assert shadow.check(("readout", 0), {"freq": 101})
+    assert not shadow.check(("readout", 0), {"freq": 101})
+    assert shadow.get_stats() == {"readout": {"applied": 3, "skipped": 2}}
+
+
+def test_blocks():
+    shadow = ConfigShadow(enabled=True)
+    mem = ("env", 0)
+    a = np.arange(8)
+    assert shadow.check_block(mem, 0, 8, a)
+    assert shadow.has_blocks(mem)
+    assert not shadow.check_block(mem, 0, 8, a.copy())
+    # same contents with a different dtype is a different block
+    assert shadow.check_block(mem, 0, 8, a.astype(np.int16))
+    assert shadow.check_block(mem, 8, 8, a)
+    # overlapping both blocks forgets them
+    assert shadow.check_block(mem, 4, 8, a)
+    assert shadow.check_block(mem, 0, 8, a.astype(np.int16))
+    assert shadow.check_block(mem, 8, 8, a)
+    assert not shadow.check_block(mem, 8, 8, a)
+
+
+def test_invalidate():
+    shadow = ConfigShadow(enabled=True)
+    shadow.check(("readout", 0), 1)
+    shadow.check(("gen", 0), 1)
+    shadow.check_block(("env", 0), 0, 4, np.zeros(4))
+    shadow.invalidate("readout")
+    assert shadow.check(("readout", 0), 1)
+    assert not shadow.check(("gen", 0), 1)
+    assert shadow.has_blocks(("env", 0))
+    shadow.invalidate()
+    assert shadow.check(("gen", 0), 1)
+    assert not shadow.has_blocks(("env", 0))
@@ -0,0 +1,64 @@
+import threading
+
+import numpy as np
+import pytest
+
+from myqick.streamer import SampleRing
+
+
+def test_reserve_release_wraparound():
+    ring = SampleRing([10, 4])
+    a = ring.reserve([6, 2])
+    a[0][:] = 1
+    b = ring.reserve([3, 2])
+    assert [len(v) for v in b] == [3, 2]
+    # the views are into the rings, so nothing is copied
+    assert np.shares_memory(a[0], ring.bufs[0])
+    assert (ring.bufs[0][:6] == 1).all()
+
+    # no room after the head or before the tail until the first block is released
+    stop = threading.Event()
+    stop.set()
+    assert ring.reserve([4, 1], stop_flag=stop) is None
+    ring.release()
+    # the new block wraps around to the start of the ring
+    c = ring.reserve([4, 1])
+    assert np.shares_memory(c[0], ring.bufs[0][:4])
+    assert ring.heads == [4, 1]
+    # the gap before the block that's still reserved takes 2 samples, but not 3
+    assert ring.reserve([3, 1], stop_flag=stop) is None
+    d = ring.reserve([2, 1])
+    assert np.shares_memory(d[0], ring.bufs[0][4:6])
+
+
+def test_reserve_waits_for_release():
+    ring = SampleRing([8])
+    ring.reserve([8])
+    threading.Timer(0.05, ring.release).start()
+    views = ring.reserve([5])
+    assert len(views[0]) == 5
+
+
+def test_reset():
+    ring = SampleRing([8])
+    ring.reserve([5])
+    ring.reserve([3])
+    ring.reset()
+    assert ring.heads == [0]
+    assert not ring.blocks[0]
+    assert len(ring.reserve([8])[0]) == 8
+
+
+def test_empty_blocks():
+    ring = SampleRing([4, 4])
+    ring.reserve([4, 0])
+    # channel 1 is empty, so it can take a full block
+    stop = threading.Event()
+    stop.set()
+    assert ring.reserve([0, 4], stop_flag=stop) is not None
+
+
+def test_oversize_block():
+    ring = SampleRing([8])
+    with pytest.raises(RuntimeError):
+        ring.reserve([9])
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from myqick.qick_asm import AcquireMixin
+
+
+def float_threshold(acc_buf, ro_chs, offsets, thresholds, angles, remove_offset):
+    """The thresholding formula, in floating point."""
+    shots = []
+    for i, (ro_ch, ro) in enumerate(ro_chs.items()):
+        avg = acc_buf[i] / ro["length"]
+        if remove_offset:
+            avg = avg - offsets[ro_ch]
+        rotated = np.inner(avg, [np.cos(angles[i]), np.sin(angles[i])])
+        shots.append(np.heaviside(rotated - thresholds[i], 0))
+    return shots
+
+
+@pytest.mark.parametrize("remove_offset", [False, True])
+@pytest.mark.parametrize("angle", [None, 0.7, [-2.5, 1.2]])
+def test_threshold_matches_float(remove_offset, angle):
+    rng = np.random.default_rng(1)
+    ro_chs = OrderedDict([(0, {"length": 100}), (2, {"length": 37})])
+    offsets = {0: 0.25, 2: -1.5}
+    prog = SimpleNamespace(
+        ro_chs=ro_chs,
+        soccfg={"readouts": {ch: {"iq_offset": off} for ch, off in offsets.items()}},
+        # small blocks, so the blocking is exercised
+        THRESHOLD_BLOCK=50,
+    )
+    acc_buf = [
+        rng.integers(-5000, 5000, size=(3, 77, 2), dtype=np.int32),
+        rng.integers(-2000, 2000, size=(130, 2), dtype=np.int32),
+    ]
+    threshold = [3.3, -1.1]
+
+    shots = AcquireMixin._apply_threshold(
+        prog, acc_buf, threshold, angle, remove_offset
+    )
+    angles = [0.0, 0.0] if angle is None else np.broadcast_to(angle, 2)
+    ref = float_threshold(acc_buf, ro_chs, offsets, threshold, angles, remove_offset)
+    for s, r, buf in zip(shots, ref, acc_buf):
+        assert s.dtype == np.uint8
+        assert s.shape == buf.shape[:-1]
+        assert np.array_equal(s, r)
@@ -0,0 +1,105 @@
+import logging
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pynq")
+
+from myqick.drivers.tproc import Axis_QICK_Proc  # noqa: E402
+
+
+class FakeProc(Axis_QICK_Proc):
+    """tProc v2 driver with the DMA replaced by arrays, and a record of the writes."""
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self):
+        # skip the IP setup
+        self.hw = {
+            "pmem": np.zeros((256, 8), dtype=np.int32),
+            "dmem": np.zeros(256, dtype=np.int32),
+            "wmem": np.zeros((64, 8), dtype=np.int32),
+        }
+        self.mem_mirror = {"pmem": None, "dmem": None, "wmem": None}
+        self.load_stats = {
+            mem: {"bytes_written": 0, "bytes_saved": 0} for mem in self.mem_mirror
+        }
+        self.writes = []
+        self.corrupt = False
+
+    def load_mem(self, mem_sel, buff_in, addr=0):
+        buff = np.asarray(buff_in, dtype=np.int32)
+        self.hw[mem_sel][addr : addr + len(buff)] = buff
+        if self.corrupt:
+            self.hw[mem_sel][addr] += 1
+        self.writes.append((mem_sel, addr, len(buff)))
+        self._update_mirror(mem_sel, buff, addr)
+
+    def read_mem(self, mem_sel, length, addr=0):
+        return self.hw[mem_sel][addr : addr + length].copy()
+
+
+@pytest.fixture
+def proc():
+    return FakeProc()
+
+
+def test_changed_ranges(proc):
+    buff = np.arange(100 * 8, dtype=np.int32).reshape((100, 8))
+    # nothing is known, so everything is written
+    assert proc.changed_ranges("pmem", buff) == [(0, 100)]
+    proc.load_mem_changes("pmem", buff)
+    assert proc.changed_ranges("pmem", buff) == []
+
+    new = buff.copy()
+    gap = proc.DIFF_MERGE_GAP
+    new[10, 3] += 1
+    new[10 + gap, 0] += 1
+    new[11 + 2 * gap + 1, 7] += 1
+    # the first two changes are close enough to merge, the third isn't
+    assert proc.changed_ranges("pmem", new) == [
+        (10, 11 + gap),
+        (12 + 2 * gap, 13 + 2 * gap),
+    ]
+    # addresses past the end of the mirror count as changed
+    longer = np.concatenate([buff, np.ones((5, 8), dtype=np.int32)])
+    assert proc.changed_ranges("pmem", longer) == [(100, 105)]
+
+
+def test_load_mem_changes(proc):
+    rng = np.random.default_rng(0)
+    buff = rng.integers(-100, 100, size=(200, 8), dtype=np.int32)
+    assert proc.load_mem_changes("pmem", buff)
+    assert proc.writes == [("pmem", 0, 200)]
+
+    proc.writes.clear()
+    new = buff.copy()
+    new[50, 1] += 1
+    new[150, 2] += 1
+    assert proc.load_mem_changes("pmem", new, check=True)
+    assert proc.writes == [("pmem", 50, 1), ("pmem", 150, 1)]
+    assert np.array_equal(proc.hw["pmem"][:200], new)
+    assert proc.get_load_stats()["pmem"] == {
+        "bytes_written": 202 * 32,
+        "bytes_saved": 198 * 32,
+    }
+
+    # writes made some other way also update the mirror
+    proc.writes.clear()
+    proc.load_mem("dmem", np.array([1, 2, 3]))
+    proc.load_mem("dmem", np.array([7]), 1)
+    assert proc.load_mem_changes("dmem", np.array([1, 7, 3, 4]))
+    assert proc.writes[-1] == ("dmem", 3, 1)
+
+
+def test_failed_check(proc):
+    buff = np.arange(10, dtype=np.int32)
+    proc.load_mem_changes("dmem", buff)
+    proc.corrupt = True
+    buff[4] = -1
+    assert not proc.load_mem_changes("dmem", buff, check=True)
+    # the memory contents are unknown, so the next load writes everything
+    assert proc.mem_mirror["dmem"] is None
+    proc.corrupt = False
+    assert proc.load_mem_changes("dmem", buff, check=True)
+    assert proc.writes[-1] == ("dmem", 0, 10)